@@ -0,0 +1,260 @@
+"""
+Pluggable storage for the roster, attendance marks and unidentified joins.
+
+AttendanceStore is the interface the attendance processor writes through.
+The NocoDB implementation lives next to the processor in zoom_attendance.py;
+this module holds the local SQLite (WAL) store and the replicator that
+copies its writes to an upstream store in the background.
+
+With the SQLite store a join commits to a local file in microseconds and
+the request never waits on NocoDB. The roster is mirrored locally (so the
+service can start without NocoDB) and refreshed from upstream on an
+interval; attendance marks and unidentified joins are flagged unsynced
+until the replicator has handed them to the upstream store.
+"""
+import abc
+import asyncio
+import datetime
+import json
+import logging
+import pathlib
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger("zoom_attendance.attendance_store")
+
+
+class AttendanceStore(abc.ABC):
+    """Where the roster is read from and attendance/unidentified joins are written to"""
+
+    name = "base"
+
+    @abc.abstractmethod
+    async def get_roster(self, force_refresh: bool = False) -> List[Dict[str, Any]]:
+        ...
+
+    @abc.abstractmethod
+    async def mark_attendance(self, person_id: Any, attendance_date: str) -> Dict[str, Any]:
+        ...
+
+    @abc.abstractmethod
+    async def log_unidentified(self, name: str, join_time: Optional[str], date: str) -> Dict[str, Any]:
+        ...
+
+
+class SQLiteStore(AttendanceStore):
+    """
+    Embedded store: roster mirror plus attendance/unidentified tables with a
+    `synced` flag. The roster is served from memory and only reloaded from
+    `upstream` when forced or when the local mirror is empty.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, db_path: str, upstream: Optional[AttendanceStore] = None):
+        self.upstream = upstream
+        self.lock = threading.Lock()
+        pathlib.Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute("CREATE TABLE IF NOT EXISTS roster (id TEXT PRIMARY KEY, record TEXT NOT NULL)")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS attendance ("
+            " person_id TEXT NOT NULL, date TEXT NOT NULL, marked_at REAL NOT NULL,"
+            " synced INTEGER NOT NULL DEFAULT 0,"
+            " PRIMARY KEY (person_id, date))"
+        )
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS unidentified ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " name TEXT NOT NULL, join_time TEXT, date TEXT NOT NULL, created_at REAL NOT NULL,"
+            " synced INTEGER NOT NULL DEFAULT 0)"
+        )
+        self.db.execute("CREATE INDEX IF NOT EXISTS attendance_unsynced ON attendance (synced)")
+        self.db.execute("CREATE INDEX IF NOT EXISTS unidentified_unsynced ON unidentified (synced)")
+
+        self.roster = [json.loads(row[0]) for row in self.db.execute("SELECT record FROM roster")]
+        self.roster_updated_at = time.time() if self.roster else None
+
+    async def get_roster(self, force_refresh: bool = False) -> List[Dict[str, Any]]:
+        if self.upstream and (force_refresh or not self.roster):
+            roster = await self.upstream.get_roster(force_refresh=True)
+            await asyncio.to_thread(self.replace_roster, roster)
+        return self.roster
+
+    def replace_roster(self, roster: List[Dict[str, Any]]):
+        """Swap in a fresh roster, on disk and in memory"""
+        rows = [(str(person.get("Id")), json.dumps(person)) for person in roster if person is not None]
+        with self.lock:
+            self.db.execute("BEGIN")
+            try:
+                self.db.execute("DELETE FROM roster")
+                self.db.executemany("INSERT OR REPLACE INTO roster (id, record) VALUES (?, ?)", rows)
+                self.db.execute("COMMIT")
+            except Exception:
+                self.db.execute("ROLLBACK")
+                raise
+        self.roster = roster
+        self.roster_updated_at = time.time()
+
+    async def mark_attendance(self, person_id: Any, attendance_date: str) -> Dict[str, Any]:
+        with self.lock:
+            # A second join on the same day changes nothing
+            self.db.execute(
+                "INSERT OR IGNORE INTO attendance (person_id, date, marked_at) VALUES (?, ?, ?)",
+                (str(person_id), attendance_date, time.time())
+            )
+        return {"Id": str(person_id), attendance_date: "Yes", "stored": self.name}
+
+    async def log_unidentified(self, name: str, join_time: Optional[str], date: str) -> Dict[str, Any]:
+        with self.lock:
+            cursor = self.db.execute(
+                "INSERT INTO unidentified (name, join_time, date, created_at) VALUES (?, ?, ?, ?)",
+                (name, join_time, date, time.time())
+            )
+        return {"localId": cursor.lastrowid, "stored": self.name}
+
+    def unsynced_attendance(self, limit: int) -> List[tuple]:
+        with self.lock:
+            return self.db.execute(
+                "SELECT person_id, date FROM attendance WHERE synced = 0 ORDER BY marked_at LIMIT ?", (limit,)
+            ).fetchall()
+
+    def unsynced_unidentified(self, limit: int) -> List[tuple]:
+        with self.lock:
+            return self.db.execute(
+                "SELECT id, name, join_time, date FROM unidentified WHERE synced = 0 ORDER BY id LIMIT ?", (limit,)
+            ).fetchall()
+
+    def mark_attendance_synced(self, person_id: str, attendance_date: str):
+        with self.lock:
+            self.db.execute(
+                "UPDATE attendance SET synced = 1 WHERE person_id = ? AND date = ?", (person_id, attendance_date)
+            )
+
+    def mark_unidentified_synced(self, row_id: int):
+        with self.lock:
+            self.db.execute("UPDATE unidentified SET synced = 1 WHERE id = ?", (row_id,))
+
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            attendance = self.db.execute("SELECT COUNT(*) FROM attendance WHERE synced = 0").fetchone()[0]
+            unidentified = self.db.execute("SELECT COUNT(*) FROM unidentified WHERE synced = 0").fetchone()[0]
+        return {
+            "roster_size": len(self.roster),
+            "roster_age_seconds": round(time.time() - self.roster_updated_at, 1) if self.roster_updated_at else None,
+            "unsynced_attendance": attendance,
+            "unsynced_unidentified": unidentified,
+        }
+
+    def prune(self, before_date: str):
+        """Forget synced rows older than `before_date` (YYYY-MM-DD)"""
+        with self.lock:
+            self.db.execute("DELETE FROM attendance WHERE synced = 1 AND date < ?", (before_date,))
+            self.db.execute("DELETE FROM unidentified WHERE synced = 1 AND date < ?", (before_date,))
+
+
+class StoreReplicator:
+    """
+    Copies unsynced rows from a SQLiteStore to an upstream store and keeps
+    the local roster mirror fresh. A failed write stops the pass; the row
+    stays unsynced and is retried on the next one. A failed roster refresh
+    is retried after ROSTER_RETRY_SECONDS, doubling up to the refresh
+    interval, while the local copy keeps being served.
+    """
+
+    BATCH_SIZE = 200
+    ROSTER_RETRY_SECONDS = 30.0
+
+    def __init__(self, local: SQLiteStore, upstream: AttendanceStore, roster_refresh_seconds: float,
+                 retention_days: int):
+        self.local = local
+        self.upstream = upstream
+        self.roster_refresh_seconds = roster_refresh_seconds
+        self.retention_days = retention_days
+        self.last_sync_at: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.replicated = {"attendance": 0, "unidentified": 0}
+        self.roster_failures = 0
+        self.roster_retry_at = 0.0
+
+    async def refresh_roster_if_stale(self):
+        updated_at = self.local.roster_updated_at
+        if updated_at is not None and time.time() - updated_at < self.roster_refresh_seconds:
+            return
+        if time.time() < self.roster_retry_at:
+            return
+        try:
+            await self.local.get_roster(force_refresh=True)
+        except Exception:
+            self.roster_failures += 1
+            delay = min(self.ROSTER_RETRY_SECONDS * (2 ** (self.roster_failures - 1)),
+                        max(self.ROSTER_RETRY_SECONDS, self.roster_refresh_seconds))
+            self.roster_retry_at = time.time() + delay
+            raise
+        self.roster_failures = 0
+        self.roster_retry_at = 0.0
+        # Piggyback housekeeping on the (infrequent) roster refresh
+        cutoff = (datetime.date.today() - datetime.timedelta(days=self.retention_days)).isoformat()
+        await asyncio.to_thread(self.local.prune, cutoff)
+
+    async def replicate_once(self) -> Dict[str, int]:
+        pushed = {"attendance": 0, "unidentified": 0}
+        try:
+            await self.refresh_roster_if_stale()
+        except Exception as e:
+            logger.warning("Roster refresh from upstream failed, serving the local copy: %s", e)
+
+        try:
+            rows = await asyncio.to_thread(self.local.unsynced_attendance, self.BATCH_SIZE)
+            for person_id, attendance_date in rows:
+                await self.upstream.mark_attendance(person_id, attendance_date)
+                await asyncio.to_thread(self.local.mark_attendance_synced, person_id, attendance_date)
+                pushed["attendance"] += 1
+
+            rows = await asyncio.to_thread(self.local.unsynced_unidentified, self.BATCH_SIZE)
+            for row_id, name, join_time, date in rows:
+                await self.upstream.log_unidentified(name, join_time, date)
+                await asyncio.to_thread(self.local.mark_unidentified_synced, row_id)
+                pushed["unidentified"] += 1
+            self.last_error = None
+        except Exception as e:
+            self.last_error = str(e)
+            logger.warning("Replication to %s failed, will retry: %s", self.upstream.name, e)
+
+        for key, count in pushed.items():
+            self.replicated[key] += count
+        self.last_sync_at = time.time()
+        if pushed["attendance"] or pushed["unidentified"]:
+            logger.info("Replicated local writes upstream", extra=pushed)
+        return pushed
+
+    async def drain(self, timeout: float) -> int:
+        """Replicate until nothing is unsynced or `timeout` passes; returns how many rows are left"""
+        deadline = time.monotonic() + timeout
+        while True:
+            stats = await asyncio.to_thread(self.local.stats)
+            remaining = stats["unsynced_attendance"] + stats["unsynced_unidentified"]
+            if not remaining or time.monotonic() >= deadline:
+                return remaining
+            pushed = await self.replicate_once()
+            if not pushed["attendance"] and not pushed["unidentified"]:
+                await asyncio.sleep(min(1.0, max(0.0, deadline - time.monotonic())))
+
+    async def run(self, interval: float):
+        while True:
+            pushed = await self.replicate_once()
+            if pushed["attendance"] < self.BATCH_SIZE and pushed["unidentified"] < self.BATCH_SIZE:
+                # Caught up (or failing): wait; otherwise keep draining
+                await asyncio.sleep(interval)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self.local.stats(),
+            "replicated": dict(self.replicated),
+            "last_sync_age_seconds": round(time.time() - self.last_sync_at, 1) if self.last_sync_at else None,
+            "last_error": self.last_error,
+        }
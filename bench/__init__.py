@@ -0,0 +1 @@
+"""Offline stand-ins, load generators and benchmarks (not part of the service image)."""
@@ -0,0 +1,326 @@
+"""
+Synthetic roster and labeled Zoom display-name corpus generator.
+
+Writes a seeded roster (rows with Id, firstName, lastName and, for a share of
+people, spiritualName) and a corpus of join names, each labeled with the
+roster Id it belongs to (null for guests and bare device names) and the kind
+of noise applied:
+
+    exact            "Sarah Thompson"
+    case             "sarah thompson ", "SARAH THOMPSON"
+    reversed         "Thompson Sarah", "Thompson, Sarah"
+    nickname         "Bob Miller" for Robert Miller
+    initials         "S. Thompson", "Sarah T.", "ST"
+    first_only       "Sarah"
+    spiritual        "Ananda", "Sarah Thompson (Ananda)", "Ananda (Sarah)"
+    transliteration  "Aleksandr Petrov", "Mueller", "Алексей Смирнов"
+    typo             "Sarha Thompson"
+    device           "Sarah's iPhone", "Sarah Thompson - iPad"
+    device_only      "iPhone", "DESKTOP-7KQ2M4X"  (label: null)
+    guest            a name from outside the roster (label: null)
+
+A corpus entry is {"zoom_name", "person_id", "noise", "ambiguous"}; ambiguous
+marks names whose exact/reversed/spiritual form belongs to more than one
+roster person. The roster loads into the NocoDB stand-in (--roster) and the
+corpus feeds bench.loadgen --names, bench.join_benchmark --corpus and the
+matching evaluation.
+
+Usage:
+    python -m bench.corpus --roster-size 10000 --joins 5000 --seed 7 --out-dir bench/data
+    python -m bench.corpus --roster-size 1000 --mix exact=1,nickname=1,guest=0.5 --standin http://127.0.0.1:8090
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import sys
+import unicodedata
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+import requests
+
+from bench.nocodb_standin import ROSTER_TABLE_ID, roster_tables
+
+logger = logging.getLogger("zoom_attendance.bench.corpus")
+
+# First names with the nicknames people actually type into Zoom
+NICKNAMES: Dict[str, List[str]] = {
+    "Robert": ["Bob", "Rob", "Bobby"], "William": ["Bill", "Will", "Billy"], "Richard": ["Rick", "Dick", "Rich"],
+    "James": ["Jim", "Jimmy", "Jamie"], "John": ["Johnny", "Jack"], "Michael": ["Mike", "Mikey"],
+    "Thomas": ["Tom", "Tommy"], "Christopher": ["Chris", "Topher"], "Daniel": ["Dan", "Danny"],
+    "Matthew": ["Matt"], "Anthony": ["Tony"], "Joseph": ["Joe", "Joey"], "Charles": ["Charlie", "Chuck"],
+    "Edward": ["Ed", "Eddie", "Ted"], "Nicholas": ["Nick", "Nicky"], "Benjamin": ["Ben", "Benji"],
+    "Alexander": ["Alex", "Sasha"], "Jonathan": ["Jon"], "Samuel": ["Sam", "Sammy"], "Patrick": ["Pat", "Paddy"],
+    "Timothy": ["Tim"], "Stephen": ["Steve"], "Gregory": ["Greg"], "Kenneth": ["Ken", "Kenny"],
+    "Elizabeth": ["Liz", "Beth", "Betsy", "Lizzie"], "Katherine": ["Kate", "Kathy", "Katie"],
+    "Margaret": ["Maggie", "Peggy", "Meg"], "Jennifer": ["Jen", "Jenny"], "Rebecca": ["Becky", "Becca"],
+    "Victoria": ["Vicky", "Tori"], "Patricia": ["Pat", "Patty", "Trish"], "Susan": ["Sue", "Susie"],
+    "Deborah": ["Deb", "Debbie"], "Christina": ["Chris", "Tina"], "Abigail": ["Abby"], "Jessica": ["Jess"],
+    "Samantha": ["Sam"], "Alexandra": ["Alex", "Sasha", "Lexi"], "Theodora": ["Teddy", "Thea"],
+    "Dorothy": ["Dot", "Dottie"], "Barbara": ["Barb", "Babs"], "Pamela": ["Pam"], "Natalia": ["Natasha", "Tasha"],
+    "Ekaterina": ["Katya"], "Dmitry": ["Dima"], "Vladimir": ["Vova", "Volodya"], "Francisco": ["Paco", "Pancho"],
+    "José": ["Pepe"], "Guillermo": ["Memo"], "Giuseppe": ["Beppe"], "Johannes": ["Hannes"],
+}
+PLAIN_FIRST_NAMES = [
+    "Sarah", "Emma", "Olivia", "Sophia", "Isabella", "Mia", "Charlotte", "Amelia", "Harper", "Evelyn", "Grace",
+    "Chloe", "Hannah", "Laura", "Rachel", "Anna", "Julia", "Claire", "Helen", "Ruth", "Nora", "Ingrid", "Astrid",
+    "Priya", "Ananya", "Meera", "Aisha", "Fatima", "Leila", "Yuki", "Mei", "Hana", "Ji-woo", "Chiara", "Lucía",
+    "Zoë", "Noémie", "Françoise", "Siobhan", "Aoife", "David", "Peter", "Paul", "Mark", "Andrew", "Brian", "Kevin",
+    "Jason", "Ryan", "Eric", "Adam", "Noah", "Liam", "Ethan", "Lucas", "Oliver", "Henry", "Arjun", "Rahul",
+    "Vikram", "Omar", "Karim", "Hiroshi", "Kenji", "Wei", "Min-jun", "Luca", "Matteo", "Mateo", "Santiago",
+    "Björn", "Lars", "Søren", "Jürgen", "Stefan", "Pierre", "Étienne", "Seán", "Ciarán", "Kwame", "Chidi", "Tunde",
+]
+# Names that are commonly romanized more than one way
+TRANSLITERATIONS: Dict[str, List[str]] = {
+    "Aleksandr": ["Alexander", "Alexandr", "Oleksandr"], "Sergei": ["Sergey", "Serguei", "Serhiy"],
+    "Natalia": ["Natalya", "Nataliya"], "Mohammed": ["Muhammad", "Mohamed", "Mohammad"], "Yuri": ["Yury", "Iurii"],
+    "Dmitry": ["Dmitri", "Dmitrii"], "Elena": ["Yelena", "Olena"], "Olga": ["Olha"], "Tatiana": ["Tatyana", "Tetiana"],
+    "Andrei": ["Andrey", "Andrii"], "Mikhail": ["Michail", "Mykhailo"], "Aleksei": ["Alexei", "Alexey", "Oleksiy"],
+    "Yevgeny": ["Evgeny", "Evgenii", "Eugene"], "Ekaterina": ["Yekaterina", "Kateryna"], "Ksenia": ["Xenia", "Kseniya"],
+    "Nikolai": ["Nikolay", "Mykola"], "Svetlana": ["Svitlana"], "Yulia": ["Julia", "Iuliia"],
+    "Vladimir": ["Wladimir", "Volodymyr"], "Hussein": ["Hussain", "Husain"], "Abdullah": ["Abdallah"],
+    "Zhang": ["Chang"], "Xu": ["Hsu"], "Choi": ["Choe"], "Lee": ["Yi", "Rhee"],
+    "Ivanov": ["Ivanoff"], "Smirnov": ["Smirnoff"], "Kuznetsov": ["Kuznetsoff"], "Popov": ["Popoff"],
+    "Tchaikovsky": ["Chaikovsky", "Tschaikowsky"],
+}
+LAST_NAMES = [
+    "Smith", "Johnson", "Williams", "Brown", "Jones", "Miller", "Davis", "Wilson", "Anderson", "Taylor", "Thomas",
+    "Moore", "Martin", "Jackson", "Thompson", "White", "Harris", "Clark", "Lewis", "Robinson", "Walker", "Young",
+    "Allen", "King", "Wright", "Scott", "Hill", "Green", "Adams", "Baker", "Nelson", "Carter", "Mitchell", "Roberts",
+    "Campbell", "Parker", "Evans", "Edwards", "Collins", "Stewart", "Morris", "Murphy", "Cook", "Rogers", "Morgan",
+    "Cooper", "Peterson", "Reed", "Bailey", "Kelly", "Howard", "Ward", "Cox", "Richardson", "Wood", "Brooks",
+    "Bennett", "Gray", "Hughes", "Price", "Sanders", "Myers", "Long", "Ross", "Foster", "Fitzgerald", "O'Brien",
+    "O'Sullivan", "McAllister", "MacDonald", "García", "Martínez", "Rodríguez", "López", "Hernández", "González",
+    "Pérez", "Sánchez", "Ramírez", "Núñez", "Peña", "Müller", "Schröder", "Schmidt", "Weiß", "Fischer", "Krüger",
+    "Lefèvre", "Dubois", "Moreau", "Rossi", "Bianchi", "Ferrari", "Esposito", "Kowalski", "Nowak", "Dvořák",
+    "Kovač", "Horváth", "Nagy", "Jensen", "Nielsen", "Øberg", "Lindqvist", "Johansson", "Virtanen", "Korhonen",
+    "Patel", "Sharma", "Singh", "Gupta", "Iyer", "Reddy", "Nair", "Khan", "Ahmed", "Hassan", "Haddad", "Nasser",
+    "Cohen", "Levi", "Friedman", "Tanaka", "Suzuki", "Watanabe", "Nakamura", "Kim", "Park", "Wang", "Li", "Chen",
+    "Liu", "Huang", "Nguyen", "Tran", "Pham", "Okafor", "Adeyemi", "Mensah", "Mwangi", "da Silva", "dos Santos",
+    "Oliveira", "van der Berg", "de Vries", "van Dijk",
+]
+SPIRITUAL_NAMES = [
+    "Ananda", "Shanti", "Prema", "Devi", "Hari", "Rama", "Sita", "Krishna Das", "Hari Priya", "Gopal", "Govinda",
+    "Radha", "Saraswati", "Lakshmi", "Parvati", "Shankar", "Shiva Das", "Ram Dass", "Bhakti", "Mukti", "Jyoti",
+    "Tara", "Uma", "Kali", "Durga", "Ganga", "Narayan", "Vishnu Priya", "Gauri", "Kamala", "Padma", "Amrita",
+    "Satya", "Dharma", "Karuna", "Maitri", "Sadhana", "Sundari", "Chandra", "Surya", "Indira", "Mirabai",
+    "Tulsi", "Yamuna", "Bhagavan Das", "Atma", "Sharada", "Nirmala", "Vidya", "Gayatri",
+]
+# What Zoom shows for people who never set a display name
+DEVICES = ["iPhone", "iPad", "Galaxy S23", "Pixel 7", "Samsung SM-G991B", "MacBook Pro", "Zoom user",
+           "Android", "Chromebook", "HP Laptop"]
+NOISE_MIX: Dict[str, float] = {
+    "exact": 0.30, "case": 0.06, "reversed": 0.06, "nickname": 0.08, "initials": 0.07, "first_only": 0.04,
+    "spiritual": 0.07, "transliteration": 0.05, "typo": 0.07, "device": 0.05, "device_only": 0.03, "guest": 0.12,
+}
+UNLABELED = ("device_only", "guest")
+CYRILLIC = [("shch", "щ"), ("zh", "ж"), ("kh", "х"), ("ts", "ц"), ("ch", "ч"), ("sh", "ш"), ("yu", "ю"),
+            ("ya", "я"), ("ye", "е"), ("yo", "ё"), ("a", "а"), ("b", "б"), ("v", "в"), ("g", "г"), ("d", "д"),
+            ("e", "е"), ("z", "з"), ("i", "и"), ("y", "й"), ("k", "к"), ("l", "л"), ("m", "м"), ("n", "н"),
+            ("o", "о"), ("p", "п"), ("r", "р"), ("s", "с"), ("t", "т"), ("u", "у"), ("f", "ф")]
+GERMAN_SPELLING = {"ä": "ae", "ö": "oe", "ü": "ue", "Ä": "Ae", "Ö": "Oe", "Ü": "Ue", "ø": "oe", "Ø": "Oe"}
+LETTER_SPELLING = {"ß": "ss", "ø": "o", "Ø": "O", "æ": "ae", "đ": "d", "ł": "l"}
+SLAVIC_FIRST_NAMES = ["Aleksandr", "Sergei", "Natalia", "Yuri", "Dmitry", "Elena", "Olga", "Tatiana", "Andrei",
+                      "Mikhail", "Aleksei", "Yevgeny", "Ekaterina", "Ksenia", "Nikolai", "Svetlana", "Yulia", "Vladimir"]
+TRANSLITERATED_FIRST_NAMES = SLAVIC_FIRST_NAMES + ["Mohammed", "Hussein", "Abdullah"]
+TRANSLITERATED_LAST_NAMES = ["Zhang", "Xu", "Choi", "Lee", "Ivanov", "Smirnov", "Kuznetsov", "Popov", "Tchaikovsky"]
+FIRST_NAMES = sorted(set(NICKNAMES) | set(PLAIN_FIRST_NAMES) | set(TRANSLITERATED_FIRST_NAMES))
+SURNAMES = LAST_NAMES + TRANSLITERATED_LAST_NAMES
+
+
+def ascii_name(name: str, rng: random.Random) -> str:
+    """The name as typed on a keyboard without accents: "Müller" -> "Muller" or "Mueller" """
+    if rng.random() < 0.5:
+        name = "".join(GERMAN_SPELLING.get(c, c) for c in name)
+    stripped = "".join(c for c in unicodedata.normalize("NFKD", name) if not unicodedata.combining(c))
+    return "".join(LETTER_SPELLING.get(c, c) for c in stripped)
+
+
+def to_cyrillic(name: str) -> str:
+    """Rough Latin-to-Cyrillic rendering, the way a Russian-locale device would show the name"""
+    out, rest = [], name.lower()
+    while rest:
+        for latin, cyrillic in CYRILLIC:
+            if rest.startswith(latin):
+                out.append(cyrillic)
+                rest = rest[len(latin):]
+                break
+        else:
+            out.append(rest[0])
+            rest = rest[1:]
+    return "".join(out).capitalize()
+
+
+def generate_roster(size: int, rng: random.Random, spiritual_share: float = 0.3,
+                    double_surname_share: float = 0.08) -> List[Dict[str, Any]]:
+    """`size` people with Ids 1..size; a share carry a spiritual name or a hyphenated surname"""
+    roster = []
+    for person_id in range(1, size + 1):
+        last = rng.choice(SURNAMES)
+        if rng.random() < double_surname_share:
+            last = f"{last}-{rng.choice(LAST_NAMES)}"
+        roster.append({
+            "Id": person_id,
+            "firstName": rng.choice(FIRST_NAMES),
+            "lastName": last,
+            "spiritualName": rng.choice(SPIRITUAL_NAMES) if rng.random() < spiritual_share else None,
+        })
+    return roster
+
+
+def typo(name: str, rng: random.Random) -> str:
+    letters = [i for i, c in enumerate(name) if c.isalpha()]
+    if len(letters) < 4:
+        return name + name[-1]
+    i = rng.choice(letters[1:-1])
+    edit = rng.choice(("swap", "drop", "double"))
+    if edit == "swap":
+        return name[:i] + name[i + 1] + name[i] + name[i + 2:]
+    if edit == "drop":
+        return name[:i] + name[i + 1:]
+    return name[:i] + name[i] + name[i:]
+
+
+def noisy_name(person: Dict[str, Any], kind: str, rng: random.Random) -> Optional[str]:
+    """Display name for `person` with one kind of noise, or None if that kind does not apply to them"""
+    first, last, spiritual = person["firstName"], person["lastName"], person.get("spiritualName")
+    full = f"{first} {last}"
+    if kind == "exact":
+        return full
+    if kind == "case":
+        return rng.choice((full.lower(), full.upper(), f" {full}  ", full.lower() + " "))
+    if kind == "reversed":
+        return rng.choice((f"{last} {first}", f"{last}, {first}", f"{last.upper()} {first}"))
+    if kind == "nickname":
+        if first not in NICKNAMES:
+            return None
+        return f"{rng.choice(NICKNAMES[first])} {last}"
+    if kind == "initials":
+        return rng.choice((f"{first[0]}. {last}", f"{first} {last[0]}.", f"{first[0]}{last[0]}", f"{first} {last[0]}"))
+    if kind == "first_only":
+        return first
+    if kind == "spiritual":
+        if not spiritual:
+            return None
+        return rng.choice((spiritual, f"{full} ({spiritual})", f"{spiritual} ({first})", f"{spiritual} {last}"))
+    if kind == "transliteration":
+        if first in TRANSLITERATIONS or last in TRANSLITERATIONS:
+            if first in SLAVIC_FIRST_NAMES and rng.random() < 0.3:
+                return f"{to_cyrillic(first)} {to_cyrillic(last)}"
+            first = rng.choice(TRANSLITERATIONS.get(first, [first]))
+            last = rng.choice(TRANSLITERATIONS.get(last, [last]))
+            return f"{first} {last}"
+        plain = ascii_name(full, rng)
+        return plain if plain != full else None
+    if kind == "typo":
+        return f"{typo(first, rng)} {last}" if rng.random() < 0.5 else f"{first} {typo(last, rng)}"
+    if kind == "device":
+        return rng.choice((f"{first}'s {rng.choice(DEVICES[:5])}", f"{full} - {rng.choice(DEVICES[:4])}",
+                           f"{first} ({rng.choice(DEVICES[:5])})"))
+    raise ValueError(f"Unknown noise kind: {kind}")
+
+
+def unlabeled_name(kind: str, rng: random.Random) -> str:
+    if kind == "device_only":
+        return rng.choice(DEVICES + [f"DESKTOP-{rng.randrange(16 ** 7):07X}", f"LAPTOP-{rng.randrange(16 ** 6):06X}"])
+    # Guests draw from the same pools, so some collide with roster first or last names
+    return f"{rng.choice(PLAIN_FIRST_NAMES)} {rng.choice(['Guest', 'Visitor'] + LAST_NAMES)}"
+
+
+def canonical_counts(roster: List[Dict[str, Any]]) -> Counter:
+    """How many people each exact, reversed or spiritual name (lowercased) could refer to"""
+    counts: Counter = Counter()
+    for person in roster:
+        forms = {f"{person['firstName']} {person['lastName']}".lower(), f"{person['lastName']} {person['firstName']}".lower()}
+        if person.get("spiritualName"):
+            forms.add(person["spiritualName"].lower())
+        counts.update(forms)
+    return counts
+
+
+def generate_corpus(roster: List[Dict[str, Any]], joins: int, rng: random.Random,
+                    mix: Optional[Dict[str, float]] = None) -> List[Dict[str, Any]]:
+    """`joins` labeled display names; noise kinds are drawn by weight from `mix`"""
+    mix = mix or NOISE_MIX
+    kinds, weights = list(mix), list(mix.values())
+    counts = canonical_counts(roster)
+    corpus = []
+    while len(corpus) < joins:
+        kind = rng.choices(kinds, weights)[0]
+        if kind in UNLABELED:
+            name = unlabeled_name(kind, rng)
+            person_id = None
+        else:
+            person = rng.choice(roster)
+            name = noisy_name(person, kind, rng)
+            if name is None:
+                continue
+            person_id = person["Id"]
+        corpus.append({
+            "zoom_name": name,
+            "person_id": person_id,
+            "noise": kind,
+            "ambiguous": counts[" ".join(name.split()).lower()] > 1,
+        })
+    return corpus
+
+
+def parse_mix(value: str) -> Dict[str, float]:
+    mix = {}
+    for item in value.split(","):
+        kind, _, weight = item.partition("=")
+        if kind not in NOISE_MIX:
+            raise argparse.ArgumentTypeError(f"Unknown noise kind {kind!r} (choose from {', '.join(NOISE_MIX)})")
+        mix[kind] = float(weight or 1)
+    return mix
+
+
+def load_corpus(path: str) -> List[Dict[str, Any]]:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def write_json(path: str, data: Any):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=1)
+        f.write("\n")
+
+
+def push_to_standin(url: str, roster: List[Dict[str, Any]], roster_table: str = ROSTER_TABLE_ID):
+    """Replace the roster (and matching attendance rows) in a running NocoDB stand-in"""
+    for table_id, rows in roster_tables(roster, roster_table).items():
+        response = requests.put(f"{url.rstrip('/')}/_standin/tables/{table_id}", json=rows, timeout=120)
+        response.raise_for_status()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Generate a synthetic roster and labeled Zoom name corpus")
+    parser.add_argument("--roster-size", type=int, default=1000)
+    parser.add_argument("--joins", type=int, default=2000, help="Corpus entries to generate")
+    parser.add_argument("--spiritual-share", type=float, default=0.3, help="Share of people with a spiritualName")
+    parser.add_argument("--mix", type=parse_mix, help="Noise weights, e.g. exact=3,nickname=1,guest=1 (default: built-in)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--out-dir", default="bench/data", help="Where roster.json and corpus.json go")
+    parser.add_argument("--standin", metavar="URL", help="Also load the roster into a running NocoDB stand-in")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    roster = generate_roster(args.roster_size, rng, args.spiritual_share)
+    corpus = generate_corpus(roster, args.joins, rng, args.mix)
+    write_json(os.path.join(args.out_dir, "roster.json"), roster)
+    write_json(os.path.join(args.out_dir, "corpus.json"), corpus)
+    kinds = Counter(entry["noise"] for entry in corpus)
+    logger.info("Wrote %d people and %d join names to %s (%s)", len(roster), len(corpus), args.out_dir,
+                ", ".join(f"{kind}={count}" for kind, count in kinds.most_common()))
+    if args.standin:
+        push_to_standin(args.standin, roster)
+        logger.info("Loaded roster into %s", args.standin)
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    sys.exit(main())
@@ -0,0 +1,359 @@
+"""
+End-to-end benchmark of the participant-join hot path.
+
+Starts the service with uvicorn in a subprocess, pointed at the in-process
+NocoDB and OpenAI stand-ins, and drives signed `meeting.participant_joined`
+webhooks at it with the load generator. A case is one roster size at one
+join rate, so each request covers verify -> parse -> roster -> match -> write
+(writes end at the outbox unless --inline-writes is given). Rosters and join
+names come from bench.corpus: generated per --rosters size with the same seed,
+or read from --roster/--corpus files.
+
+For every case the result records webhook latency percentiles, achieved
+throughput, error rate and the stand-in calls it caused. Results are written
+as JSON; commit them as the baseline and compare later runs against it:
+
+    python -m bench.join_benchmark --rosters 100,1000,10000,100000 --rates 1,10,100,1000 \
+        --seconds 30 --max-events 500 --save bench/baselines/join_path.json
+    python -m bench.join_benchmark --rosters 100,1000,10000,100000 --rates 1,10,100,1000 \
+        --seconds 30 --max-events 500 --compare bench/baselines/join_path.json --tolerance 0.25
+
+Cases the machine cannot keep up with are marked "saturated" and are not
+gated on.
+
+Usage:
+    python -m bench.join_benchmark --rosters 100,1000,10000,100000 --rates 1,10,100,1000 --seconds 5
+    python -m bench.join_benchmark --rosters 1000 --rates 100 --ai-latency-ms 400 --env USE_AI_MATCHING=false
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import logging
+import os
+import platform
+import random
+import secrets
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+
+import requests
+
+from bench import loadgen
+from bench.corpus import generate_corpus, generate_roster, load_corpus
+from bench.nocodb_standin import NocoDBStandin, load_rows, roster_tables
+from bench.nocodb_standin import create_app as nocodb_app
+from bench.openai_standin import Behavior, OpenAIStandin
+from bench.openai_standin import create_app as openai_app
+from bench.server import StandinServer, state_env
+
+logger = logging.getLogger("zoom_attendance.bench.join_benchmark")
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_SCHEMA = 1
+# A case that keeps up with less than this share of its join rate (or has errors) is saturated: its
+# latencies measure queueing on the benchmark machine, so it is reported but never gated on
+SATURATION_THROUGHPUT_RATIO = 0.9
+
+
+def join_names(corpus: List[Dict[str, Any]], count: int, seed: int) -> List[str]:
+    """`count` display names drawn from the labeled corpus"""
+    rng = random.Random(seed)
+    return [rng.choice(corpus)["zoom_name"] for _ in range(count)]
+
+
+def join_events(names: List[str]) -> List[Tuple[float, str, Dict[str, Any]]]:
+    """One participant_joined event per name, each a distinct participant (nothing is deduplicated)"""
+    now = datetime.datetime.now(datetime.timezone.utc)
+    meeting = {
+        "id": "8800000001", "uuid": f"bench{uuid.uuid4().hex[:16]}==", "host_id": "hbench==", "type": 8,
+        "topic": "Join path benchmark", "start_time": loadgen.zoom_time(now), "duration": 60, "timezone": "UTC",
+    }
+    events = []
+    for index, name in enumerate(names):
+        participant = {
+            "user_id": str(10 ** 7 + index), "user_name": name, "participant_uuid": str(uuid.uuid4()).upper(),
+            "public_ip": "10.0.0.1", "email": "bench@example.com",
+        }
+        payload = loadgen.participant_joined(meeting, participant, now + datetime.timedelta(milliseconds=index))
+        events.append((float(index), payload["event"], payload))
+    return events
+
+
+class ServiceProcess:
+    """The service under test, run with uvicorn like the Docker image does"""
+
+    def __init__(self, env: Dict[str, str], port: int):
+        self.env = env
+        self.port = port
+        self.url = f"http://127.0.0.1:{port}"
+        self.process: Optional[subprocess.Popen] = None
+
+    def start(self, timeout: float = 30.0):
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "zoom_attendance:app", "--host", "127.0.0.1",
+             "--port", str(self.port), "--log-level", "warning", "--no-access-log"],
+            cwd=REPO_DIR, env=self.env,
+        )
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"Service exited with code {self.process.returncode}")
+            try:
+                if requests.get(f"{self.url}/test", timeout=1).status_code == 200:
+                    return
+            except requests.RequestException:
+                pass
+            time.sleep(0.2)
+        raise RuntimeError("Service did not start")
+
+    def stop(self):
+        if self.process and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(15)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+
+
+def free_port() -> int:
+    import socket
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def route_deltas(before: Dict[str, int], after: Dict[str, int]) -> Dict[str, int]:
+    return {route: count - before.get(route, 0) for route, count in after.items() if count - before.get(route, 0)}
+
+
+class JoinBenchmark:
+    def __init__(self, args: argparse.Namespace):
+        self.args = args
+        self.token = secrets.token_hex(16)
+        self.workdir = tempfile.mkdtemp(prefix="join-bench-")
+        self.nocodb = NocoDBStandin(seed=args.seed)
+        self.nocodb.faults.latency_ms = args.nocodb_latency_ms
+        self.openai = OpenAIStandin(behavior=Behavior(latency="lognormal" if args.ai_latency_ms else "fixed",
+                                                      latency_ms=args.ai_latency_ms, latency_spread=0.3),
+                                    seed=args.seed)
+        self.servers: List[StandinServer] = []
+        self.service: Optional[ServiceProcess] = None
+
+    def service_env(self, nocodb_url: str, openai_url: str) -> Dict[str, str]:
+        env = dict(os.environ)
+        env.update({
+            "NOCODB_URL": nocodb_url,
+            "NOCODB_TOKEN": "bench",
+            "OPENAI_API_KEY": "bench",
+            "OPENAI_BASE_URL": f"{openai_url}/v1",
+            "USE_AI_MATCHING": "true",
+            "ZOOM_WEBHOOK_SECRET_1": f"{self.token}|true",
+            "API_KEY_ENABLED": "false",
+            "LOG_LEVEL": "WARNING",
+            "CONFIG_WATCH_INTERVAL_SECONDS": "0",
+            "OUTBOX_ENABLED": "false" if self.args.inline_writes else "true",
+            **state_env(self.workdir),
+        })
+        for item in self.args.env or []:
+            key, _, value = item.partition("=")
+            env[key] = value
+        return env
+
+    def start(self):
+        nocodb = StandinServer(nocodb_app(self.nocodb), name="nocodb-standin").start()
+        openai = StandinServer(openai_app(self.openai), name="openai-standin").start()
+        self.servers = [nocodb, openai]
+        self.service = ServiceProcess(self.service_env(nocodb.url, openai.url), free_port())
+        self.service.start()
+
+    def stop(self):
+        if self.service:
+            self.service.stop()
+        for server in self.servers:
+            server.stop()
+
+    def rosters(self) -> List[Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]]:
+        """(roster, corpus) per case group: the given files, or one generated pair per --rosters size"""
+        if self.args.roster:
+            roster = load_rows(self.args.roster)
+            corpus = load_corpus(self.args.corpus) if self.args.corpus else generate_corpus(
+                roster, self.args.max_events, random.Random(self.args.seed))
+            return [(roster, corpus)]
+        pairs = []
+        for size in self.args.rosters:
+            rng = random.Random(self.args.seed)
+            roster = generate_roster(size, rng)
+            pairs.append((roster, generate_corpus(roster, self.args.max_events, rng)))
+        return pairs
+
+    def load_roster(self, roster: List[Dict[str, Any]]) -> float:
+        """Install a roster in the stand-in and time the service's full (paginated) reload"""
+        for table_id, rows in roster_tables(roster).items():
+            self.nocodb.load_table(table_id, rows)
+        started = time.perf_counter()
+        response = requests.post(f"{self.service.url}/refresh-roster", timeout=600)
+        response.raise_for_status()
+        return time.perf_counter() - started
+
+    def run_case(self, corpus: List[Dict[str, Any]], rate: float) -> Dict[str, Any]:
+        count = min(max(1, int(rate * self.args.seconds)), self.args.max_events)
+        names = join_names(corpus, count, self.args.seed)
+        nocodb_before = dict(self.nocodb.stats()["by_route"])
+        openai_before = self.openai.call_count
+
+        generator = loadgen.LoadGenerator(f"{self.service.url}/zoom/webhook_1", self.token, rate,
+                                          self.args.concurrency, timeout=self.args.timeout)
+        report = asyncio.run(generator.run(join_events(names)))
+        overall = report["overall"]
+        throughput = report["throughput_per_second"]
+        return {
+            "rate": rate,
+            "joins": count,
+            "elapsed_seconds": report["elapsed_seconds"],
+            "throughput_per_second": throughput,
+            "error_rate": overall["error_rate"],
+            "statuses": overall["statuses"],
+            "latency_ms": overall["latency_ms"],
+            "nocodb_calls": route_deltas(nocodb_before, self.nocodb.stats()["by_route"]),
+            "openai_calls": self.openai.call_count - openai_before,
+            "saturated": bool(overall["error_rate"] or not throughput
+                              or throughput < rate * SATURATION_THROUGHPUT_RATIO),
+        }
+
+    def run(self) -> Dict[str, Any]:
+        cases = []
+        env = environment()  # the code the service is started from, not whatever HEAD is at the end
+        self.start()
+        try:
+            for roster, corpus in self.rosters():
+                size = len(roster)
+                load_seconds = self.load_roster(roster)
+                logger.info("Roster of %d loaded in %.2fs", size, load_seconds)
+                for rate in self.args.rates:
+                    case = {"roster_size": size, "roster_load_seconds": round(load_seconds, 3),
+                            **self.run_case(corpus, rate)}
+                    latency = case["latency_ms"]
+                    logger.info("roster=%-6d rate=%-5g joins=%-5d p50=%.1fms p95=%.1fms p99=%.1fms "
+                                "throughput=%.1f/s errors=%.2f%%%s", size, rate, case["joins"], latency["p50"] or 0,
+                                latency["p95"] or 0, latency["p99"] or 0, case["throughput_per_second"] or 0,
+                                case["error_rate"] * 100, " (saturated)" if case["saturated"] else "")
+                    cases.append(case)
+        finally:
+            self.stop()
+        return {
+            "schema": BASELINE_SCHEMA,
+            "benchmark": "join_path",
+            "created_at": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+            "environment": env,
+            "settings": {
+                "seconds": self.args.seconds,
+                "max_events": self.args.max_events,
+                "concurrency": self.args.concurrency,
+                "roster": self.args.roster,
+                "corpus": self.args.corpus,
+                "nocodb_latency_ms": self.args.nocodb_latency_ms,
+                "ai_latency_ms": self.args.ai_latency_ms,
+                "inline_writes": self.args.inline_writes,
+                "env": self.args.env or [],
+                "seed": self.args.seed,
+            },
+            "cases": cases,
+        }
+
+
+def environment() -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR,
+                                capture_output=True, text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "commit": commit,
+    }
+
+
+def compare(result: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """
+    Human-readable regressions of `result` against `baseline` (same roster
+    size and rate). Cases that were saturated in the baseline are skipped.
+    """
+    base_cases = {(case["roster_size"], case["rate"]): case for case in baseline.get("cases", [])}
+    regressions = []
+    for case in result["cases"]:
+        base = base_cases.get((case["roster_size"], case["rate"]))
+        if not base:
+            continue
+        label = f"roster={case['roster_size']} rate={case['rate']:g}"
+        if base.get("saturated"):
+            logger.info("Not gating %s: saturated in the baseline", label)
+            continue
+        for key in ("p50", "p95", "p99"):
+            now, before = case["latency_ms"][key], base["latency_ms"][key]
+            if now is not None and before and now > before * (1 + tolerance):
+                regressions.append(f"{label}: {key} {before:.1f}ms -> {now:.1f}ms")
+        now, before = case["throughput_per_second"], base["throughput_per_second"]
+        if now is not None and before and now < before * (1 - tolerance):
+            regressions.append(f"{label}: throughput {before:.1f}/s -> {now:.1f}/s")
+        if case["error_rate"] > base["error_rate"] + 0.01:
+            regressions.append(f"{label}: error rate {base['error_rate']:.2%} -> {case['error_rate']:.2%}")
+    return regressions
+
+
+def number_list(value: str) -> List[float]:
+    return [float(item) if "." in item else int(item) for item in value.split(",") if item.strip()]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="End-to-end participant-join benchmark against local stand-ins")
+    parser.add_argument("--rosters", type=number_list, default=[100, 1000, 10000, 100000], help="Roster sizes")
+    parser.add_argument("--rates", type=number_list, default=[1, 10, 100, 1000], help="Joins per second")
+    parser.add_argument("--seconds", type=float, default=5, help="Length of each case at its join rate")
+    parser.add_argument("--max-events", type=int, default=1000, help="Cap on joins per case")
+    parser.add_argument("--concurrency", type=int, default=256, help="Max webhooks in flight")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Per-request timeout")
+    parser.add_argument("--roster", help="Roster file from bench.corpus (replaces --rosters)")
+    parser.add_argument("--corpus", help="Labeled join names from bench.corpus (default: generated with the roster)")
+    parser.add_argument("--nocodb-latency-ms", type=float, default=0.0)
+    parser.add_argument("--ai-latency-ms", type=float, default=0.0, help="Median stand-in AI latency (lognormal)")
+    parser.add_argument("--inline-writes", action="store_true", help="Disable the outbox so writes hit NocoDB inline")
+    parser.add_argument("--env", action="append", metavar="KEY=VALUE", help="Extra service setting (repeatable)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--save", metavar="FILE", help="Write the results (e.g. as the new baseline)")
+    parser.add_argument("--compare", metavar="FILE", help="Baseline to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative slowdown before failing")
+    args = parser.parse_args(argv)
+
+    result = JoinBenchmark(args).run()
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+            f.write("\n")
+        logger.info("Results written to %s", args.save)
+    else:
+        print(json.dumps(result, indent=2))
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(result, baseline, args.tolerance)
+        for line in regressions:
+            logger.warning("Regression: %s", line)
+        if regressions:
+            return 1
+        logger.info("No regressions against %s (tolerance %.0f%%)", args.compare, args.tolerance * 100)
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    sys.exit(main())
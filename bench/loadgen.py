@@ -0,0 +1,393 @@
+"""
+Headless load generator for the Zoom webhook endpoints.
+
+Simulates N concurrent meetings. Each one sends `meeting.started`, then a join
+storm (most participants join in the first minutes, a few late, some drop
+and rejoin), chat messages, a leave storm and `meeting.ended`. Payloads have
+the same shape as ref_scripts/WH_Sender.py's get_webhook_payload. Every
+request is signed like Zoom does (`x-zm-signature`, `x-zm-request-timestamp`)
+with the token configured for the target endpoint.
+
+Events are sent in scenario order either open-loop at a fixed rate
+(--rate) or closed-loop with a fixed number of requests in flight
+(--concurrency); with both, the rate is capped by the concurrency.
+The report has p50/p95/p99 latency and error rates overall and per event.
+
+Usage:
+    python -m bench.loadgen --url http://127.0.0.1:8188/zoom/webhook_1 --meetings 20 --participants 150 --rate 200
+    python -m bench.loadgen --url http://127.0.0.1:8188/zoom/webhook --token "$SECRET" --concurrency 64 --json report.json
+"""
+import argparse
+import asyncio
+import datetime
+import hashlib
+import hmac
+import json
+import logging
+import os
+import random
+import re
+import sys
+import time
+import uuid
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+from dotenv import dotenv_values, find_dotenv
+
+from bench.stats import summarize
+
+logger = logging.getLogger("zoom_attendance.bench.loadgen")
+
+# Sample data from ref_scripts/WH_Sender.py
+SAMPLE_NAMES = [
+    "John Smith", "Emma Johnson", "Michael Williams", "Olivia Brown",
+    "William Jones", "Sophia Garcia", "James Miller", "Isabella Davis",
+    "Alexander Wilson", "Charlotte Moore", "Daniel Taylor", "Amelia Anderson",
+    "Matthew Thomas", "Harper White", "Ethan Harris", "Evelyn Martin",
+    "Benjamin Thompson", "Abigail Martinez", "Samuel Robinson", "Emily Clark",
+]
+SAMPLE_TOPICS = [
+    "Paramashivoham Level 1", "Weekly Team Meeting", "Project Kickoff",
+    "Design Review", "Strategic Planning", "Customer Onboarding",
+    "Staff Training", "Product Demo", "Budget Review", "Marketing Strategy",
+]
+SAMPLE_MESSAGES = [
+    "Namaste everyone!", "Hello team, how is everyone doing?",
+    "Just wanted to check if everyone can hear me clearly",
+    "Please share your thoughts on this topic",
+    "Let's take a five-minute break and resume at quarter past",
+    "Can someone share the document we were discussing?",
+    "Thanks for joining today's session",
+    "I'm sharing my screen now, can everyone see it?",
+    "Let's go around the room for quick introductions",
+    "Please mute yourselves when not speaking",
+]
+ACCOUNT_ID = "ruByAP1BSRawJW2I6qfpvQ"
+
+
+def zoom_time(at: datetime.datetime) -> str:
+    return at.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+# Payload builders (shapes follow WH_Sender.get_webhook_payload)
+
+def base_payload(event_type: str, meeting: Dict[str, Any], at: datetime.datetime) -> Dict[str, Any]:
+    return {
+        "payload": {"account_id": ACCOUNT_ID, "object": dict(meeting)},
+        "event_ts": int(at.timestamp() * 1000),
+        "event": event_type,
+    }
+
+
+def meeting_started(meeting: Dict[str, Any], at: datetime.datetime) -> Dict[str, Any]:
+    return base_payload("meeting.started", meeting, at)
+
+
+def meeting_ended(meeting: Dict[str, Any], at: datetime.datetime) -> Dict[str, Any]:
+    payload = base_payload("meeting.ended", meeting, at)
+    payload["payload"]["object"]["end_time"] = zoom_time(at)
+    return payload
+
+
+def participant_joined(meeting: Dict[str, Any], participant: Dict[str, Any], at: datetime.datetime) -> Dict[str, Any]:
+    payload = base_payload("meeting.participant_joined", meeting, at)
+    payload["payload"]["object"]["participant"] = {
+        "user_id": participant["user_id"],
+        "user_name": participant["user_name"],
+        "join_time": zoom_time(at),
+        "participant_uuid": participant["participant_uuid"],
+        "names": [participant["user_name"]],
+        "public_ip": participant["public_ip"],
+        "email": participant["email"],
+        "id": "",
+        "participant_user_id": "",
+    }
+    return payload
+
+
+def participant_left(meeting: Dict[str, Any], participant: Dict[str, Any], at: datetime.datetime) -> Dict[str, Any]:
+    payload = base_payload("meeting.participant_left", meeting, at)
+    payload["payload"]["object"]["participant"] = {
+        "user_id": participant["user_id"],
+        "user_name": participant["user_name"],
+        "participant_uuid": participant["participant_uuid"],
+        "names": [participant["user_name"]],
+        "public_ip": participant["public_ip"],
+        "email": participant["email"],
+        "leave_time": zoom_time(at),
+        "leave_reason": "left the meeting. Reason : left the meeting",
+    }
+    return payload
+
+
+def chat_message_sent(meeting: Dict[str, Any], participant: Dict[str, Any], message: str,
+                      at: datetime.datetime, rng: random.Random) -> Dict[str, Any]:
+    payload = base_payload("meeting.chat_message_sent", meeting, at)
+    payload["payload"]["object"]["chat_message"] = {
+        "date_time": zoom_time(at),
+        "sender_session_id": f"s{rng.randrange(10 ** 8):08d}",
+        "sender_name": participant["user_name"],
+        "sender_email": participant["email"],
+        "sender_type": "participant",
+        "recipient_type": rng.choice(["everyone", "host", "individual"]),
+        "message_id": f"m{rng.randrange(10 ** 8):08d}",
+        "message_content": message,
+    }
+    return payload
+
+
+@dataclass
+class Scenario:
+    meetings: int = 10
+    participants: int = 100          # per meeting
+    duration_minutes: float = 60
+    join_window_minutes: float = 5   # mean of the exponential join spread
+    late_join_rate: float = 0.1      # joins spread over the whole meeting instead
+    reconnect_rate: float = 0.15     # participants who drop and rejoin once
+    chat_per_participant: float = 0.3
+    names: List[str] = field(default_factory=lambda: list(SAMPLE_NAMES))
+
+
+def build_events(scenario: Scenario, rng: random.Random,
+                 start: Optional[datetime.datetime] = None) -> List[Tuple[float, str, Dict[str, Any]]]:
+    """(scenario offset in seconds, event type, payload) for every meeting, in time order"""
+    start = start or datetime.datetime.now(datetime.timezone.utc)
+    duration = scenario.duration_minutes * 60
+    events: List[Tuple[float, str, Dict[str, Any]]] = []
+
+    def add(offset: float, payload: Dict[str, Any]):
+        events.append((offset, payload["event"], payload))
+
+    def at(offset: float) -> datetime.datetime:
+        return start + datetime.timedelta(seconds=offset)
+
+    for _ in range(scenario.meetings):
+        # Meetings start within the first few minutes of each other
+        meeting_start = rng.uniform(0, 300)
+        meeting = {
+            "id": str(rng.randrange(10 ** 9, 10 ** 10)),
+            "uuid": f"m{uuid.UUID(int=rng.getrandbits(128)).hex[:20]}==",
+            "host_id": f"h{rng.randrange(10 ** 15):016d}==",
+            "type": 8,
+            "topic": rng.choice(SAMPLE_TOPICS),
+            "start_time": zoom_time(at(meeting_start)),
+            "duration": int(scenario.duration_minutes),
+            "timezone": "UTC",
+        }
+        add(meeting_start, meeting_started(meeting, at(meeting_start)))
+
+        for _ in range(scenario.participants):
+            name = rng.choice(scenario.names)
+            participant = {
+                "user_id": str(rng.randrange(10 ** 7, 10 ** 8)),
+                "user_name": name,
+                "participant_uuid": str(uuid.UUID(int=rng.getrandbits(128))).upper(),
+                "public_ip": ".".join(str(rng.randint(1, 255)) for _ in range(4)),
+                "email": re.sub(r"[^a-z.]", "", name.lower().replace(" ", ".")) + "@example.com",
+            }
+            if rng.random() < scenario.late_join_rate:
+                joined_at = meeting_start + rng.uniform(0, duration * 0.8)
+            else:
+                joined_at = meeting_start + min(rng.expovariate(1 / (scenario.join_window_minutes * 60)), duration / 2)
+            add(joined_at, participant_joined(meeting, participant, at(joined_at)))
+
+            if rng.random() < scenario.reconnect_rate:
+                dropped_at = rng.uniform(joined_at, meeting_start + duration * 0.9)
+                rejoined_at = dropped_at + rng.uniform(5, 90)
+                add(dropped_at, participant_left(meeting, participant, at(dropped_at)))
+                add(rejoined_at, participant_joined(meeting, participant, at(rejoined_at)))
+
+            for _ in range(int(scenario.chat_per_participant) + (rng.random() < scenario.chat_per_participant % 1)):
+                sent_at = rng.uniform(joined_at, meeting_start + duration)
+                add(sent_at, chat_message_sent(meeting, participant, rng.choice(SAMPLE_MESSAGES), at(sent_at), rng))
+
+            # Leave storm: most leave within a couple of minutes of the end
+            left_at = meeting_start + duration + rng.expovariate(1 / 60)
+            add(left_at, participant_left(meeting, participant, at(left_at)))
+
+        ended_at = meeting_start + duration + 600
+        add(ended_at, meeting_ended(meeting, at(ended_at)))
+
+    events.sort(key=lambda event: event[0])
+    return events
+
+
+def sign(token: str, body: bytes, timestamp: str) -> str:
+    message = b"v0:" + timestamp.encode() + b":" + body
+    return "v0=" + hmac.new(token.encode("utf-8"), message, hashlib.sha256).hexdigest()
+
+
+def configured_token(url: str, env: Dict[str, str]) -> Optional[str]:
+    """Secret for the endpoint in `url` from ZOOM_WEBHOOK_SECRET_<N>, as the service maps them"""
+    tokens: Dict[str, str] = {}
+    for key, value in env.items():
+        parts = key.split("_")
+        if key.startswith("ZOOM_WEBHOOK_SECRET_") and parts[-1].isdigit() and value:
+            tokens[parts[-1]] = value.split("|", 1)[0]
+    match = re.search(r"/zoom/webhook_(\d+)$", url.rstrip("/"))
+    if match:
+        return tokens.get(match.group(1))
+    # /zoom/webhook tries every token, so any of them will do
+    return tokens[min(tokens, key=int)] if tokens else None
+
+
+def load_env() -> Dict[str, str]:
+    env = {key: value for key, value in dotenv_values(find_dotenv(usecwd=True)).items() if value is not None}
+    env.update(os.environ)
+    return env
+
+
+class LoadGenerator:
+    def __init__(self, url: str, token: str, rate: float, concurrency: int,
+                 headers: Optional[Dict[str, str]] = None, timeout: float = 30.0):
+        self.url = url
+        self.token = token
+        self.rate = rate
+        self.concurrency = max(1, concurrency)
+        self.headers = headers or {}
+        self.timeout = timeout
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.statuses: Dict[str, Counter] = defaultdict(Counter)
+
+    async def send(self, client: httpx.AsyncClient, event_type: str, payload: Dict[str, Any]):
+        body = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+        timestamp = str(int(time.time()))
+        headers = {
+            **self.headers,
+            "content-type": "application/json",
+            "x-zm-request-timestamp": timestamp,
+            "x-zm-signature": sign(self.token, body, timestamp),
+        }
+        started = time.perf_counter()
+        try:
+            response = await client.post(self.url, content=body, headers=headers)
+            status = str(response.status_code)
+        except httpx.HTTPError as e:
+            status = type(e).__name__
+        self.latencies[event_type].append((time.perf_counter() - started) * 1000)
+        self.statuses[event_type][status] += 1
+
+    async def run(self, events: List[Tuple[float, str, Dict[str, Any]]]) -> Dict[str, Any]:
+        limits = httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency)
+        slots = asyncio.Semaphore(self.concurrency)
+        started = time.perf_counter()
+        async with httpx.AsyncClient(timeout=self.timeout, limits=limits) as client:
+            tasks = []
+            for index, (_, event_type, payload) in enumerate(events):
+                if self.rate > 0:
+                    # Open loop: event i goes out at i/rate, however slow earlier answers are
+                    delay = started + index / self.rate - time.perf_counter()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                await slots.acquire()
+                task = asyncio.create_task(self.send(client, event_type, payload))
+                task.add_done_callback(lambda _: slots.release())
+                tasks.append(task)
+            await asyncio.gather(*tasks)
+        return self.report(time.perf_counter() - started)
+
+    def report(self, elapsed: float) -> Dict[str, Any]:
+        def block(latencies: List[float], statuses: Counter) -> Dict[str, Any]:
+            total = sum(statuses.values())
+            failed = sum(count for status, count in statuses.items() if not status.startswith("2"))
+            return {
+                "requests": total,
+                "error_rate": round(failed / total, 4) if total else 0.0,
+                "statuses": dict(statuses),
+                "latency_ms": summarize(latencies),
+            }
+
+        all_latencies = [value for values in self.latencies.values() for value in values]
+        all_statuses: Counter = Counter()
+        for statuses in self.statuses.values():
+            all_statuses.update(statuses)
+        return {
+            "url": self.url,
+            "rate": self.rate or None,
+            "concurrency": self.concurrency,
+            "elapsed_seconds": round(elapsed, 3),
+            "throughput_per_second": round(len(all_latencies) / elapsed, 1) if elapsed else None,
+            "overall": block(all_latencies, all_statuses),
+            "by_event": {event: block(self.latencies[event], self.statuses[event]) for event in sorted(self.statuses)},
+        }
+
+
+def print_report(report: Dict[str, Any]):
+    print(f"{report['overall']['requests']} requests in {report['elapsed_seconds']}s "
+          f"({report['throughput_per_second']}/s) against {report['url']}")
+    print(f"{'event':32} {'count':>7} {'errors':>7} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}")
+    rows = list(report["by_event"].items()) + [("overall", report["overall"])]
+    for event, block in rows:
+        latency = block["latency_ms"]
+        print(f"{event:32} {block['requests']:>7} {block['error_rate']:>7.2%} "
+              f"{latency['p50'] or 0:>8.1f} {latency['p95'] or 0:>8.1f} {latency['p99'] or 0:>8.1f} {latency['max'] or 0:>8.1f}")
+
+
+def load_names(path: str) -> List[str]:
+    """Display names from a text file (one per line), a JSON list or a JSON corpus with "zoom_name" keys"""
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+    try:
+        data = json.loads(text)
+    except ValueError:
+        return [line.strip() for line in text.splitlines() if line.strip()]
+    return [item["zoom_name"] if isinstance(item, dict) else str(item) for item in data]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Signed Zoom webhook load generator")
+    parser.add_argument("--url", required=True, help="Webhook URL, e.g. http://127.0.0.1:8188/zoom/webhook_1")
+    parser.add_argument("--token", help="Secret token (default: ZOOM_WEBHOOK_SECRET_<N> for the URL from env/.env)")
+    parser.add_argument("--header", action="append", default=[], metavar="NAME:VALUE",
+                        help="Extra header (default adds the Zoom custom auth header if enabled in env/.env)")
+    parser.add_argument("--meetings", type=int, default=10)
+    parser.add_argument("--participants", type=int, default=100, help="Participants per meeting")
+    parser.add_argument("--duration-minutes", type=float, default=60)
+    parser.add_argument("--join-window-minutes", type=float, default=5)
+    parser.add_argument("--reconnect-rate", type=float, default=0.15)
+    parser.add_argument("--chat-per-participant", type=float, default=0.3)
+    parser.add_argument("--names", help="Display names to use (text lines, JSON list or name corpus)")
+    parser.add_argument("--only", action="append", help="Only send this event type (repeatable)")
+    parser.add_argument("--rate", type=float, default=0, help="Requests per second (0 = as fast as concurrency allows)")
+    parser.add_argument("--concurrency", type=int, default=32, help="Max requests in flight")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", metavar="FILE", help="Also write the report as JSON")
+    args = parser.parse_args(argv)
+
+    env = load_env()
+    token = args.token or configured_token(args.url, env)
+    if not token:
+        parser.error("No token: pass --token or set ZOOM_WEBHOOK_SECRET_<N>")
+
+    headers = {}
+    if env.get("ZOOM_CUSTOM_HEADER_ENABLED", "false").lower() == "true" and env.get("ZOOM_CUSTOM_HEADER_VALUE"):
+        headers[env.get("ZOOM_CUSTOM_HEADER_KEY", "x-zoom-custom-auth")] = env["ZOOM_CUSTOM_HEADER_VALUE"]
+    for header in args.header:
+        name, _, value = header.partition(":")
+        headers[name.strip()] = value.strip()
+
+    scenario = Scenario(args.meetings, args.participants, args.duration_minutes, args.join_window_minutes,
+                        reconnect_rate=args.reconnect_rate, chat_per_participant=args.chat_per_participant)
+    if args.names:
+        scenario.names = load_names(args.names)
+    events = build_events(scenario, random.Random(args.seed))
+    if args.only:
+        events = [event for event in events if event[1] in args.only]
+    logger.info("Sending %d events from %d meeting(s)", len(events), args.meetings)
+
+    generator = LoadGenerator(args.url, token, args.rate, args.concurrency, headers, args.timeout)
+    report = asyncio.run(generator.run(events))
+    print_report(report)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return 0 if report["overall"]["error_rate"] == 0 else 1
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    sys.exit(main())
@@ -0,0 +1,293 @@
+"""
+Matching accuracy and latency evaluation.
+
+Runs every name of a labeled corpus (see bench.corpus) through each matching
+tier of the service and reports, per tier:
+
+    precision / recall    of accepted matches (confidence >= threshold)
+    llm_share             chat-completions calls per name
+    latency_ms            per-name wall time percentiles
+    by_noise              share of names answered correctly per noise kind
+
+Tiers:
+    simple     AttendanceProcessor.simple_name_matching (confidence 0.7, as in the service)
+    ai         AttendanceProcessor.match_participant_with_roster
+    service    AttendanceProcessor.match_participant, the decision a join actually gets
+               (follows USE_AI_MATCHING and any tiers added to it later)
+
+Precision and recall are reported for CONFIDENCE_THRESHOLD and for every
+--thresholds value, so the threshold can be tuned from the same run. With
+--compare, the exit code is 1 when precision or recall at the configured
+threshold drops by more than --tolerance against a saved report.
+
+AI answers come from the offline OpenAI stand-in by default: a cassette of
+recorded real answers (--cassette, see bench.openai_standin --record) replays
+the real model's decisions; names without one get the stand-in's exact-name
+oracle. --ai live uses the configured OPENAI_* client instead.
+
+Usage:
+    python -m bench.corpus --roster-size 1000 --joins 2000 --out-dir bench/data
+    python -m bench.match_eval --roster bench/data/roster.json --corpus bench/data/corpus.json
+    python -m bench.match_eval --roster-size 5000 --joins 1000 --cassette names.json --json eval.json
+    python -m bench.match_eval --roster bench/data/roster.json --corpus bench/data/corpus.json --compare eval.json
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from types import SimpleNamespace
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from bench.corpus import generate_corpus, generate_roster, load_corpus
+from bench.nocodb_standin import load_rows
+from bench.openai_standin import Behavior, Cassette, OpenAIStandin, StandinChatClient
+from bench.server import state_env
+from bench.stats import summarize
+
+logger = logging.getLogger("zoom_attendance.bench.match_eval")
+
+# Fixed confidence the service assigns to simple-matching hits
+SIMPLE_CONFIDENCE = 0.7
+TIER_NAMES = ("simple", "ai", "service")
+
+
+class CountingClient:
+    """Wraps a chat-completions client and counts the calls made through it"""
+
+    def __init__(self, inner):
+        self.inner = inner
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, *args, **kwargs):
+        self.calls += 1
+        return self.inner.chat.completions.create(*args, **kwargs)
+
+
+def load_service(env: Dict[str, str]):
+    """Import the service with `env` applied first (settings are read at import time)"""
+    os.environ.update(env)
+    import zoom_attendance
+    return zoom_attendance
+
+
+def make_tiers(processor) -> Dict[str, Callable[[str, List[Dict[str, Any]]], Awaitable[Tuple[Any, float]]]]:
+    """Tier name -> coroutine returning (person id or None, confidence) for a display name"""
+
+    async def simple(name, roster):
+        person = processor.simple_name_matching(name, roster)
+        return (person.get("Id"), SIMPLE_CONFIDENCE) if person else (None, 0)
+
+    async def ai(name, roster):
+        result = await processor.match_participant_with_roster(name, roster)
+        return result.get("matchedPersonId"), result.get("confidence", 0)
+
+    async def service(name, roster):
+        result = await processor.match_participant(name, roster)
+        return result["personId"], result["confidence"]
+
+    return {"simple": simple, "ai": ai, "service": service}
+
+
+async def run_tier(tier, corpus: List[Dict[str, Any]], roster: List[Dict[str, Any]],
+                   counter: Optional[CountingClient]) -> Dict[str, Any]:
+    """Per-name predictions, latencies and LLM calls for one tier"""
+    predictions, latencies = [], []
+    calls_before = counter.calls if counter else 0
+    for entry in corpus:
+        started = time.perf_counter()
+        person_id, confidence = await tier(entry["zoom_name"], roster)
+        latencies.append((time.perf_counter() - started) * 1000)
+        predictions.append((person_id, confidence or 0))
+    calls = (counter.calls if counter else 0) - calls_before
+    return {"predictions": predictions, "latencies": latencies, "llm_calls": calls}
+
+
+def same_person(predicted, label) -> bool:
+    return predicted is not None and label is not None and str(predicted) == str(label)
+
+
+def score(corpus: List[Dict[str, Any]], predictions: List[Tuple[Any, float]], threshold: float) -> Dict[str, Any]:
+    """Precision/recall of matches accepted at `threshold`, plus per-noise accuracy"""
+    tp = fp = 0
+    labeled = sum(1 for entry in corpus if entry["person_id"] is not None)
+    by_noise: Dict[str, List[int]] = defaultdict(lambda: [0, 0])
+    for entry, (predicted, confidence) in zip(corpus, predictions):
+        accepted = predicted if predicted is not None and confidence >= threshold else None
+        if accepted is not None:
+            if same_person(accepted, entry["person_id"]):
+                tp += 1
+            else:
+                fp += 1
+        correct = same_person(accepted, entry["person_id"]) or (accepted is None and entry["person_id"] is None)
+        by_noise[entry["noise"]][0] += 1
+        by_noise[entry["noise"]][1] += int(correct)
+    return {
+        "threshold": threshold,
+        "precision": round(tp / (tp + fp), 4) if tp + fp else None,
+        "recall": round(tp / labeled, 4) if labeled else None,
+        "accepted": tp + fp,
+        "false_matches": fp,
+        "by_noise": {kind: round(correct / count, 4) for kind, (count, correct) in sorted(by_noise.items())},
+    }
+
+
+def build_processor(za, args: argparse.Namespace) -> Tuple[Any, Optional[CountingClient]]:
+    """A processor whose AI client is the stand-in, the live client or none, wrapped to count calls"""
+    processor = za.AttendanceProcessor(za.attendance_processor.store)
+    if args.ai == "off":
+        processor.client = None
+        return processor, None
+    if args.ai == "live":
+        inner = za.build_matcher_client(za.config.snapshot)
+        if inner is None:
+            raise SystemExit("--ai live needs OPENAI_API_KEY")
+    else:
+        cassette = Cassette.load(args.cassette) if args.cassette else None
+        behavior = Behavior(latency="lognormal" if args.ai_latency_ms else "fixed", latency_ms=args.ai_latency_ms,
+                            latency_spread=0.3)
+        inner = StandinChatClient(OpenAIStandin(cassette, behavior, seed=args.seed))
+    counter = CountingClient(inner)
+    processor.client = counter
+    return processor, counter
+
+
+def load_inputs(args: argparse.Namespace) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    rng = random.Random(args.seed)
+    roster = load_rows(args.roster) if args.roster else generate_roster(args.roster_size, rng)
+    corpus = load_corpus(args.corpus) if args.corpus else generate_corpus(roster, args.joins, rng)
+    if not args.include_ambiguous:
+        corpus = [entry for entry in corpus if not entry.get("ambiguous")]
+    if args.limit:
+        corpus = corpus[:args.limit]
+    return roster, corpus
+
+
+def evaluate(za, args: argparse.Namespace) -> Dict[str, Any]:
+    roster, corpus = load_inputs(args)
+    processor, counter = build_processor(za, args)
+    configured = za.config.CONFIDENCE_THRESHOLD
+    thresholds = sorted(set(args.thresholds) | {configured})
+    tiers = make_tiers(processor)
+
+    report: Dict[str, Any] = {
+        "roster_size": len(roster),
+        "names": len(corpus),
+        "ai": args.ai,
+        "use_ai_matching": za.config.USE_AI_MATCHING,
+        "confidence_threshold": configured,
+        "tiers": {},
+    }
+    for name in args.tiers:
+        if name == "ai" and processor.client is None:
+            logger.info("Skipping the ai tier (--ai off)")
+            continue
+        run = asyncio.run(run_tier(tiers[name], corpus, roster, counter))
+        sweep = [score(corpus, run["predictions"], threshold) for threshold in thresholds]
+        report["tiers"][name] = {
+            "llm_share": round(run["llm_calls"] / len(corpus), 4) if corpus else 0.0,
+            "latency_ms": summarize(run["latencies"]),
+            "at_threshold": next(result for result in sweep if result["threshold"] == configured),
+            "sweep": [{key: result[key] for key in ("threshold", "precision", "recall", "accepted", "false_matches")}
+                      for result in sweep],
+        }
+    return report
+
+
+def print_report(report: Dict[str, Any]):
+    print(f"{report['names']} names against a roster of {report['roster_size']} "
+          f"(ai={report['ai']}, USE_AI_MATCHING={report['use_ai_matching']}, "
+          f"CONFIDENCE_THRESHOLD={report['confidence_threshold']})")
+    print(f"{'tier':10} {'precision':>9} {'recall':>7} {'llm':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for name, tier in report["tiers"].items():
+        result, latency = tier["at_threshold"], tier["latency_ms"]
+        print(f"{name:10} {result['precision'] or 0:>9.3f} {result['recall'] or 0:>7.3f} {tier['llm_share']:>6.0%} "
+              f"{latency['p50'] or 0:>8.2f} {latency['p95'] or 0:>8.2f} {latency['p99'] or 0:>8.2f}")
+    for name, tier in report["tiers"].items():
+        print(f"\n{name}: threshold sweep")
+        for row in tier["sweep"]:
+            print(f"  {row['threshold']:>5.2f}  precision={row['precision'] or 0:.3f}  recall={row['recall'] or 0:.3f}  "
+                  f"false_matches={row['false_matches']}")
+        print(f"{name}: correct by noise kind")
+        for kind, accuracy in tier["at_threshold"]["by_noise"].items():
+            print(f"  {kind:16} {accuracy:.1%}")
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Precision/recall drops at the configured threshold, per tier present in both reports"""
+    regressions = []
+    for name, tier in report["tiers"].items():
+        base = baseline.get("tiers", {}).get(name)
+        if not base:
+            continue
+        for key in ("precision", "recall"):
+            now, before = tier["at_threshold"][key], base["at_threshold"][key]
+            if now is not None and before is not None and now < before - tolerance:
+                regressions.append(f"{name}: {key} {before:.3f} -> {now:.3f}")
+    return regressions
+
+
+def number_list(value: str) -> List[float]:
+    return [float(item) for item in value.split(",") if item.strip()]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Evaluate matching accuracy and latency on a labeled name corpus")
+    parser.add_argument("--roster", help="Roster file (JSON list, NocoDB page or JSON lines)")
+    parser.add_argument("--corpus", help="Labeled corpus from bench.corpus")
+    parser.add_argument("--roster-size", type=int, default=1000, help="Generated roster size when --roster is not given")
+    parser.add_argument("--joins", type=int, default=1000, help="Generated corpus size when --corpus is not given")
+    parser.add_argument("--limit", type=int, help="Only evaluate the first N names")
+    parser.add_argument("--include-ambiguous", action="store_true", help="Keep names that fit several people")
+    parser.add_argument("--tiers", type=lambda value: value.split(","), default=list(TIER_NAMES))
+    parser.add_argument("--thresholds", type=number_list, default=[0.5, 0.6, 0.7, 0.8, 0.9])
+    parser.add_argument("--ai", choices=("standin", "live", "off"), default="standin")
+    parser.add_argument("--cassette", help="Recorded AI answers for the stand-in")
+    parser.add_argument("--ai-latency-ms", type=float, default=0.0, help="Median stand-in AI latency (lognormal)")
+    parser.add_argument("--env", action="append", metavar="KEY=VALUE", help="Service setting, e.g. CONFIDENCE_THRESHOLD=0.75")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", metavar="FILE", help="Write the full report")
+    parser.add_argument("--compare", metavar="FILE", help="Earlier report to check for accuracy regressions")
+    parser.add_argument("--tolerance", type=float, default=0.01, help="Allowed absolute drop in precision/recall")
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.tiers if name not in TIER_NAMES]
+    if unknown:
+        parser.error(f"Unknown tier(s): {', '.join(unknown)}")
+
+    env = {
+        "USE_AI_MATCHING": "false" if args.ai == "off" else "true",
+        "LOG_LEVEL": "WARNING",
+        **state_env(tempfile.mkdtemp(prefix="match-eval-")),
+    }
+    if args.ai == "standin":
+        # AI matching is only enabled with a key; the stand-in client replaces the one built from it
+        env["OPENAI_API_KEY"] = "standin"
+    for item in args.env or []:
+        key, _, value = item.partition("=")
+        env[key] = value
+    report = evaluate(load_service(env), args)
+    print_report(report)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        for line in regressions:
+            logger.warning("Regression: %s", line)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    sys.exit(main())
@@ -0,0 +1,415 @@
+"""
+Local NocoDB stand-in for offline tests and benchmarks.
+
+Implements the subset of the NocoDB v2 API the service uses:
+
+    GET    /api/v2/tables/{id}/records      limit/offset pagination with PageInfo
+    POST   /api/v2/tables/{id}/records      one record or a list (bulk insert)
+    PATCH  /api/v2/tables/{id}/records      one record or a list, matched by Id
+    GET    /api/v2/meta/tables/{id}         column titles
+    POST   /api/v2/meta/tables/{id}/columns add a column
+
+Tables live in memory. Every data/meta request can be slowed down, failed at
+a given rate or rate-limited (429), and is recorded so a test can assert on
+what the service sent. Faults are set on the command line or at runtime:
+
+    GET    /_standin/calls                  recorded calls (?since=<index>)
+    DELETE /_standin/calls                  forget recorded calls
+    GET    /_standin/stats                  call counts and latency so far
+    PUT    /_standin/faults                 {"latency_ms": 20, "error_rate": 0.01, ...}
+    PUT    /_standin/tables/{id}            replace a table's rows (JSON list)
+    GET    /_standin/tables/{id}            dump a table
+
+Usage:
+    python -m bench.nocodb_standin --port 8090 --roster roster.json --latency-ms 40 --error-rate 0.02
+    NOCODB_URL=http://127.0.0.1:8090 uvicorn zoom_attendance:app --port 8188
+
+Tests and benchmarks can embed it instead:
+
+    server = StandinServer(create_app(NocoDBStandin(tables={ROSTER: rows}))).start()
+    ... NOCODB_URL = server.url ...
+    server.stop()
+"""
+import argparse
+import asyncio
+import json
+import logging
+import random
+import sys
+import threading
+import time
+from collections import deque
+from dataclasses import asdict, dataclass, fields
+from typing import Any, Deque, Dict, List, Optional
+
+import uvicorn
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse
+
+from bench.server import StandinServer  # noqa: F401 - re-exported for embedding
+
+logger = logging.getLogger("zoom_attendance.bench.nocodb_standin")
+
+# Table ids the service uses by default (see ConfigSnapshot)
+ROSTER_TABLE_ID = "m1848aw7em1uz9g"
+ATTENDANCE_TABLE_ID = "mbur916jgs0m7ua"
+UNIDENTIFIED_TABLE_ID = "mhsf4s0jhp90gnn"
+
+DEFAULT_PAGE_SIZE = 25
+MAX_PAGE_SIZE = 1000
+
+
+@dataclass
+class Faults:
+    """Injected behavior for /api/v2 requests"""
+    latency_ms: float = 0.0          # mean added latency
+    latency_jitter_ms: float = 0.0   # uniform +/- jitter around the mean
+    error_rate: float = 0.0          # share of requests answered with error_status
+    error_status: int = 500
+    rate_limit: float = 0.0          # requests/second before answering 429 (0 = unlimited)
+    rate_burst: int = 10
+
+    def update(self, values: Dict[str, Any]):
+        known = {f.name: f.type for f in fields(self)}
+        for key, value in values.items():
+            if key not in known:
+                raise ValueError(f"Unknown fault setting: {key}")
+            setattr(self, key, type(getattr(self, key))(value))
+
+
+class NocoDBStandin:
+    """In-memory tables, fault injection and call recording behind the FastAPI app"""
+
+    def __init__(self, tables: Optional[Dict[str, List[Dict[str, Any]]]] = None,
+                 faults: Optional[Faults] = None, token: Optional[str] = None,
+                 seed: Optional[int] = None, max_recorded_calls: int = 100000):
+        self.faults = faults or Faults()
+        self.token = token
+        self.random = random.Random(seed)
+        self.tables: Dict[str, Dict[int, Dict[str, Any]]] = {}
+        self.next_ids: Dict[str, int] = {}
+        self.extra_columns: Dict[str, List[str]] = {}
+        self.calls: Deque[Dict[str, Any]] = deque(maxlen=max_recorded_calls)
+        self.call_count = 0
+        self.status_counts: Dict[int, int] = {}
+        self.lock = threading.Lock()
+
+        # Rate limit bucket
+        self.tokens = float(self.faults.rate_burst)
+        self.tokens_updated_at = time.monotonic()
+
+        for table_id, rows in (tables or {}).items():
+            self.load_table(table_id, rows)
+
+    # Table data
+
+    def load_table(self, table_id: str, rows: List[Dict[str, Any]]):
+        """Replace a table's rows; rows without an Id are numbered from 1"""
+        table: Dict[int, Dict[str, Any]] = {}
+        next_id = 1
+        for row in rows:
+            row = dict(row)
+            row_id = int(row.get("Id") or next_id)
+            row["Id"] = row_id
+            table[row_id] = row
+            next_id = max(next_id, row_id + 1)
+        with self.lock:
+            self.tables[table_id] = table
+            self.next_ids[table_id] = next_id
+
+    def rows(self, table_id: str) -> List[Dict[str, Any]]:
+        with self.lock:
+            return list(self.tables.get(table_id, {}).values())
+
+    def columns(self, table_id: str) -> List[str]:
+        with self.lock:
+            titles = {"Id"}
+            for row in self.tables.get(table_id, {}).values():
+                titles.update(row)
+            titles.update(self.extra_columns.get(table_id, []))
+        return sorted(titles)
+
+    def list_records(self, table_id: str, limit: int, offset: int) -> Dict[str, Any]:
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        offset = max(0, offset)
+        with self.lock:
+            rows = list(self.tables.get(table_id, {}).values())
+        page = rows[offset:offset + limit]
+        return {
+            "list": page,
+            "PageInfo": {
+                "totalRows": len(rows),
+                "page": offset // limit + 1,
+                "pageSize": limit,
+                "isFirstPage": offset == 0,
+                "isLastPage": offset + limit >= len(rows),
+            },
+        }
+
+    def insert(self, table_id: str, records: List[Dict[str, Any]]) -> List[Dict[str, int]]:
+        created = []
+        with self.lock:
+            table = self.tables.setdefault(table_id, {})
+            for record in records:
+                row_id = self.next_ids.get(table_id, 1)
+                self.next_ids[table_id] = row_id + 1
+                table[row_id] = {**record, "Id": row_id}
+                created.append({"Id": row_id})
+        return created
+
+    def update(self, table_id: str, records: List[Dict[str, Any]]) -> List[Dict[str, int]]:
+        updated = []
+        with self.lock:
+            table = self.tables.setdefault(table_id, {})
+            # Validate the whole batch first, like NocoDB's bulk update
+            for record in records:
+                try:
+                    row_id = int(record.get("Id"))
+                except (TypeError, ValueError):
+                    raise HTTPException(status_code=400, detail="Record Id is required")
+                if row_id not in table:
+                    raise HTTPException(status_code=404, detail=f"Record '{row_id}' not found")
+            for record in records:
+                row_id = int(record["Id"])
+                table[row_id].update({key: value for key, value in record.items() if key != "Id"})
+                updated.append({"Id": row_id})
+        return updated
+
+    # Faults and recording
+
+    def take_rate_token(self) -> bool:
+        faults = self.faults
+        if faults.rate_limit <= 0:
+            return True
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(faults.rate_burst, self.tokens + (now - self.tokens_updated_at) * faults.rate_limit)
+            self.tokens_updated_at = now
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+            return True
+
+    def latency(self) -> float:
+        faults = self.faults
+        if faults.latency_ms <= 0 and faults.latency_jitter_ms <= 0:
+            return 0.0
+        jitter = self.random.uniform(-faults.latency_jitter_ms, faults.latency_jitter_ms)
+        return max(0.0, faults.latency_ms + jitter) / 1000
+
+    def record(self, request: Request, table_id: str, body: Any, status: int, started: float):
+        entry = {
+            "index": 0,
+            "at": time.time(),
+            "method": request.method,
+            "path": request.url.path,
+            "table_id": table_id,
+            "params": dict(request.query_params),
+            "body": body,
+            "status": status,
+            "duration_ms": round((time.perf_counter() - started) * 1000, 3),
+        }
+        with self.lock:
+            entry["index"] = self.call_count
+            self.call_count += 1
+            self.status_counts[status] = self.status_counts.get(status, 0) + 1
+            self.calls.append(entry)
+
+    def recorded_calls(self, since: int = 0) -> List[Dict[str, Any]]:
+        with self.lock:
+            return [call for call in self.calls if call["index"] >= since]
+
+    def reset_calls(self):
+        with self.lock:
+            self.calls.clear()
+            self.status_counts = {}
+
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            durations = sorted(call["duration_ms"] for call in self.calls)
+            by_route: Dict[str, int] = {}
+            for call in self.calls:
+                route = f"{call['method']} {call['path']}"
+                by_route[route] = by_route.get(route, 0) + 1
+            return {
+                "calls": self.call_count,
+                "status_counts": {str(status): count for status, count in sorted(self.status_counts.items())},
+                "by_route": by_route,
+                "duration_ms_max": durations[-1] if durations else None,
+                "faults": asdict(self.faults),
+                "tables": {table_id: len(rows) for table_id, rows in self.tables.items()},
+            }
+
+
+def create_app(standin: NocoDBStandin) -> FastAPI:
+    app = FastAPI(title="NocoDB stand-in")
+    app.state.standin = standin
+
+    async def guarded(request: Request, table_id: str, body: Any, handler):
+        """Auth, rate limit, latency and error injection around one API call, then record it"""
+        started = time.perf_counter()
+        status, content = 200, None
+        try:
+            if standin.token and request.headers.get("xc-token") != standin.token:
+                status, content = 401, {"msg": "Authentication required"}
+            elif not standin.take_rate_token():
+                status, content = 429, {"msg": "Too many requests"}
+            else:
+                delay = standin.latency()
+                if delay:
+                    await asyncio.sleep(delay)
+                if standin.faults.error_rate and standin.random.random() < standin.faults.error_rate:
+                    status, content = standin.faults.error_status, {"msg": "Injected failure"}
+                else:
+                    content = handler()
+        except HTTPException as e:
+            status, content = e.status_code, {"msg": e.detail}
+        standin.record(request, table_id, body, status, started)
+        return JSONResponse(content, status_code=status)
+
+    async def read_body(request: Request) -> Any:
+        try:
+            return json.loads(await request.body() or b"null")
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid JSON body")
+
+    def as_list(body: Any) -> List[Dict[str, Any]]:
+        if isinstance(body, dict):
+            return [body]
+        if isinstance(body, list) and all(isinstance(item, dict) for item in body):
+            return body
+        raise HTTPException(status_code=400, detail="Expected a record or a list of records")
+
+    @app.get("/api/v2/tables/{table_id}/records")
+    async def list_records(table_id: str, request: Request, limit: int = DEFAULT_PAGE_SIZE, offset: int = 0):
+        return await guarded(request, table_id, None, lambda: standin.list_records(table_id, limit, offset))
+
+    @app.post("/api/v2/tables/{table_id}/records")
+    async def insert_records(table_id: str, request: Request):
+        body = await read_body(request)
+
+        def handler():
+            created = standin.insert(table_id, as_list(body))
+            return created if isinstance(body, list) else created[0]
+        return await guarded(request, table_id, body, handler)
+
+    @app.patch("/api/v2/tables/{table_id}/records")
+    async def update_records(table_id: str, request: Request):
+        body = await read_body(request)
+
+        def handler():
+            updated = standin.update(table_id, as_list(body))
+            return updated if isinstance(body, list) else updated[0]
+        return await guarded(request, table_id, body, handler)
+
+    @app.get("/api/v2/meta/tables/{table_id}")
+    async def table_meta(table_id: str, request: Request):
+        return await guarded(request, table_id, None, lambda: {
+            "id": table_id,
+            "columns": [{"title": title, "column_name": title} for title in standin.columns(table_id)],
+        })
+
+    @app.post("/api/v2/meta/tables/{table_id}/columns")
+    async def create_column(table_id: str, request: Request):
+        body = await read_body(request)
+
+        def handler():
+            title = (body or {}).get("title") if isinstance(body, dict) else None
+            if not title:
+                raise HTTPException(status_code=400, detail="Column title is required")
+            if title in standin.columns(table_id):
+                raise HTTPException(status_code=400, detail=f"Duplicate column name '{title}'")
+            with standin.lock:
+                standin.extra_columns.setdefault(table_id, []).append(title)
+            return {"id": table_id, "title": title}
+        return await guarded(request, table_id, body, handler)
+
+    @app.get("/_standin/calls")
+    async def get_calls(since: int = 0):
+        return standin.recorded_calls(since)
+
+    @app.delete("/_standin/calls")
+    async def delete_calls():
+        standin.reset_calls()
+        return {"status": "success"}
+
+    @app.get("/_standin/stats")
+    async def get_stats():
+        return standin.stats()
+
+    @app.put("/_standin/faults")
+    async def put_faults(request: Request):
+        try:
+            standin.faults.update(await read_body(request) or {})
+        except (TypeError, ValueError) as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return asdict(standin.faults)
+
+    @app.put("/_standin/tables/{table_id}")
+    async def put_table(table_id: str, request: Request):
+        standin.load_table(table_id, as_list(await read_body(request)))
+        return {"table_id": table_id, "rows": len(standin.rows(table_id))}
+
+    @app.get("/_standin/tables/{table_id}")
+    async def get_table(table_id: str):
+        return standin.rows(table_id)
+
+    return app
+
+
+def load_rows(path: str) -> List[Dict[str, Any]]:
+    """Rows from a JSON list, a NocoDB page ({"list": [...]}) or JSON lines"""
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+    try:
+        data = json.loads(text)
+    except ValueError:
+        return [json.loads(line) for line in text.splitlines() if line.strip()]
+    return data["list"] if isinstance(data, dict) else data
+
+
+def roster_tables(roster: List[Dict[str, Any]], roster_table: str = ROSTER_TABLE_ID,
+                  attendance_table: str = ATTENDANCE_TABLE_ID) -> Dict[str, List[Dict[str, Any]]]:
+    """Roster rows plus one attendance row per person (mark_attendance PATCHes by roster Id)"""
+    return {
+        roster_table: roster,
+        attendance_table: [{"Id": person["Id"]} for person in roster if person.get("Id") is not None],
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Local NocoDB stand-in for offline tests and benchmarks")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--roster", help="Roster rows to load (JSON list, NocoDB page or JSON lines)")
+    parser.add_argument("--roster-table", default=ROSTER_TABLE_ID)
+    parser.add_argument("--attendance-table", default=ATTENDANCE_TABLE_ID)
+    parser.add_argument("--table", nargs=2, action="append", metavar=("TABLE_ID", "FILE"),
+                        help="Load another table from FILE (repeatable)")
+    parser.add_argument("--token", help="Require this xc-token")
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--latency-jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=500)
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="Requests/second before 429 (0 = unlimited)")
+    parser.add_argument("--rate-burst", type=int, default=10)
+    parser.add_argument("--seed", type=int, help="Seed for latency jitter and injected errors")
+    args = parser.parse_args(argv)
+
+    tables: Dict[str, List[Dict[str, Any]]] = {}
+    if args.roster:
+        tables.update(roster_tables(load_rows(args.roster), args.roster_table, args.attendance_table))
+    for table_id, path in args.table or []:
+        tables[table_id] = load_rows(path)
+
+    faults = Faults(args.latency_ms, args.latency_jitter_ms, args.error_rate, args.error_status,
+                    args.rate_limit, args.rate_burst)
+    standin = NocoDBStandin(tables, faults, args.token, args.seed)
+    logger.info("Serving %s on http://%s:%d", {t: len(rows) for t, rows in tables.items()}, args.host, args.port)
+    uvicorn.run(create_app(standin), host=args.host, port=args.port, log_level="warning")
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    sys.exit(main())
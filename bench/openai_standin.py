@@ -0,0 +1,405 @@
+"""
+Offline stand-in for the OpenAI chat-completions API used by AI matching.
+
+Speaks the `POST /v1/chat/completions` wire shape, so the service can be
+pointed at it with OPENAI_BASE_URL, or used in-process through
+StandinChatClient (same `client.chat.completions.create()` call the
+processor makes). Each request is answered from, in order:
+
+1. a recorded exchange in the cassette with the identical messages
+2. a scripted answer for the Zoom name quoted in the prompt
+3. the fallback policy: "oracle" (exact first/last/spiritual name match
+   against the roster embedded in the prompt) or "no_match"
+
+Latency follows a fixed, uniform, lognormal or recorded distribution and a
+share of requests can fail with 500, 429 or hang past the client timeout.
+All draws come from one seeded generator, so runs are reproducible.
+
+Cassette format (JSON):
+
+    {"by_name": {"Jon Smith": "12", "Guest 4": "NO_MATCH"},
+     "recorded": [{"key": "<sha256 of model+messages>", "zoom_name": "...",
+                   "answer": "12", "latency_ms": 640.2}]}
+
+Usage:
+    python -m bench.openai_standin --port 8091 --cassette names.json --latency lognormal --latency-ms 600
+    OPENAI_BASE_URL=http://127.0.0.1:8091/v1 OPENAI_API_KEY=standin uvicorn zoom_attendance:app
+
+    # Record real answers (needs network and a key) to replay them offline later
+    python -m bench.openai_standin --record cassette.json --upstream-key "$OPENAI_API_KEY"
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import math
+import os
+import re
+import sys
+import threading
+import time
+from collections import deque
+from dataclasses import asdict, dataclass, fields
+from random import Random
+from types import SimpleNamespace
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+import uvicorn
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse
+
+logger = logging.getLogger("zoom_attendance.bench.openai_standin")
+
+ZOOM_NAME_PATTERN = re.compile(r'The name from Zoom is: "(.*)"')
+ROSTER_LINE_PATTERN = re.compile(r"^ID: ([^,]+), Name: (.*)$", re.MULTILINE)
+NO_MATCH = "NO_MATCH"
+
+
+def request_key(model: str, messages: List[Dict[str, Any]]) -> str:
+    """Stable digest of a request, used to find recorded exchanges"""
+    data = json.dumps({"model": model, "messages": messages}, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+def prompt_text(messages: List[Dict[str, Any]]) -> str:
+    return "\n".join(str(m.get("content") or "") for m in messages if m.get("role") == "user")
+
+
+def zoom_name(messages: List[Dict[str, Any]]) -> Optional[str]:
+    match = ZOOM_NAME_PATTERN.search(prompt_text(messages))
+    return match.group(1) if match else None
+
+
+def normalize(name: str) -> str:
+    return " ".join(name.lower().split())
+
+
+def oracle_answer(messages: List[Dict[str, Any]]) -> str:
+    """Exact match of the Zoom name against the roster lines in the prompt"""
+    name = zoom_name(messages)
+    if not name:
+        return NO_MATCH
+    wanted = normalize(name)
+    matches = set()
+    for person_id, full_name in ROSTER_LINE_PATTERN.findall(prompt_text(messages)):
+        spiritual = re.search(r"\(([^)]*)\)\s*$", full_name)
+        parts = re.sub(r"\s*\([^)]*\)\s*$", "", full_name).split()
+        candidates = {normalize(" ".join(parts)), normalize(" ".join(reversed(parts)))}
+        if spiritual:
+            candidates.add(normalize(spiritual.group(1)))
+        if wanted in candidates:
+            matches.add(person_id.strip())
+    # Ambiguous names are NO_MATCH, as the prompt asks
+    return matches.pop() if len(matches) == 1 else NO_MATCH
+
+
+class Cassette:
+    """Scripted answers per Zoom name plus recorded exchanges keyed by request digest"""
+
+    def __init__(self, by_name: Optional[Dict[str, str]] = None,
+                 recorded: Optional[List[Dict[str, Any]]] = None):
+        self.by_name = {normalize(name): str(answer) for name, answer in (by_name or {}).items()}
+        self.recorded: Dict[str, Dict[str, Any]] = {entry["key"]: entry for entry in recorded or []}
+        self.lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path: str) -> "Cassette":
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(data.get("by_name"), data.get("recorded"))
+
+    def save(self, path: str):
+        with self.lock:
+            data = {"by_name": self.by_name, "recorded": list(self.recorded.values())}
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=1)
+        os.replace(path + ".tmp", path)
+
+    def lookup(self, key: str, name: Optional[str]) -> Tuple[Optional[str], Optional[float], str]:
+        """(answer, recorded latency in ms, source)"""
+        with self.lock:
+            entry = self.recorded.get(key)
+        if entry:
+            return entry["answer"], entry.get("latency_ms"), "recorded"
+        if name is not None and normalize(name) in self.by_name:
+            return self.by_name[normalize(name)], None, "scripted"
+        return None, None, "fallback"
+
+    def add(self, key: str, name: Optional[str], answer: str, latency_ms: float):
+        with self.lock:
+            self.recorded[key] = {"key": key, "zoom_name": name, "answer": answer, "latency_ms": round(latency_ms, 1)}
+
+
+@dataclass
+class Behavior:
+    """Latency and failure distributions (all times in milliseconds)"""
+    latency: str = "fixed"            # fixed | uniform | lognormal | recorded
+    latency_ms: float = 0.0           # fixed value, uniform mean or lognormal median
+    latency_spread: float = 0.0       # uniform: +/- ms; lognormal: sigma
+    error_rate: float = 0.0           # answered with HTTP 500
+    rate_limit_rate: float = 0.0      # answered with HTTP 429
+    timeout_rate: float = 0.0         # held for hang_ms before answering
+    hang_ms: float = 60000.0
+    fallback: str = "oracle"          # oracle | no_match
+
+    def update(self, values: Dict[str, Any]):
+        names = {f.name for f in fields(self)}
+        for key, value in values.items():
+            if key not in names:
+                raise ValueError(f"Unknown behavior setting: {key}")
+            setattr(self, key, type(getattr(self, key))(value))
+
+
+class OpenAIStandin:
+    """Decides the answer, delay and outcome of each chat-completions request"""
+
+    def __init__(self, cassette: Optional[Cassette] = None, behavior: Optional[Behavior] = None,
+                 seed: Optional[int] = None, max_recorded_calls: int = 100000):
+        self.cassette = cassette or Cassette()
+        self.behavior = behavior or Behavior()
+        self.random = Random(seed)
+        self.lock = threading.Lock()
+        self.calls: Deque[Dict[str, Any]] = deque(maxlen=max_recorded_calls)
+        self.call_count = 0
+        self.outcomes: Dict[str, int] = {}
+
+    def draw_latency(self, recorded_ms: Optional[float]) -> float:
+        b = self.behavior
+        with self.lock:
+            if b.latency == "recorded" and recorded_ms is not None:
+                ms = recorded_ms
+            elif b.latency == "uniform":
+                ms = self.random.uniform(b.latency_ms - b.latency_spread, b.latency_ms + b.latency_spread)
+            elif b.latency == "lognormal" and b.latency_ms > 0:
+                ms = self.random.lognormvariate(math.log(b.latency_ms), b.latency_spread)
+            else:
+                ms = b.latency_ms
+        return max(0.0, ms) / 1000
+
+    def draw_outcome(self) -> str:
+        b = self.behavior
+        with self.lock:
+            roll = self.random.random()
+        for outcome, rate in (("error", b.error_rate), ("rate_limited", b.rate_limit_rate), ("timeout", b.timeout_rate)):
+            if roll < rate:
+                return outcome
+            roll -= rate
+        return "ok"
+
+    def respond(self, body: Dict[str, Any]) -> Tuple[int, Dict[str, Any], float, str]:
+        """(HTTP status, response body, seconds to wait before answering, outcome)"""
+        model = body.get("model", "standin")
+        messages = body.get("messages") or []
+        name = zoom_name(messages)
+        answer, recorded_ms, source = self.cassette.lookup(request_key(model, messages), name)
+        delay = self.draw_latency(recorded_ms)
+        outcome = self.draw_outcome()
+
+        if outcome == "error":
+            self.record(name, source, outcome, None, delay)
+            return 500, error_body("The server had an error while processing your request.", "server_error"), delay, outcome
+        if outcome == "rate_limited":
+            self.record(name, source, outcome, None, delay)
+            return 429, error_body("Rate limit reached for requests.", "rate_limit_exceeded"), delay, outcome
+        if outcome == "timeout":
+            delay = max(delay, self.behavior.hang_ms / 1000)
+
+        if answer is None:
+            answer = oracle_answer(messages) if self.behavior.fallback == "oracle" else NO_MATCH
+        index = self.record(name, source, outcome, answer, delay)
+        return 200, completion_body(index, model, answer, messages), delay, outcome
+
+    def record(self, name: Optional[str], source: str, outcome: str, answer: Optional[str], delay: float) -> int:
+        with self.lock:
+            index = self.call_count
+            self.calls.append({
+                "index": index, "at": time.time(), "zoom_name": name, "source": source,
+                "outcome": outcome, "answer": answer, "delay_ms": round(delay * 1000, 3),
+            })
+            self.call_count += 1
+            self.outcomes[outcome] = self.outcomes.get(outcome, 0) + 1
+        return index
+
+    def recorded_calls(self, since: int = 0) -> List[Dict[str, Any]]:
+        with self.lock:
+            return [call for call in self.calls if call["index"] >= since]
+
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            sources: Dict[str, int] = {}
+            for call in self.calls:
+                sources[call["source"]] = sources.get(call["source"], 0) + 1
+            return {
+                "calls": self.call_count,
+                "outcomes": dict(self.outcomes),
+                "sources": sources,
+                "behavior": asdict(self.behavior),
+            }
+
+
+def error_body(message: str, code: str) -> Dict[str, Any]:
+    return {"error": {"message": message, "type": code, "param": None, "code": code}}
+
+
+def completion_body(index: int, model: str, answer: str, messages: List[Dict[str, Any]]) -> Dict[str, Any]:
+    prompt_tokens = sum(len(str(m.get("content") or "")) for m in messages) // 4
+    completion_tokens = max(1, len(answer) // 4)
+    return {
+        "id": f"chatcmpl-standin-{index}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": answer},
+            "finish_reason": "stop",
+            "logprobs": None,
+        }],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        },
+    }
+
+
+class StandinAPIError(Exception):
+    """Raised by StandinChatClient for injected failures, like the SDK's APIStatusError"""
+
+    def __init__(self, status_code: int, body: Dict[str, Any]):
+        super().__init__(f"Error code: {status_code} - {body}")
+        self.status_code = status_code
+        self.body = body
+
+
+class StandinChatClient:
+    """
+    In-process client with the SDK's `chat.completions.create()` shape, for
+    harnesses that skip HTTP. Latency is slept on the calling thread and a
+    hang longer than `timeout` raises TimeoutError.
+    """
+
+    def __init__(self, standin: OpenAIStandin, timeout: float = 30.0):
+        self.standin = standin
+        self.timeout = timeout
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, model: str, messages: List[Dict[str, Any]], **kwargs):
+        status, body, delay, _ = self.standin.respond({"model": model, "messages": messages})
+        if delay > self.timeout:
+            time.sleep(self.timeout)
+            raise TimeoutError("Request timed out.")
+        time.sleep(delay)
+        if status != 200:
+            raise StandinAPIError(status, body)
+        choices = [
+            SimpleNamespace(index=c["index"], finish_reason=c["finish_reason"], message=SimpleNamespace(**c["message"]))
+            for c in body["choices"]
+        ]
+        return SimpleNamespace(id=body["id"], model=body["model"], choices=choices, usage=SimpleNamespace(**body["usage"]))
+
+
+class Recorder:
+    """Forwards requests to the real API and stores the answers in a cassette"""
+
+    def __init__(self, cassette: Cassette, path: str, api_key: str, base_url: Optional[str] = None):
+        from openai import OpenAI
+        self.cassette = cassette
+        self.path = path
+        self.client = OpenAI(api_key=api_key, base_url=base_url)
+
+    def forward(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        started = time.perf_counter()
+        response = self.client.chat.completions.create(**body)
+        latency_ms = (time.perf_counter() - started) * 1000
+        messages = body.get("messages") or []
+        answer = (response.choices[0].message.content or "").strip()
+        self.cassette.add(request_key(body.get("model", ""), messages), zoom_name(messages), answer, latency_ms)
+        self.cassette.save(self.path)
+        return response.model_dump()
+
+
+def create_app(standin: OpenAIStandin, recorder: Optional[Recorder] = None) -> FastAPI:
+    app = FastAPI(title="OpenAI stand-in")
+    app.state.standin = standin
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        try:
+            body = json.loads(await request.body())
+        except ValueError:
+            return JSONResponse(error_body("We could not parse the JSON body of your request.", "invalid_request_error"),
+                                status_code=400)
+        if body.get("stream"):
+            return JSONResponse(error_body("Streaming is not supported by the stand-in.", "invalid_request_error"),
+                                status_code=400)
+        if recorder:
+            return JSONResponse(await asyncio.to_thread(recorder.forward, body))
+
+        status, content, delay, _ = standin.respond(body)
+        if delay:
+            await asyncio.sleep(delay)
+        return JSONResponse(content, status_code=status)
+
+    @app.get("/v1/models")
+    async def list_models():
+        return {"object": "list", "data": [{"id": "gpt-4o-mini", "object": "model", "owned_by": "standin"}]}
+
+    @app.get("/_standin/calls")
+    async def get_calls(since: int = 0):
+        return standin.recorded_calls(since)
+
+    @app.get("/_standin/stats")
+    async def get_stats():
+        return standin.stats()
+
+    @app.put("/_standin/behavior")
+    async def put_behavior(request: Request):
+        try:
+            standin.behavior.update(json.loads(await request.body() or b"{}"))
+        except (TypeError, ValueError) as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return asdict(standin.behavior)
+
+    return app
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Offline stand-in for the OpenAI chat-completions API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8091)
+    parser.add_argument("--cassette", help="Scripted/recorded answers (JSON)")
+    parser.add_argument("--latency", choices=["fixed", "uniform", "lognormal", "recorded"], default="fixed")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Fixed value, uniform mean or lognormal median")
+    parser.add_argument("--latency-spread", type=float, default=0.0, help="Uniform +/- ms, or lognormal sigma")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--timeout-rate", type=float, default=0.0)
+    parser.add_argument("--hang-ms", type=float, default=60000.0)
+    parser.add_argument("--fallback", choices=["oracle", "no_match"], default="oracle")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--record", metavar="FILE", help="Forward to the real API and save answers to FILE")
+    parser.add_argument("--upstream-url", help="Base URL of the API to record from (default api.openai.com)")
+    parser.add_argument("--upstream-key", help="API key for recording")
+    args = parser.parse_args(argv)
+
+    cassette = Cassette.load(args.cassette) if args.cassette else Cassette()
+    behavior = Behavior(args.latency, args.latency_ms, args.latency_spread, args.error_rate,
+                        args.rate_limit_rate, args.timeout_rate, args.hang_ms, args.fallback)
+    recorder = None
+    if args.record:
+        if not args.upstream_key:
+            parser.error("--record needs --upstream-key")
+        recorder = Recorder(cassette, args.record, args.upstream_key, args.upstream_url)
+
+    standin = OpenAIStandin(cassette, behavior, args.seed)
+    logger.info("Serving chat completions on http://%s:%d/v1 (%s)", args.host, args.port,
+                "recording" if recorder else f"{len(cassette.by_name)} scripted, {len(cassette.recorded)} recorded")
+    uvicorn.run(create_app(standin, recorder), host=args.host, port=args.port, log_level="warning")
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    sys.exit(main())
@@ -0,0 +1,49 @@
+"""Run a stand-in FastAPI app with uvicorn on a background thread."""
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+import uvicorn
+
+
+class StandinServer:
+    """Serves `app` in-process; port 0 picks a free port, available as `url` after start()"""
+
+    def __init__(self, app, host: str = "127.0.0.1", port: int = 0, name: str = "standin"):
+        self.name = name
+        self.server = uvicorn.Server(uvicorn.Config(app, host=host, port=port, log_level="warning", access_log=False))
+        self.thread: Optional[threading.Thread] = None
+        self.url: Optional[str] = None
+
+    def start(self, timeout: float = 10.0) -> "StandinServer":
+        self.thread = threading.Thread(target=self.server.run, name=self.name, daemon=True)
+        self.thread.start()
+        deadline = time.monotonic() + timeout
+        while not self.server.started:
+            if not self.thread.is_alive() or time.monotonic() > deadline:
+                raise RuntimeError(f"{self.name} did not start")
+            time.sleep(0.01)
+        host, port = self.server.servers[0].sockets[0].getsockname()[:2]
+        self.url = f"http://{host}:{port}"
+        return self
+
+    def stop(self):
+        self.server.should_exit = True
+        if self.thread:
+            self.thread.join(5)
+            self.thread = None
+
+
+def state_env(workdir: str) -> Dict[str, str]:
+    """Settings that keep the service's State/ and Raw/ files under `workdir` instead of the checkout"""
+    state = os.path.join(workdir, "State")
+    return {
+        "DEDUP_DB_PATH": os.path.join(state, "webhook_dedup.db"),
+        "VERIFICATION_STATE_PATH": os.path.join(state, "verification_state.json"),
+        "OUTBOX_DB_PATH": os.path.join(state, "nocodb_outbox.db"),
+        "UNIDENTIFIED_DB_PATH": os.path.join(state, "unidentified.db"),
+        "STORAGE_DB_PATH": os.path.join(state, "attendance.db"),
+        "WEBHOOK_LOG_DIR": os.path.join(workdir, "Raw", "log"),
+        "ARCHIVE_DIR": os.path.join(workdir, "Raw", "archive"),
+    }
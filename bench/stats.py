@@ -0,0 +1,26 @@
+"""Latency summaries shared by the load generator, benchmarks and evaluation harness."""
+import math
+from typing import Dict, Iterable, List, Optional
+
+
+def percentile(sorted_values: List[float], q: float) -> Optional[float]:
+    """Nearest-rank percentile (q in 0..100) of an already sorted list"""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(q / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize(values_ms: Iterable[float]) -> Dict[str, Optional[float]]:
+    """count, mean, p50/p95/p99 and max of latencies in milliseconds"""
+    values = sorted(values_ms)
+    if not values:
+        return {"count": 0, "mean": None, "p50": None, "p95": None, "p99": None, "max": None}
+    return {
+        "count": len(values),
+        "mean": round(sum(values) / len(values), 3),
+        "p50": round(percentile(values, 50), 3),
+        "p95": round(percentile(values, 95), 3),
+        "p99": round(percentile(values, 99), 3),
+        "max": round(values[-1], 3),
+    }
@@ -0,0 +1,291 @@
+"""
+Compressed, indexed archive of sealed webhook log days.
+
+Once a UTC day is over and every record in it has been processed, its log
+segments (see event_log.py) are rewritten as one archive file per day:
+
+    YYYY-MM-DD.events.zst   (or .gz without the zstandard package)
+    YYYY-MM-DD.index.json
+
+Records are grouped by meeting uuid and each meeting is compressed as an
+independent frame, so fetching one meeting reads and decompresses only its
+byte range. The sidecar index maps meeting uuid -> frame byte range and
+normalized participant name -> (frame, line) offsets.
+
+Usage:
+    python event_archive.py seal [--log-dir Raw/log] [--archive-dir Raw/archive]
+    python event_archive.py days
+    python event_archive.py meeting <meeting_uuid> [--date YYYY-MM-DD]
+    python event_archive.py participant <name> [--date YYYY-MM-DD]
+"""
+import argparse
+import datetime
+import gzip
+import json
+import logging
+import os
+import sys
+from collections import defaultdict
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from event_log import CHECKPOINT_FILE, LogRecord, iter_segment, list_segments
+
+try:
+    import zstandard
+except ImportError:  # optional dependency
+    zstandard = None
+
+logger = logging.getLogger("zoom_attendance.event_archive")
+
+ARCHIVE_DIR = "Raw/archive"
+LOG_DIR = "Raw/log"
+CODEC_EXTENSIONS = {"zstd": ".zst", "gzip": ".gz"}
+
+
+def default_codec() -> str:
+    return "zstd" if zstandard is not None else "gzip"
+
+
+def compress(data: bytes, codec: str) -> bytes:
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("zstd archives need the zstandard package")
+        return zstandard.ZstdCompressor(level=10).compress(data)
+    return gzip.compress(data, compresslevel=6)
+
+
+def decompress(data: bytes, codec: str) -> bytes:
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("zstd archives need the zstandard package")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+def normalize_name(name: str) -> str:
+    return " ".join(name.lower().split())
+
+
+def record_keys(record: LogRecord) -> Tuple[str, Optional[str]]:
+    """Meeting uuid ("" if none) and participant name of a logged event"""
+    obj = (record.body.get("payload") or {}).get("object") or {}
+    participant = obj.get("participant") or {}
+    name = participant.get("user_name")
+    return obj.get("uuid") or "", normalize_name(name) if name else None
+
+
+def encode_line(record: LogRecord) -> bytes:
+    return json.dumps(record._asdict(), separators=(",", ":"), ensure_ascii=False).encode("utf-8") + b"\n"
+
+
+def decode_lines(data: bytes) -> Iterator[LogRecord]:
+    for line in data.splitlines():
+        if line:
+            yield LogRecord(**json.loads(line))
+
+
+class EventArchive:
+    """Read and write the per-day archive files in one directory"""
+
+    def __init__(self, directory: str = ARCHIVE_DIR):
+        self.directory = directory
+
+    def index_path(self, day: str) -> str:
+        return os.path.join(self.directory, f"{day}.index.json")
+
+    def days(self) -> List[str]:
+        """Archived days, oldest first"""
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+        return sorted(name[:-len(".index.json")] for name in names if name.endswith(".index.json"))
+
+    def select_days(self, days: Optional[Iterable[str]]) -> List[str]:
+        """Requested days that are archived (all archived days if none requested)"""
+        available = self.days()
+        if days is None:
+            return available
+        return [day for day in days if day in available]
+
+    def load_index(self, day: str) -> Dict[str, Any]:
+        with open(self.index_path(day), encoding="utf-8") as f:
+            return json.load(f)
+
+    def write_day(self, day: str, records: Iterable[LogRecord], codec: str) -> Dict[str, Any]:
+        """Write one day's records as meeting-grouped frames plus the sidecar index"""
+        by_meeting: Dict[str, List[LogRecord]] = defaultdict(list)
+        count = 0
+        for record in records:
+            by_meeting[record_keys(record)[0]].append(record)
+            count += 1
+
+        os.makedirs(self.directory, exist_ok=True)
+        archive_name = f"{day}.events{CODEC_EXTENSIONS[codec]}"
+        archive_path = os.path.join(self.directory, archive_name)
+        meetings: Dict[str, List[int]] = {}
+        participants: Dict[str, List[List[int]]] = defaultdict(list)
+
+        offset = 0
+        with open(archive_path + ".tmp", "wb") as f:
+            for meeting_uuid in sorted(by_meeting):
+                frame_records = sorted(by_meeting[meeting_uuid], key=lambda r: r.seq)
+                lines = [encode_line(record) for record in frame_records]
+                frame = compress(b"".join(lines), codec)
+                f.write(frame)
+                meetings[meeting_uuid] = [offset, len(frame), len(lines)]
+
+                line_offset = 0
+                for record, line in zip(frame_records, lines):
+                    name = record_keys(record)[1]
+                    if name:
+                        participants[name].append([offset, len(frame), line_offset, len(line)])
+                    line_offset += len(line)
+                offset += len(frame)
+            f.flush()
+            os.fsync(f.fileno())
+
+        index = {
+            "day": day,
+            "codec": codec,
+            "archive": archive_name,
+            "records": count,
+            "meetings": meetings,
+            "participants": participants,
+        }
+        with open(self.index_path(day) + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(index, f, separators=(",", ":"))
+            f.flush()
+            os.fsync(f.fileno())
+
+        # Archive first, index last: a day only counts as archived once its index exists
+        os.replace(archive_path + ".tmp", archive_path)
+        os.replace(self.index_path(day) + ".tmp", self.index_path(day))
+        return index
+
+    def read_frame(self, index: Dict[str, Any], offset: int, length: int) -> bytes:
+        with open(os.path.join(self.directory, index["archive"]), "rb") as f:
+            f.seek(offset)
+            return decompress(f.read(length), index["codec"])
+
+    def meeting_events(self, meeting_uuid: str, days: Optional[Iterable[str]] = None) -> List[LogRecord]:
+        """All archived events of one meeting, decompressing only its frames"""
+        events = []
+        for day in self.select_days(days):
+            index = self.load_index(day)
+            entry = index["meetings"].get(meeting_uuid)
+            if entry:
+                events.extend(decode_lines(self.read_frame(index, entry[0], entry[1])))
+        return events
+
+    def participant_events(self, name: str, days: Optional[Iterable[str]] = None) -> List[LogRecord]:
+        """All archived events whose participant user_name matches (case/space-insensitive)"""
+        key = normalize_name(name)
+        events = []
+        for day in self.select_days(days):
+            index = self.load_index(day)
+            frames: Dict[Tuple[int, int], bytes] = {}
+            for offset, length, line_offset, line_length in index["participants"].get(key, []):
+                if (offset, length) not in frames:
+                    frames[(offset, length)] = self.read_frame(index, offset, length)
+                line = frames[(offset, length)][line_offset:line_offset + line_length]
+                events.extend(decode_lines(line))
+        return events
+
+    def iter_day(self, day: str) -> Iterator[LogRecord]:
+        """Stream a whole archived day, one meeting frame at a time"""
+        index = self.load_index(day)
+        with open(os.path.join(self.directory, index["archive"]), "rb") as f:
+            for offset, length, _ in sorted(index["meetings"].values()):
+                f.seek(offset)
+                yield from decode_lines(decompress(f.read(length), index["codec"]))
+
+
+def read_checkpoint(log_dir: str) -> int:
+    try:
+        with open(os.path.join(log_dir, CHECKPOINT_FILE), encoding="utf-8") as f:
+            return int(json.load(f).get("done_through", 0))
+    except (OSError, ValueError, AttributeError):
+        return 0
+
+
+def seal_days(log_dir: str = LOG_DIR, archive_dir: str = ARCHIVE_DIR, codec: Optional[str] = None) -> List[str]:
+    """
+    Archive every finished UTC day of log segments and delete the segments.
+    A day is skipped while any of its records is still past the log checkpoint.
+    """
+    codec = codec or default_codec()
+    archive = EventArchive(archive_dir)
+    today = datetime.datetime.now(datetime.timezone.utc).strftime("%Y-%m-%d")
+    checkpoint = read_checkpoint(log_dir)
+    archived_days = set(archive.days())
+
+    segments_by_day: Dict[str, List[str]] = defaultdict(list)
+    for _, day, path in list_segments(log_dir):
+        if day < today:
+            segments_by_day[day].append(path)
+
+    sealed = []
+    for day, paths in sorted(segments_by_day.items()):
+        if day in archived_days:
+            # Archived before a crash removed the segments
+            logger.warning("Day %s already archived - removing %d leftover segment(s)", day, len(paths))
+        else:
+            records = [record for path in paths for _, _, record in iter_segment(path)]
+            if any(record.seq > checkpoint for record in records):
+                logger.info("Day %s still has unprocessed events - not archiving yet", day)
+                continue
+            index = archive.write_day(day, records, codec)
+            logger.info("Archived %d event(s) for %s across %d meeting(s)",
+                        index["records"], day, len(index["meetings"]))
+            sealed.append(day)
+
+        for path in paths:
+            os.remove(path)
+    return sealed
+
+
+def print_records(records: List[LogRecord]):
+    for record in records:
+        print(json.dumps(record._asdict(), ensure_ascii=False))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Webhook raw-event archive")
+    parser.add_argument("--archive-dir", default=os.getenv("ARCHIVE_DIR", ARCHIVE_DIR))
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    seal = commands.add_parser("seal", help="Archive finished days from the webhook log")
+    seal.add_argument("--log-dir", default=os.getenv("WEBHOOK_LOG_DIR", LOG_DIR))
+    seal.add_argument("--codec", choices=sorted(CODEC_EXTENSIONS), default=None)
+
+    commands.add_parser("days", help="List archived days")
+
+    meeting = commands.add_parser("meeting", help="Print all events of one meeting")
+    meeting.add_argument("uuid")
+    meeting.add_argument("--date", action="append", help="Only search this day (repeatable)")
+
+    participant = commands.add_parser("participant", help="Print all events of one participant name")
+    participant.add_argument("name")
+    participant.add_argument("--date", action="append", help="Only search this day (repeatable)")
+
+    args = parser.parse_args(argv)
+    archive = EventArchive(args.archive_dir)
+
+    if args.command == "seal":
+        sealed = seal_days(args.log_dir, args.archive_dir, args.codec)
+        print(f"Archived {len(sealed)} day(s): {', '.join(sealed) or '-'}")
+    elif args.command == "days":
+        for day in archive.days():
+            index = archive.load_index(day)
+            print(f"{day}\t{index['records']} events\t{len(index['meetings'])} meetings\t{index['codec']}")
+    elif args.command == "meeting":
+        print_records(archive.meeting_events(args.uuid, args.date))
+    elif args.command == "participant":
+        print_records(archive.participant_events(args.name, args.date))
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    sys.exit(main())
@@ -0,0 +1,312 @@
+"""
+Segmented, append-only write-ahead log for incoming webhooks.
+
+Each verified webhook becomes one compact JSON line in the active segment:
+
+    {"seq":1,"received_at":1740520928.123,"event":"meeting.participant_joined","body":{...}}
+
+Appends are handed to a background writer thread which batches whatever
+arrives within the commit interval into one write + fsync (group commit).
+Segments rotate by size, age and UTC day and are named
+``events-YYYY-MM-DD-<first seq>.log`` so they sort in sequence order.
+
+The log doubles as a crash-safe queue: records appended with ``track=True``
+stay pending until ``mark_done`` is called, and ``checkpoint.json`` records
+the sequence number below which everything is done. After a crash,
+``pending_records()`` returns what still has to be processed.
+"""
+import asyncio
+import datetime
+import json
+import logging
+import os
+import queue
+import re
+import threading
+import time
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+logger = logging.getLogger("zoom_attendance.event_log")
+
+SEGMENT_PATTERN = re.compile(r"^events-(\d{4}-\d{2}-\d{2})-(\d{12})\.log$")
+CHECKPOINT_FILE = "checkpoint.json"
+
+
+class LogRecord(NamedTuple):
+    seq: int
+    received_at: float
+    event: str
+    body: Dict[str, Any]
+
+
+def segment_name(day: str, first_seq: int) -> str:
+    return f"events-{day}-{first_seq:012d}.log"
+
+
+def list_segments(directory: str) -> List[Tuple[int, str, str]]:
+    """Return (first_seq, day, path) for every segment, oldest first"""
+    segments = []
+    try:
+        names = os.listdir(directory)
+    except FileNotFoundError:
+        return []
+    for name in names:
+        match = SEGMENT_PATTERN.match(name)
+        if match:
+            segments.append((int(match.group(2)), match.group(1), os.path.join(directory, name)))
+    segments.sort()
+    return segments
+
+
+def iter_segment(path: str) -> Iterator[Tuple[int, int, LogRecord]]:
+    """
+    Yield (offset, length, record) for each line of a segment.
+    A torn final line (crash mid-write) is skipped.
+    """
+    offset = 0
+    with open(path, "rb") as f:
+        for line in f:
+            length = len(line)
+            try:
+                data = json.loads(line)
+                record = LogRecord(data["seq"], data["received_at"], data["event"], data["body"])
+            except (ValueError, KeyError, TypeError):
+                logger.warning("Skipping unreadable log line in %s at offset %d", path, offset)
+            else:
+                yield offset, length, record
+            offset += length
+
+
+def encode_record(seq: int, received_at: float, event_type: str, body: bytes) -> bytes:
+    """Build one log line around the raw (already validated) JSON body"""
+    if b"\n" in body or b"\r" in body:
+        # Raw newlines in valid JSON can only be whitespace
+        body = body.replace(b"\r", b" ").replace(b"\n", b" ")
+    return b'{"seq":%d,"received_at":%.3f,"event":%s,"body":%s}\n' % (
+        seq, received_at, json.dumps(event_type).encode("utf-8"), body
+    )
+
+
+class WebhookLog:
+    """Append-only webhook log with a background group-commit writer"""
+
+    def __init__(self, directory: str, segment_max_bytes: int, segment_max_seconds: float,
+                 commit_interval_seconds: float):
+        self.directory = directory
+        self.segment_max_bytes = segment_max_bytes
+        self.segment_max_seconds = segment_max_seconds
+        self.commit_interval_seconds = commit_interval_seconds
+
+        self.lock = threading.Lock()
+        self.queue: "queue.Queue[Optional[Tuple[int, bytes, Any]]]" = queue.Queue()
+        self.thread: Optional[threading.Thread] = None
+
+        self.last_seq = 0
+        self.written_seq = 0
+        self.pending: Set[int] = set()
+        self.checkpoint = 0
+        self.saved_checkpoint = 0
+
+        self.segment = None
+        self.segment_day = None
+        self.segment_size = 0
+        self.segment_opened_at = 0.0
+
+        os.makedirs(directory, exist_ok=True)
+        self.checkpoint = self.saved_checkpoint = self.load_checkpoint()
+        self.last_seq = self.written_seq = max(self.checkpoint, self.find_last_seq())
+
+    def find_last_seq(self) -> int:
+        """Highest sequence number on disk, read from the newest segment"""
+        for _, _, path in reversed(list_segments(self.directory)):
+            last = None
+            for _, _, record in iter_segment(path):
+                last = record.seq
+            if last is not None:
+                return last
+        return 0
+
+    def load_checkpoint(self) -> int:
+        try:
+            with open(os.path.join(self.directory, CHECKPOINT_FILE), encoding="utf-8") as f:
+                return int(json.load(f).get("done_through", 0))
+        except FileNotFoundError:
+            return 0
+        except (OSError, ValueError, AttributeError) as e:
+            logger.warning("Ignoring unreadable log checkpoint: %s", e)
+            return 0
+
+    def save_checkpoint(self, done_through: int):
+        path = os.path.join(self.directory, CHECKPOINT_FILE)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"done_through": done_through, "updated_at": time.time()}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+        self.saved_checkpoint = done_through
+
+    def pending_records(self) -> List[LogRecord]:
+        """
+        Return records logged after the checkpoint (candidates for recovery),
+        all marked pending; call mark_done for each once it is handled.
+        Call before start() so the checkpoint cannot move past them.
+        """
+        records = []
+        segments = list_segments(self.directory)
+        for index, (first_seq, _, path) in enumerate(segments):
+            # Segments that end at or before the checkpoint hold nothing pending
+            if index + 1 < len(segments) and segments[index + 1][0] <= self.checkpoint + 1:
+                continue
+            for _, _, record in iter_segment(path):
+                if record.seq > self.checkpoint:
+                    records.append(record)
+        with self.lock:
+            self.pending.update(record.seq for record in records)
+        return records
+
+    def start(self):
+        self.thread = threading.Thread(target=self.run, name="webhook-log-writer", daemon=True)
+        self.thread.start()
+        logger.info("Webhook log writing to %s (last seq %d, checkpoint %d)",
+                    self.directory, self.last_seq, self.checkpoint)
+
+    def close(self):
+        """Drain the queue, seal the active segment and persist the checkpoint"""
+        if self.thread:
+            self.queue.put(None)
+            self.thread.join()
+            self.thread = None
+
+    def enqueue(self, event_type: str, body: bytes, waiter: Any = None, track: bool = False) -> int:
+        if self.thread is None:
+            # Used without the app lifespan (e.g. a bare TestClient)
+            self.start()
+        with self.lock:
+            self.last_seq += 1
+            seq = self.last_seq
+            if track:
+                self.pending.add(seq)
+            # Put under the lock so queue order matches sequence order
+            self.queue.put((seq, encode_record(seq, time.time(), event_type, body), waiter))
+        return seq
+
+    async def append(self, event_type: str, body: bytes, durable: bool = True, track: bool = False) -> int:
+        """
+        Log a webhook body and return its sequence number. With durable=True
+        this waits until the record's group commit has been fsynced.
+        """
+        if not durable:
+            return self.enqueue(event_type, body, track=track)
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        seq = self.enqueue(event_type, body, (loop, future), track)
+        await future
+        return seq
+
+    def mark_done(self, seq: int):
+        """Processing of a tracked record finished (successfully or not)"""
+        with self.lock:
+            self.pending.discard(seq)
+
+    def done_through(self) -> int:
+        with self.lock:
+            return min(self.pending) - 1 if self.pending else self.written_seq
+
+    def run(self):
+        while True:
+            try:
+                item = self.queue.get(timeout=1.0)
+            except queue.Empty:
+                self.commit([])
+                continue
+            if item is None:
+                break
+
+            batch = [item]
+            deadline = time.monotonic() + self.commit_interval_seconds
+            while True:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = self.queue.get(timeout=remaining) if remaining > 0 else self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    self.commit(batch)
+                    self.seal()
+                    return
+                batch.append(item)
+            self.commit(batch)
+
+        self.commit([])
+        self.seal()
+
+    def commit(self, batch: List[Tuple[int, bytes, Any]]):
+        """Write a batch, fsync once, then release everyone waiting on it"""
+        error = None
+        if batch:
+            try:
+                for seq, line, _ in batch:
+                    self.rotate_if_needed(seq, len(line))
+                    self.segment.write(line)
+                    self.segment_size += len(line)
+                self.segment.flush()
+                os.fsync(self.segment.fileno())
+                with self.lock:
+                    self.written_seq = batch[-1][0]
+            except OSError as e:
+                logger.exception("Webhook log write failed")
+                error = e
+
+        for _, _, waiter in batch:
+            if waiter is not None:
+                loop, future = waiter
+                loop.call_soon_threadsafe(self.resolve, future, error)
+
+        done_through = self.done_through()
+        if done_through != self.saved_checkpoint:
+            try:
+                self.save_checkpoint(done_through)
+            except OSError:
+                logger.exception("Could not save webhook log checkpoint")
+
+        if self.segment and time.time() - self.segment_opened_at >= self.segment_max_seconds:
+            # Let an idle segment age out so it can be sealed and archived
+            self.seal()
+
+    @staticmethod
+    def resolve(future: "asyncio.Future", error: Optional[Exception]):
+        if future.done():
+            return
+        if error is None:
+            future.set_result(None)
+        else:
+            future.set_exception(error)
+
+    def rotate_if_needed(self, seq: int, size: int):
+        now = time.time()
+        day = datetime.datetime.fromtimestamp(now, datetime.timezone.utc).strftime("%Y-%m-%d")
+        if self.segment is not None and (
+            day != self.segment_day
+            or (self.segment_size and self.segment_size + size > self.segment_max_bytes)
+            or now - self.segment_opened_at >= self.segment_max_seconds
+        ):
+            self.seal()
+        if self.segment is None:
+            path = os.path.join(self.directory, segment_name(day, seq))
+            self.segment = open(path, "ab")
+            self.segment_day = day
+            self.segment_size = 0
+            self.segment_opened_at = now
+
+    def seal(self):
+        """Close the active segment; the next write opens a new one"""
+        if self.segment is None:
+            return
+        try:
+            self.segment.flush()
+            os.fsync(self.segment.fileno())
+        finally:
+            self.segment.close()
+            self.segment = None
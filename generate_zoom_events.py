@@ -0,0 +1,157 @@
+"""
+Generate typed Zoom webhook event models from ref_scripts/webhookFormats.txt.
+
+Only the fields the app actually reads (USED_FIELDS) are emitted, so decoding
+skips everything else; fields the schema marks as required stay required.
+
+Usage:
+    python generate_zoom_events.py [formats_file] [output_file]
+"""
+import argparse
+import json
+import os
+import re
+import sys
+from typing import Any, Dict, List, Optional
+
+FORMATS_FILE = "ref_scripts/webhookFormats.txt"
+OUTPUT_FILE = "zoom_events.py"
+
+# Fields we read, keyed by their path inside the event body
+USED_FIELDS = {
+    "": {"event", "event_ts", "payload"},
+    "payload": {"account_id", "object"},
+    "payload.object": {"uuid", "participant"},
+    "payload.object.participant": {"user_name", "participant_uuid", "join_time", "leave_time"},
+}
+
+JSON_TYPES = {"string": "str", "integer": "int", "number": "float", "boolean": "bool"}
+
+HEADER = '''"""
+Typed Zoom webhook event models.
+
+Generated by generate_zoom_events.py from ref_scripts/webhookFormats.txt - do not edit by hand.
+"""
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass
+class HeaderPayload:
+    account_id: Optional[str] = None
+
+
+@dataclass
+class EventHeader:
+    """Event name and account, for routing and verification before the full decode"""
+    event: str
+    payload: Optional[HeaderPayload] = None
+
+
+@dataclass
+class GenericObject:
+    uuid: Optional[str] = None
+
+
+@dataclass
+class GenericPayload:
+    account_id: Optional[str] = None
+    object: Optional[GenericObject] = None
+    plainToken: Optional[str] = None
+
+
+@dataclass
+class GenericEvent:
+    """Fallback model for events without a schema (e.g. endpoint.url_validation)"""
+    event: str
+    payload: GenericPayload
+    event_ts: Optional[int] = None
+'''
+
+
+def read_schemas(path: str) -> Dict[str, Dict[str, Any]]:
+    """Return {event_name: json_schema} for every section in the formats file"""
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+
+    schemas = {}
+    # Each section starts with the event name on an unindented line
+    for section in re.split(r"^(?=\S)", text, flags=re.M):
+        if "\tSchema" not in section:
+            continue
+        name = section.splitlines()[0].strip()
+        schemas[name] = json.loads(section.split("\tSchema", 1)[1])["schema"]
+    return schemas
+
+
+def class_name(*parts: str) -> str:
+    return "".join(word.capitalize() for part in parts for word in re.split(r"[._]", part) if word)
+
+
+def emit_class(event_class: str, name: str, schema: Dict[str, Any], path: str, classes: List[str]) -> None:
+    """Emit a dataclass for an object schema (nested objects first)"""
+    used = USED_FIELDS.get(path, set())
+    required = set(schema.get("required", []))
+    required_lines, optional_lines = [], []
+
+    for field, spec in schema.get("properties", {}).items():
+        if field not in used:
+            continue
+
+        if spec.get("type") == "object":
+            field_type = event_class + class_name(field)
+            child_path = f"{path}.{field}" if path else field
+            emit_class(event_class, field_type, spec, child_path, classes)
+        else:
+            field_type = JSON_TYPES.get(spec.get("type"), "object")
+
+        if field in required:
+            required_lines.append(f"    {field}: {field_type}")
+        else:
+            optional_lines.append(f"    {field}: Optional[{field_type}] = None")
+
+    body = required_lines + optional_lines or ["    pass"]
+    classes.append(f"@dataclass\nclass {name}:\n" + "\n".join(body) + "\n")
+
+
+def generate(formats_file: str = FORMATS_FILE) -> str:
+    classes: List[str] = []
+    registry = []
+    for event_name, schema in read_schemas(formats_file).items():
+        name = class_name(event_name)
+        emit_class(name, name, schema, "", classes)
+        registry.append(f'    "{event_name}": {name},')
+
+    return (
+        HEADER
+        + "\n\n"
+        + "\n\n".join(classes)
+        + "\n\n# Event name -> model\nEVENT_MODELS = {\n"
+        + "\n".join(registry)
+        + "\n}\n"
+    )
+
+
+def write_atomically(output_file: str, text: str) -> None:
+    """Replace output_file only once the new contents are fully written"""
+    tmp_path = output_file + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp_path, output_file)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Generate typed Zoom webhook event models")
+    parser.add_argument("formats_file", nargs="?", default=FORMATS_FILE, help="Webhook formats reference")
+    parser.add_argument("output_file", nargs="?", default=OUTPUT_FILE, help="Module to write")
+    args = parser.parse_args(argv)
+
+    # Generate first, so a bad formats file leaves the existing models untouched
+    text = generate(args.formats_file)
+    write_atomically(args.output_file, text)
+    print(f"Wrote {args.output_file}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
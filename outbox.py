@@ -0,0 +1,243 @@
+"""
+Durable outbox for outbound NocoDB writes.
+
+Writes are inserted into a small SQLite table (WAL) and acknowledged right
+away; a background sender thread drains the table in order. Failed sends
+are retried with exponential backoff and full jitter, and a circuit
+breaker stops sending while the backend keeps failing. Rows may also be
+added by another process (replay.py), so the sender polls at least every
+`poll_seconds` and claims a row with a lease before sending it, which lets
+two senders share one database without delivering a row twice. Requests that can
+never succeed (4xx other than 408/425/429) or run out of attempts are kept as
+dead letters for inspection.
+"""
+import json
+import logging
+import pathlib
+import random
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger("zoom_attendance.outbox")
+
+RETRYABLE_STATUS = {408, 425, 429}
+# How long a claimed row stays reserved for the sender that claimed it
+CLAIM_SECONDS = 120.0
+
+
+class CircuitBreaker:
+    """
+    Closed -> open after `failure_threshold` consecutive failures; open ->
+    half-open after `reset_seconds`, where a single trial request decides
+    whether to close again or re-open.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int, reset_seconds: float):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+
+    def allow(self) -> bool:
+        if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_seconds:
+            self.state = self.HALF_OPEN
+            logger.info("Circuit breaker half-open, sending a trial request")
+        return self.state != self.OPEN
+
+    def retry_in(self) -> float:
+        """Seconds until an open breaker lets a trial request through"""
+        if self.state != self.OPEN:
+            return 0.0
+        return max(0.0, self.opened_at + self.reset_seconds - time.monotonic())
+
+    def record_success(self):
+        if self.state != self.CLOSED:
+            logger.info("Circuit breaker closed")
+        self.state = self.CLOSED
+        self.failures = 0
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                logger.warning("Circuit breaker open after %d failure(s)", self.failures)
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+
+
+class Outbox:
+    """SQLite-backed queue of outbound requests with a background sender"""
+
+    def __init__(self, db_path: str, send: Callable[[str, str, Any], int], max_attempts: int,
+                 backoff_base_seconds: float, backoff_max_seconds: float, breaker: CircuitBreaker,
+                 poll_seconds: float = 5.0):
+        self.send = send
+        self.poll_seconds = poll_seconds
+        self.max_attempts = max_attempts
+        self.backoff_base_seconds = backoff_base_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+        self.breaker = breaker
+
+        pathlib.Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS outbox ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " method TEXT NOT NULL,"
+            " path TEXT NOT NULL,"
+            " payload TEXT NOT NULL,"
+            " attempts INTEGER NOT NULL DEFAULT 0,"
+            " next_attempt_at REAL NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " last_error TEXT,"
+            " dead INTEGER NOT NULL DEFAULT 0)"
+        )
+        self.db.execute("CREATE INDEX IF NOT EXISTS outbox_due ON outbox (dead, next_attempt_at)")
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.stopping = False
+        self.thread: Optional[threading.Thread] = None
+
+    def enqueue(self, method: str, path: str, payload: Any) -> int:
+        """Store a request for delivery and return its outbox id"""
+        now = time.time()
+        with self.lock:
+            cursor = self.db.execute(
+                "INSERT INTO outbox (method, path, payload, next_attempt_at, created_at) VALUES (?, ?, ?, ?, ?)",
+                (method, path, json.dumps(payload), now, now)
+            )
+        self.wakeup.set()
+        return cursor.lastrowid
+
+    def start(self):
+        self.thread = threading.Thread(target=self.run, name="nocodb-outbox", daemon=True)
+        self.thread.start()
+        logger.info("Outbox sender started with %d request(s) pending", self.stats()["pending"])
+
+    def stop(self, timeout: float = 5.0):
+        self.stopping = True
+        self.wakeup.set()
+        if self.thread:
+            self.thread.join(timeout)
+            self.thread = None
+
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            pending, dead = self.db.execute(
+                "SELECT COALESCE(SUM(dead = 0), 0), COALESCE(SUM(dead = 1), 0) FROM outbox"
+            ).fetchone()
+            oldest = self.db.execute("SELECT MIN(created_at) FROM outbox WHERE dead = 0").fetchone()[0]
+        return {
+            "pending": pending,
+            "dead": dead,
+            "oldest_pending_age_seconds": round(time.time() - oldest, 1) if oldest else 0,
+            "breaker": self.breaker.state,
+        }
+
+    def backoff(self, attempts: int) -> float:
+        """Full jitter: uniform in [0, min(max, base * 2^attempts)]"""
+        return random.uniform(0, min(self.backoff_max_seconds, self.backoff_base_seconds * (2 ** attempts)))
+
+    def next_due(self):
+        with self.lock:
+            return self.db.execute(
+                "SELECT id, method, path, payload, attempts, next_attempt_at FROM outbox"
+                " WHERE dead = 0 ORDER BY next_attempt_at, id LIMIT 1"
+            ).fetchone()
+
+    def claim(self, row_id: int, due_at: float) -> bool:
+        """Reserve a due row for this sender; False if another sender got it first"""
+        with self.lock:
+            return self.db.execute(
+                "UPDATE outbox SET next_attempt_at = ? WHERE id = ? AND dead = 0 AND next_attempt_at = ?",
+                (time.time() + CLAIM_SECONDS, row_id, due_at)
+            ).rowcount == 1
+
+    def run(self):
+        while not self.stopping:
+            row = self.next_due()
+            # Enqueue wakes us early; the poll picks up rows other processes added
+            wait = self.poll_seconds
+            if row is not None:
+                wait = min(wait, max(row[5] - time.time(), self.breaker.retry_in()))
+            if wait > 0:
+                self.wakeup.wait(wait)
+                self.wakeup.clear()
+                continue
+            if self.breaker.allow() and self.claim(row[0], row[5]):
+                self.deliver(*row[:5])
+
+    def last_id(self) -> int:
+        with self.lock:
+            return self.db.execute("SELECT COALESCE(MAX(id), 0) FROM outbox").fetchone()[0]
+
+    def pending_after(self, row_id: int) -> int:
+        """Undelivered, not-dead rows newer than `row_id`"""
+        with self.lock:
+            return self.db.execute("SELECT COUNT(*) FROM outbox WHERE id > ? AND dead = 0", (row_id,)).fetchone()[0]
+
+    def drain(self, after_id: int, timeout: float) -> int:
+        """Wait until every row newer than `after_id` is delivered or dead; returns how many are left"""
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = self.pending_after(after_id)
+            if not remaining or time.monotonic() >= deadline:
+                return remaining
+            self.wakeup.set()
+            time.sleep(min(0.5, max(0.0, deadline - time.monotonic())))
+
+    def deliver(self, row_id: int, method: str, path: str, payload: str, attempts: int):
+        error, retryable = None, True
+        try:
+            status = self.send(method, path, json.loads(payload))
+            if 200 <= status < 300:
+                self.breaker.record_success()
+                with self.lock:
+                    self.db.execute("DELETE FROM outbox WHERE id = ?", (row_id,))
+                return
+            error = f"HTTP {status}"
+            retryable = status >= 500 or status in RETRYABLE_STATUS
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+
+        attempts += 1
+        if retryable:
+            self.breaker.record_failure()
+        else:
+            # The backend answered; only this request is bad
+            self.breaker.record_success()
+        if not retryable or attempts >= self.max_attempts:
+            logger.error("Outbox request %d dead after %d attempt(s): %s %s - %s",
+                         row_id, attempts, method, path, error)
+            with self.lock:
+                self.db.execute(
+                    "UPDATE outbox SET attempts = ?, last_error = ?, dead = 1 WHERE id = ?",
+                    (attempts, error, row_id)
+                )
+            return
+
+        delay = self.backoff(attempts)
+        logger.warning("Outbox request %d failed (%s), retry %d in %.1fs", row_id, error, attempts, delay)
+        with self.lock:
+            self.db.execute(
+                "UPDATE outbox SET attempts = ?, last_error = ?, next_attempt_at = ? WHERE id = ?",
+                (attempts, error, time.time() + delay, row_id)
+            )
+
+    def retry_dead(self) -> int:
+        """Requeue every dead letter for immediate delivery"""
+        with self.lock:
+            count = self.db.execute(
+                "UPDATE outbox SET dead = 0, attempts = 0, next_attempt_at = ? WHERE dead = 1", (time.time(),)
+            ).rowcount
+        self.wakeup.set()
+        return count
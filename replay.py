@@ -0,0 +1,242 @@
+"""
+Replay / backfill logged webhooks through the normal processing pipeline.
+
+Events are streamed from the raw archive (event_archive.py) and, with
+--include-log, from log segments that are not archived yet. They are
+filtered by date range, meeting and event type and handed to the same
+handlers the webhook endpoints use (EVENT_DISPATCH). The dedup index is
+bypassed on purpose.
+
+--dry-run FILE runs matching as usual but writes each decision to FILE
+(JSON lines) instead of writing attendance or unidentified rows to NocoDB.
+Otherwise writes go through the configured store. Before exiting, replay
+pushes everything it wrote towards NocoDB, within --drain-timeout seconds in
+total: it replicates the local SQLite store (STORAGE_BACKEND=sqlite), flushes
+the unidentified aggregator, and delivers the NocoDB outbox with its own
+sender. Whatever is still waiting is reported in the summary.
+
+Usage:
+    python replay.py --from 2025-02-01 --to 2025-02-28 --concurrency 8 --rate 20
+    python replay.py --meeting "<meeting_uuid>" --dry-run decisions.jsonl
+"""
+import argparse
+import asyncio
+import json
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional
+
+from event_archive import EventArchive, record_keys
+from event_log import LogRecord, iter_segment, list_segments
+
+from zoom_attendance import (
+    ACK_ONLY, COST_PROCESS, EVENT_DISPATCH, AttendanceProcessor, attendance_processor,
+    config, decode_event, json_dumps, logger, nocodb_outbox, store_replicator, unidentified_aggregator,
+)
+
+
+class DryRunAttendanceProcessor(AttendanceProcessor):
+    """Runs the normal matching but never writes to NocoDB"""
+
+    async def mark_attendance(self, person_id, attendance_date):
+        return {"dryRun": True, "Id": str(person_id), attendance_date: "Yes"}
+
+    async def log_unidentified_participant(self, name, join_time, date):
+        return {"dryRun": True, "Date": date, "nameJoinedWith": name}
+
+
+class RateLimiter:
+    """Spaces calls evenly to at most `rate` per second (0 = unlimited)"""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self.next_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self.lock:
+            now = time.monotonic()
+            delay = self.next_at - now
+            self.next_at = max(now, self.next_at) + self.interval
+        if delay > 0:
+            time.sleep(delay)
+
+
+def in_range(day: str, date_from: Optional[str], date_to: Optional[str]) -> bool:
+    return (not date_from or day >= date_from) and (not date_to or day <= date_to)
+
+
+def iter_events(archive: EventArchive, log_dir: Optional[str], date_from: Optional[str],
+                date_to: Optional[str], meetings: Optional[List[str]]) -> Iterator[LogRecord]:
+    """Archived events in day order, then (optionally) unarchived log segments"""
+    days = [day for day in archive.days() if in_range(day, date_from, date_to)]
+    if meetings:
+        # The index lets us read just these meetings' frames
+        for meeting_uuid in meetings:
+            yield from archive.meeting_events(meeting_uuid, days)
+    else:
+        for day in days:
+            yield from archive.iter_day(day)
+
+    if log_dir:
+        archived = set(archive.days())
+        wanted = set(meetings or ())
+        for _, day, path in list_segments(log_dir):
+            if day in archived or not in_range(day, date_from, date_to):
+                continue
+            for _, _, record in iter_segment(path):
+                if not wanted or record_keys(record)[0] in wanted:
+                    yield record
+
+
+class ReplayEngine:
+    def __init__(self, concurrency: int, rate: float, event_types: Optional[List[str]],
+                 dry_run_path: Optional[str], drain_timeout: float = 300.0):
+        self.drain_timeout = drain_timeout
+        self.concurrency = max(1, concurrency)
+        self.limiter = RateLimiter(rate)
+        self.event_types = set(event_types) if event_types else None
+        self.dry_run_path = dry_run_path
+        self.dry_run_file = None
+        self.dry_run_lock = threading.Lock()
+        self.counts: Counter = Counter()
+        self.counts_lock = threading.Lock()
+        self.processor = DryRunAttendanceProcessor(attendance_processor.store) if dry_run_path else attendance_processor
+
+    def handler_for(self, event_type: str):
+        """Handler from the dispatch table, rebound to the dry-run processor if needed"""
+        cost, handler = EVENT_DISPATCH.get(event_type, ACK_ONLY)
+        if self.event_types is not None and event_type not in self.event_types:
+            return None
+        if cost != COST_PROCESS:
+            return None
+        if self.dry_run_path and getattr(handler, "__self__", None) is attendance_processor:
+            handler = handler.__func__.__get__(self.processor)
+        return handler
+
+    def count(self, key: str):
+        with self.counts_lock:
+            self.counts[key] += 1
+
+    def replay_one(self, record: LogRecord, handler) -> None:
+        self.limiter.wait()
+        try:
+            event = decode_event(json_dumps(record.body), record.event)
+            result = asyncio.run(handler(event))
+        except Exception as e:
+            logger.exception("Replay of seq %s failed", record.seq)
+            result = {"status": "error", "message": str(e)}
+
+        self.count(f"{result.get('status')}:{result.get('action', '-')}")
+        if self.dry_run_file:
+            meeting_uuid, name = record_keys(record)
+            line = json.dumps({
+                "seq": record.seq,
+                "event": record.event,
+                "meeting_uuid": meeting_uuid,
+                "name": name,
+                "decision": result,
+            }, ensure_ascii=False, default=str)
+            with self.dry_run_lock:
+                self.dry_run_file.write(line + "\n")
+
+    def run(self, records: Iterator[LogRecord]) -> Dict[str, Any]:
+        started = time.monotonic()
+        if self.dry_run_path:
+            self.dry_run_file = open(self.dry_run_path, "w", encoding="utf-8")
+
+        # Warm the roster cache once instead of once per worker
+        try:
+            asyncio.run(self.processor.get_roster())
+        except Exception as e:
+            logger.warning("Could not prefetch roster before replay: %s", e)
+
+        # Deliver our own rows instead of relying on a running app to pick them up
+        outbox = nocodb_outbox if not self.dry_run_path else None
+        outbox_start = 0
+        if outbox:
+            outbox_start = outbox.last_id()
+            outbox.start()
+
+        submitted = 0
+        store_pending = unidentified_pending = outbox_pending = None
+        try:
+            with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="replay") as pool:
+                slots = threading.BoundedSemaphore(self.concurrency * 4)
+                for record in records:
+                    handler = self.handler_for(record.event)
+                    if handler is None:
+                        self.count("skipped")
+                        continue
+                    # Bound the backlog so a month of events is streamed, not loaded
+                    slots.acquire()
+                    future = pool.submit(self.replay_one, record, handler)
+                    future.add_done_callback(lambda _: slots.release())
+                    submitted += 1
+                    if submitted % 1000 == 0:
+                        logger.info("Replay progress: %d event(s) submitted", submitted)
+            if not self.dry_run_path:
+                # In pipeline order: local store -> unidentified aggregator / outbox -> NocoDB
+                deadline = time.monotonic() + self.drain_timeout
+                if store_replicator:
+                    store_pending = asyncio.run(store_replicator.drain(self.drain_timeout))
+                if unidentified_aggregator:
+                    unidentified_pending = unidentified_aggregator.drain(max(0.0, deadline - time.monotonic()))
+                if outbox:
+                    outbox_pending = outbox.drain(outbox_start, max(0.0, deadline - time.monotonic()))
+                if store_pending or unidentified_pending or outbox_pending:
+                    logger.warning("Replayed writes still pending after %.0fs: store=%s unidentified=%s outbox=%s",
+                                   self.drain_timeout, store_pending, unidentified_pending, outbox_pending)
+        finally:
+            if outbox:
+                outbox.stop()
+            if self.dry_run_file:
+                self.dry_run_file.close()
+
+        elapsed = time.monotonic() - started
+        return {
+            "replayed": submitted,
+            "elapsed_seconds": round(elapsed, 2),
+            "events_per_second": round(submitted / elapsed, 1) if elapsed else None,
+            "results": dict(self.counts),
+            "dry_run": self.dry_run_path,
+            "store_pending": store_pending,
+            "unidentified_pending": unidentified_pending,
+            "outbox_pending": outbox_pending,
+        }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Replay logged webhooks through the processing pipeline")
+    parser.add_argument("--from", dest="date_from", help="First day to replay (YYYY-MM-DD, UTC)")
+    parser.add_argument("--to", dest="date_to", help="Last day to replay (YYYY-MM-DD, UTC)")
+    parser.add_argument("--meeting", action="append", help="Only replay this meeting uuid (repeatable)")
+    parser.add_argument("--event", action="append", help="Only replay this event type (repeatable)")
+    parser.add_argument("--concurrency", type=int, default=4, help="Events processed in parallel")
+    parser.add_argument("--rate", type=float, default=0, help="Max events per second (0 = unlimited)")
+    parser.add_argument("--dry-run", metavar="FILE", help="Write decisions to FILE instead of NocoDB")
+    parser.add_argument("--drain-timeout", type=float, default=300.0,
+                        help="Seconds to wait for replayed writes to reach NocoDB")
+    parser.add_argument("--include-log", action="store_true", help="Also replay log segments not archived yet")
+    parser.add_argument("--archive-dir", default=config.ARCHIVE_DIR)
+    parser.add_argument("--log-dir", default=config.WEBHOOK_LOG_DIR)
+    args = parser.parse_args(argv)
+
+    records = iter_events(
+        EventArchive(args.archive_dir),
+        args.log_dir if args.include_log else None,
+        args.date_from, args.date_to, args.meeting,
+    )
+    engine = ReplayEngine(args.concurrency, args.rate, args.event, args.dry_run, args.drain_timeout)
+    summary = engine.run(records)
+    print(json.dumps(summary, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
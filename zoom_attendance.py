@@ -1,261 +1,742 @@
 import os
 import json
+import logging
+import queue
+import random
+import sys
+import atexit
 import requests
 import datetime
 import hmac
 import hashlib
 import pathlib
-from dotenv import load_dotenv
-from fastapi import FastAPI, Request, HTTPException, Depends
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
+from logging.handlers import QueueHandler, QueueListener
+from dataclasses import dataclass, fields
+from types import MappingProxyType
+from dotenv import load_dotenv, find_dotenv, dotenv_values
+from fastapi import FastAPI, Request, HTTPException, Depends, Query
 from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
-from typing import Dict, List, Any, Optional, Set
+from typing import Dict, List, Any, Optional, Set, Tuple, Mapping
 import asyncio
+from contextlib import asynccontextmanager
 from openai import OpenAI  # Changed from google.generativeai
+from attendance_store import AttendanceStore, SQLiteStore, StoreReplicator
+from event_archive import EventArchive, seal_days
+from event_log import WebhookLog
+from outbox import RETRYABLE_STATUS, CircuitBreaker, Outbox
+from zoom_events import EVENT_MODELS, EventHeader, GenericEvent, MeetingParticipantJoined
+
+# Process environment before .env is applied; real environment variables win over .env on reload
+BASE_ENVIRON = dict(os.environ)
 
 # Load environment variables
-load_dotenv()
+ENV_PATH = find_dotenv()
+load_dotenv(ENV_PATH)
+
+# Structured logging: JSON lines written by a background thread
+class JsonLogFormatter(logging.Formatter):
+    """Format records as one compact JSON object per line, including any `extra` fields"""
+    STANDARD_ATTRS = frozenset(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+    def format(self, record):
+        entry = {
+            "ts": datetime.datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in self.STANDARD_ATTRS:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
 
-# App configuration
-class Config:
+class DeferredQueueHandler(QueueHandler):
+    """Queue records untouched so message formatting happens on the listener thread"""
+
+    def prepare(self, record):
+        return record
+
+class EventSampler(logging.Filter):
+    """
+    Per-event log sampling. A request decides once whether it is sampled, so either
+    all or none of its INFO/DEBUG lines are emitted; warnings and errors always pass.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.default_rate = 1.0
+        self.rates: Mapping[str, float] = {}
+        self.sampled: ContextVar[bool] = ContextVar("log_sampled", default=True)
+
+    def start_request(self, event_type: Optional[str]) -> bool:
+        rate = self.rates.get(event_type, self.default_rate)
+        sampled = rate >= 1.0 or random.random() < rate
+        self.sampled.set(sampled)
+        return sampled
+
+    def filter(self, record):
+        return record.levelno >= logging.WARNING or self.sampled.get()
+
+logger = logging.getLogger("zoom_attendance")
+logger.setLevel(logging.INFO)
+logger.propagate = False
+log_sampler = EventSampler()
+logger.addFilter(log_sampler)
+
+_log_handler = logging.StreamHandler(sys.stdout)
+_log_handler.setFormatter(JsonLogFormatter())
+_log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+logger.addHandler(DeferredQueueHandler(_log_queue))
+log_listener = QueueListener(_log_queue, _log_handler)
+log_listener.start()
+atexit.register(log_listener.stop)
+
+# Fast JSON codec: msgspec when installed, stdlib json otherwise.
+# Both decode straight from bytes and raise ValueError subclasses on bad input.
+try:
+    import msgspec
+except ImportError:  # optional dependency
+    msgspec = None
+
+if msgspec is not None:
+    _json_decoder = msgspec.json.Decoder()
+    _json_encoder = msgspec.json.Encoder()
+
+    def json_loads(data: bytes) -> Any:
+        return _json_decoder.decode(data)
+
+    def json_dumps(obj: Any) -> bytes:
+        return _json_encoder.encode(obj)
+else:
+    def json_loads(data: bytes) -> Any:
+        return json.loads(data)
+
+    def json_dumps(obj: Any) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with the fast codec"""
+
+    def render(self, content: Any) -> bytes:
+        return json_dumps(content)
+
+# Typed webhook decoding: peek at the event name, then decode only the fields
+# the matching model declares (see zoom_events.py / generate_zoom_events.py).
+if msgspec is not None:
+    _header_decoder = msgspec.json.Decoder(EventHeader)
+    _event_decoders = {name: msgspec.json.Decoder(model) for name, model in EVENT_MODELS.items()}
+    _generic_decoder = msgspec.json.Decoder(GenericEvent)
+
+    def peek_event(body: bytes) -> EventHeader:
+        """Decode only the event name and account id, skipping the rest of the body"""
+        return _header_decoder.decode(body)
+
+    def decode_event(body: bytes, event_type: Optional[str] = None) -> Any:
+        """Decode a webhook body into its event model, raising ValueError if invalid"""
+        if event_type is None:
+            event_type = peek_event(body).event
+        return _event_decoders.get(event_type, _generic_decoder).decode(body)
+else:
+    import typing
+    from dataclasses import is_dataclass, MISSING
+    from functools import lru_cache
+
+    @lru_cache(maxsize=None)
+    def _model_fields(cls) -> Tuple[Tuple[str, Any, bool], ...]:
+        hints = typing.get_type_hints(cls)
+        return tuple(
+            (f.name, hints[f.name], f.default is MISSING and f.default_factory is MISSING)
+            for f in fields(cls)
+        )
+
+    def _convert(tp: Any, value: Any, path: str) -> Any:
+        """Validate/convert a decoded JSON value against a model field type"""
+        if typing.get_origin(tp) is typing.Union:
+            if value is None:
+                return None
+            tp = next(arg for arg in typing.get_args(tp) if arg is not type(None))
+        if is_dataclass(tp):
+            if not isinstance(value, dict):
+                raise ValueError(f"Expected an object at `{path}`")
+            kwargs = {}
+            for name, field_type, required in _model_fields(tp):
+                if name in value:
+                    kwargs[name] = _convert(field_type, value[name], f"{path}.{name}")
+                elif required:
+                    raise ValueError(f"Object missing required field `{name}` - at `{path}`")
+            return tp(**kwargs)
+        if tp is float and isinstance(value, (int, float)) and not isinstance(value, bool):
+            return float(value)
+        if tp is object or (isinstance(value, tp) and not (tp is int and isinstance(value, bool))):
+            return value
+        raise ValueError(f"Expected `{tp.__name__}`, got `{type(value).__name__}` - at `{path}`")
+
+    def peek_event(body: bytes) -> EventHeader:
+        """Decode only the event name and account id, skipping the rest of the body"""
+        return _convert(EventHeader, json_loads(body), "$")
+
+    def decode_event(body: bytes, event_type: Optional[str] = None) -> Any:
+        """Decode a webhook body into its event model, raising ValueError if invalid"""
+        data = json_loads(body)
+        if event_type is None:
+            event_type = _convert(EventHeader, data, "$").event
+        return _convert(EVENT_MODELS.get(event_type, GenericEvent), data, "$")
+
+def configure_logging(snapshot):
+    """Apply level and sampling settings from a config snapshot"""
+    logger.setLevel(logging.DEBUG if snapshot.DEBUG_MODE else snapshot.LOG_LEVEL)
+    log_sampler.default_rate = snapshot.LOG_DEFAULT_SAMPLE_RATE
+    log_sampler.rates = snapshot.LOG_SAMPLE_RATES
+
+class VerificationStateStore:
+    """
+    Persists token verification status to a small JSON state file.
+    Writes are atomic (temp file + rename), debounced, and run off the event loop;
+    callers keep reading from their own in-memory snapshot.
+    """
+
+    def __init__(self, path: str, debounce_seconds: float):
+        self.path = pathlib.Path(path)
+        self.debounce_seconds = debounce_seconds
+        self._snapshot: Dict[str, bool] = {}
+        self._dirty = False
+        self._pending: Optional[asyncio.Task] = None
+        self._write_lock = threading.Lock()
+
+    @staticmethod
+    def token_key(token: str) -> str:
+        """Key state by a token digest so secrets never land in the state file."""
+        return hashlib.sha256(token.encode('utf-8')).hexdigest()[:16]
+
+    def load(self) -> Dict[str, bool]:
+        """Load the persisted status, keyed by token digest."""
+        try:
+            with open(self.path, 'r') as f:
+                persisted = dict(json.load(f).get("verified", {}))
+        except FileNotFoundError:
+            persisted = {}
+        except (ValueError, OSError) as e:
+            logger.warning("Could not read verification state %s: %s", self.path, e)
+            persisted = {}
+        if self._dirty:
+            # A debounced save has not reached the file yet; keep it over the stale copy on disk
+            persisted.update(self._snapshot)
+        self._snapshot = persisted
+        return dict(self._snapshot)
+
+    def save(self, snapshot: Dict[str, bool]):
+        """Schedule a debounced write of the latest snapshot."""
+        self._snapshot = dict(snapshot)
+        self._dirty = True
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # No event loop (startup, scripts) - write immediately
+            self.flush()
+            return
+
+        if self._pending is None or self._pending.done():
+            self._pending = loop.create_task(self._write_later())
+
+    async def _write_later(self):
+        # Keep going while saves arrive during the debounce or the write itself
+        while self._dirty:
+            await asyncio.sleep(self.debounce_seconds)
+            self._dirty = False
+            try:
+                await asyncio.to_thread(self._write, dict(self._snapshot))
+            except Exception as e:
+                logger.error("Error saving verification status: %s", e)
+
+    def flush(self):
+        """Write any pending state synchronously (used at shutdown)."""
+        if self._dirty:
+            self._dirty = False
+            try:
+                self._write(dict(self._snapshot))
+            except Exception as e:
+                logger.error("Error saving verification status: %s", e)
+
+    def _write(self, snapshot: Dict[str, bool]):
+        with self._write_lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_name(self.path.name + ".tmp")
+            with open(tmp_path, 'w') as f:
+                json.dump({"verified": snapshot, "updated_at": time.time()}, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+        logger.info("Saved verification status to %s", self.path)
+
+@dataclass(frozen=True)
+class ConfigSnapshot:
+    """
+    Immutable view of the settings plus everything derived from them.
+    A new snapshot is built on every (re)load and swapped in as a whole.
+    """
     # NocoDB Configuration
-    NOCODB_URL = os.getenv("NOCODB_URL", "https://km.koogle.sk")
-    NOCODB_TOKEN = os.getenv("NOCODB_TOKEN")
-    ROSTER_TABLE_ID = os.getenv("ROSTER_TABLE_ID", "m1848aw7em1uz9g")
-    ATTENDANCE_TABLE_ID = os.getenv("ATTENDANCE_TABLE_ID", "mbur916jgs0m7ua")
-    UNIDENTIFIED_TABLE_ID = os.getenv("UNIDENTIFIED_TABLE_ID", "mhsf4s0jhp90gnn")
+    NOCODB_URL: str
+    NOCODB_TOKEN: Optional[str]
+    ROSTER_TABLE_ID: str
+    ATTENDANCE_TABLE_ID: str
+    UNIDENTIFIED_TABLE_ID: str
 
     # API Key Authentication
-    API_KEY = os.getenv("API_KEY")
-    API_KEY_ENABLED = os.getenv("API_KEY_ENABLED", "true").lower() == "true"
-    API_KEY_HEADER_NAME = os.getenv("API_KEY_HEADER_NAME", "x-api-key")
+    API_KEY: Optional[str]
+    API_KEY_ENABLED: bool
+    API_KEY_HEADER_NAME: str
 
     # Zoom custom Headers
-    ZOOM_CUSTOM_HEADER_KEY = os.getenv("ZOOM_CUSTOM_HEADER_KEY", "x-zoom-custom-auth")
-    ZOOM_CUSTOM_HEADER_VALUE = os.getenv("ZOOM_CUSTOM_HEADER_VALUE")
-    ZOOM_CUSTOM_HEADER_ENABLED = os.getenv("ZOOM_CUSTOM_HEADER_ENABLED", "false").lower() == "true"
+    ZOOM_CUSTOM_HEADER_KEY: str
+    ZOOM_CUSTOM_HEADER_VALUE: Optional[str]
+    ZOOM_CUSTOM_HEADER_ENABLED: bool
 
     # Zoom webhook verification
-    ZOOM_WEBHOOK_SECRET_TOKENS = []
-    ZOOM_WEBHOOK_SECRET_VERIFIED = {}
+    ZOOM_WEBHOOK_SECRET_TOKENS: Tuple[str, ...]
 
     # AI Configuration
-    OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")  # Changed from GOOGLE_API_KEY
-    USE_AI_MATCHING = os.getenv("USE_AI_MATCHING", "true").lower() == "true"
-    CONFIDENCE_THRESHOLD = float(os.getenv("CONFIDENCE_THRESHOLD", "0.6"))
+    OPENAI_API_KEY: Optional[str]
+    # Any chat-completions compatible endpoint (e.g. bench/openai_standin.py); empty = api.openai.com
+    OPENAI_BASE_URL: Optional[str]
+    OPENAI_MODEL: str
+    OPENAI_TIMEOUT_SECONDS: float
+    OPENAI_MAX_RETRIES: int
+    USE_AI_MATCHING: bool
+    CONFIDENCE_THRESHOLD: float
 
     # Debugging
-    DEBUG_MODE = os.getenv("DEBUG_MODE", "false").lower() == "true"
+    DEBUG_MODE: bool
 
-    # Cache settings
-    ROSTER_CACHE_SECONDS = int(os.getenv("ROSTER_CACHE_SECONDS", "600"))
-
-    def __init__(self):
-        self.load_zoom_tokens_from_env()
-        self.validate_api_key_config()
-        self.validate_zoom_custom_header_config()
+    # Logging (DEBUG_MODE forces DEBUG level and enables header/body dumps)
+    LOG_LEVEL: str
+    LOG_DEFAULT_SAMPLE_RATE: float
+    LOG_SAMPLE_RATES: Mapping[str, float]
 
-    def validate_api_key_config(self):
-        """Validate API key configuration"""
-        if self.API_KEY_ENABLED and not self.API_KEY:
-            print("WARNING: API key authentication is enabled but no API key is set. Set API_KEY in your .env file.")
-            self.API_KEY_ENABLED = False
-
-    def verify_zoom_custom_header(self, request_headers):
-        """Verify Zoom custom header authentication"""
-        if not self.ZOOM_CUSTOM_HEADER_ENABLED:
-            return True  # If not enabled, skip this check
-
-        custom_header_value = request_headers.get(self.ZOOM_CUSTOM_HEADER_KEY)
-        if not custom_header_value:
-            return False
+    # Cache settings
+    ROSTER_CACHE_SECONDS: int
+
+    # Outbound NocoDB requests (token-bucket budgets in requests/second; 0 disables a budget)
+    NOCODB_TIMEOUT_SECONDS: float
+    NOCODB_READ_RATE: float
+    NOCODB_READ_BURST: int
+    NOCODB_WRITE_RATE: float
+    NOCODB_WRITE_BURST: int
+
+    # Durable outbox for NocoDB writes (retried with backoff behind a circuit breaker)
+    OUTBOX_ENABLED: bool
+    OUTBOX_DB_PATH: str
+    OUTBOX_MAX_ATTEMPTS: int
+    OUTBOX_BACKOFF_BASE_SECONDS: float
+    OUTBOX_BACKOFF_MAX_SECONDS: float
+    OUTBOX_BREAKER_FAILURE_THRESHOLD: int
+    OUTBOX_BREAKER_RESET_SECONDS: float
+    OUTBOX_POLL_SECONDS: float
+
+    # Unidentified participants aggregated per (name, date) and flushed in bulk (0 sends each join)
+    UNIDENTIFIED_DB_PATH: str
+    UNIDENTIFIED_FLUSH_SECONDS: float
+    UNIDENTIFIED_RETENTION_DAYS: int
+
+    # Daily attendance columns created ahead of time via the meta API (0 disables the scheduler)
+    ATTENDANCE_COLUMNS_DAYS_AHEAD: int
+    ATTENDANCE_COLUMNS_REFRESH_SECONDS: float
+    ATTENDANCE_COLUMN_TYPE: str
+    ATTENDANCE_COLUMN_RETRY_SECONDS: float
+
+    # Attendance storage backend ("nocodb", or "sqlite" = local WAL file replicated to NocoDB)
+    STORAGE_BACKEND: str
+    STORAGE_DB_PATH: str
+    STORAGE_REPLICATE_SECONDS: float
+    STORAGE_RETENTION_DAYS: int
+
+    # Webhook deduplication (Zoom retries slow or failed deliveries)
+    DEDUP_ENABLED: bool
+    DEDUP_WINDOW_SECONDS: int
+    DEDUP_MAX_ENTRIES: int
+    DEDUP_DB_PATH: str
+
+    # Replay protection for signed webhooks (0 disables the timestamp check)
+    ZOOM_SIGNATURE_MAX_SKEW_SECONDS: int
+    ZOOM_SEEN_SIGNATURE_CACHE_SIZE: int
+
+    # Token verification state (kept out of .env so it is never rewritten on the request path)
+    VERIFICATION_STATE_PATH: str
+    VERIFICATION_SAVE_DEBOUNCE_SECONDS: float
+
+    # Config hot reload (0 disables the .env watcher)
+    CONFIG_WATCH_INTERVAL_SECONDS: float
+
+    # Append-only webhook log (raw archive and crash-safe processing queue)
+    WEBHOOK_LOG_ENABLED: bool
+    WEBHOOK_LOG_DIR: str
+    WEBHOOK_LOG_SEGMENT_MAX_BYTES: int
+    WEBHOOK_LOG_SEGMENT_MAX_SECONDS: float
+    WEBHOOK_LOG_COMMIT_INTERVAL_MS: float
+
+    # Compressed raw-event archive of finished log days (0 disables periodic sealing)
+    ARCHIVE_DIR: str
+    ARCHIVE_CODEC: str
+    ARCHIVE_INTERVAL_SECONDS: float
+
+    # Derived structures, precomputed once per snapshot
+    webhook_number_to_token: Mapping[str, str]
+    account_to_token: Mapping[str, str]
+    token_hmacs: Mapping[str, Any]
+    env_verified: Mapping[str, bool]
+    api_key_header_bytes: bytes
+    api_key_bytes: bytes
+
+    # Settings that are only read at startup; changing them needs a restart
+    STARTUP_ONLY = frozenset({
+        "DEDUP_ENABLED", "DEDUP_WINDOW_SECONDS", "DEDUP_MAX_ENTRIES", "DEDUP_DB_PATH",
+        "ZOOM_SEEN_SIGNATURE_CACHE_SIZE", "VERIFICATION_STATE_PATH",
+        "VERIFICATION_SAVE_DEBOUNCE_SECONDS", "CONFIG_WATCH_INTERVAL_SECONDS",
+        "WEBHOOK_LOG_ENABLED", "WEBHOOK_LOG_DIR", "WEBHOOK_LOG_SEGMENT_MAX_BYTES",
+        "WEBHOOK_LOG_SEGMENT_MAX_SECONDS", "WEBHOOK_LOG_COMMIT_INTERVAL_MS",
+        "ARCHIVE_INTERVAL_SECONDS", "OUTBOX_ENABLED", "OUTBOX_DB_PATH", "OUTBOX_MAX_ATTEMPTS",
+        "OUTBOX_BACKOFF_BASE_SECONDS", "OUTBOX_BACKOFF_MAX_SECONDS",
+        "OUTBOX_BREAKER_FAILURE_THRESHOLD", "OUTBOX_BREAKER_RESET_SECONDS", "OUTBOX_POLL_SECONDS",
+        "UNIDENTIFIED_DB_PATH", "UNIDENTIFIED_FLUSH_SECONDS", "ATTENDANCE_COLUMNS_REFRESH_SECONDS",
+        "STORAGE_BACKEND", "STORAGE_DB_PATH", "STORAGE_REPLICATE_SECONDS", "STORAGE_RETENTION_DAYS",
+    })
+
+    @classmethod
+    def from_env(cls, env: Mapping[str, str]) -> "ConfigSnapshot":
+        """Build a snapshot from an environment mapping without touching shared state."""
+        def flag(key, default):
+            return env.get(key, default).lower() == "true"
+
+        api_key = env.get("API_KEY")
+        api_key_enabled = flag("API_KEY_ENABLED", "true")
+        if api_key_enabled and not api_key:
+            logger.warning("API key authentication is enabled but no API key is set. Set API_KEY in your .env file.")
+            api_key_enabled = False
+
+        custom_header_value = env.get("ZOOM_CUSTOM_HEADER_VALUE")
+        custom_header_enabled = flag("ZOOM_CUSTOM_HEADER_ENABLED", "false")
+        if custom_header_enabled and not custom_header_value:
+            logger.warning("Zoom custom header authentication is enabled but no value is set. Set ZOOM_CUSTOM_HEADER_VALUE in your .env file.")
+            custom_header_enabled = False
+
+        tokens, webhook_number_to_token, env_verified = cls.parse_zoom_tokens(env)
+
+        # Map Zoom account IDs to tokens (ZOOM_WEBHOOK_ACCOUNT_N=<account_id> pairs with ZOOM_WEBHOOK_SECRET_N)
+        account_to_token = {}
+        for key, value in env.items():
+            if key.startswith('ZOOM_WEBHOOK_ACCOUNT_'):
+                webhook_number = key.split('_')[-1]
+                token = webhook_number_to_token.get(webhook_number)
+                if token and value:
+                    account_to_token[value.strip()] = token
+                else:
+                    logger.warning("%s has no matching ZOOM_WEBHOOK_SECRET_%s", key, webhook_number)
 
-        return custom_header_value == self.ZOOM_CUSTOM_HEADER_VALUE
+        # Pre-keyed HMAC objects, copied per request instead of re-keying
+        token_hmacs = {
+            token: hmac.new(token.encode('utf-8'), digestmod=hashlib.sha256)
+            for token in tokens
+        }
 
-    def validate_zoom_custom_header_config(self):
-        """Validate Zoom custom header configuration"""
-        if self.ZOOM_CUSTOM_HEADER_ENABLED and not self.ZOOM_CUSTOM_HEADER_VALUE:
-            print("WARNING: Zoom custom header authentication is enabled but no value is set. Set ZOOM_CUSTOM_HEADER_VALUE in your .env file.")
-            self.ZOOM_CUSTOM_HEADER_ENABLED = False
+        openai_api_key = env.get("OPENAI_API_KEY")
+        api_key_header_name = env.get("API_KEY_HEADER_NAME", "x-api-key")
+
+        return cls(
+            NOCODB_URL=env.get("NOCODB_URL", "https://km.koogle.sk"),
+            NOCODB_TOKEN=env.get("NOCODB_TOKEN"),
+            ROSTER_TABLE_ID=env.get("ROSTER_TABLE_ID", "m1848aw7em1uz9g"),
+            ATTENDANCE_TABLE_ID=env.get("ATTENDANCE_TABLE_ID", "mbur916jgs0m7ua"),
+            UNIDENTIFIED_TABLE_ID=env.get("UNIDENTIFIED_TABLE_ID", "mhsf4s0jhp90gnn"),
+            API_KEY=api_key,
+            API_KEY_ENABLED=api_key_enabled,
+            API_KEY_HEADER_NAME=api_key_header_name,
+            ZOOM_CUSTOM_HEADER_KEY=env.get("ZOOM_CUSTOM_HEADER_KEY", "x-zoom-custom-auth"),
+            ZOOM_CUSTOM_HEADER_VALUE=custom_header_value,
+            ZOOM_CUSTOM_HEADER_ENABLED=custom_header_enabled,
+            ZOOM_WEBHOOK_SECRET_TOKENS=tuple(tokens),
+            OPENAI_API_KEY=openai_api_key,
+            OPENAI_BASE_URL=env.get("OPENAI_BASE_URL") or None,
+            OPENAI_MODEL=env.get("OPENAI_MODEL", "gpt-4o-mini"),
+            OPENAI_TIMEOUT_SECONDS=float(env.get("OPENAI_TIMEOUT_SECONDS", "30")),
+            OPENAI_MAX_RETRIES=int(env.get("OPENAI_MAX_RETRIES", "2")),
+            # AI matching needs an OpenAI key
+            USE_AI_MATCHING=flag("USE_AI_MATCHING", "true") and bool(openai_api_key),
+            CONFIDENCE_THRESHOLD=float(env.get("CONFIDENCE_THRESHOLD", "0.6")),
+            DEBUG_MODE=flag("DEBUG_MODE", "false"),
+            LOG_LEVEL=env.get("LOG_LEVEL", "INFO").upper(),
+            LOG_DEFAULT_SAMPLE_RATE=float(env.get("LOG_DEFAULT_SAMPLE_RATE", "1.0")),
+            LOG_SAMPLE_RATES=MappingProxyType(cls.parse_sample_rates(env.get("LOG_SAMPLE_RATES", ""))),
+            ROSTER_CACHE_SECONDS=int(env.get("ROSTER_CACHE_SECONDS", "600")),
+            NOCODB_TIMEOUT_SECONDS=float(env.get("NOCODB_TIMEOUT_SECONDS", "10")),
+            NOCODB_READ_RATE=float(env.get("NOCODB_READ_RATE", "10")),
+            NOCODB_READ_BURST=int(env.get("NOCODB_READ_BURST", "20")),
+            NOCODB_WRITE_RATE=float(env.get("NOCODB_WRITE_RATE", "5")),
+            NOCODB_WRITE_BURST=int(env.get("NOCODB_WRITE_BURST", "10")),
+            OUTBOX_ENABLED=flag("OUTBOX_ENABLED", "true"),
+            OUTBOX_DB_PATH=env.get("OUTBOX_DB_PATH", "State/nocodb_outbox.db"),
+            OUTBOX_MAX_ATTEMPTS=int(env.get("OUTBOX_MAX_ATTEMPTS", "20")),
+            OUTBOX_BACKOFF_BASE_SECONDS=float(env.get("OUTBOX_BACKOFF_BASE_SECONDS", "1")),
+            OUTBOX_BACKOFF_MAX_SECONDS=float(env.get("OUTBOX_BACKOFF_MAX_SECONDS", "300")),
+            OUTBOX_BREAKER_FAILURE_THRESHOLD=int(env.get("OUTBOX_BREAKER_FAILURE_THRESHOLD", "5")),
+            OUTBOX_BREAKER_RESET_SECONDS=float(env.get("OUTBOX_BREAKER_RESET_SECONDS", "30")),
+            OUTBOX_POLL_SECONDS=float(env.get("OUTBOX_POLL_SECONDS", "5")),
+            UNIDENTIFIED_DB_PATH=env.get("UNIDENTIFIED_DB_PATH", "State/unidentified.db"),
+            UNIDENTIFIED_FLUSH_SECONDS=float(env.get("UNIDENTIFIED_FLUSH_SECONDS", "30")),
+            UNIDENTIFIED_RETENTION_DAYS=int(env.get("UNIDENTIFIED_RETENTION_DAYS", "7")),
+            ATTENDANCE_COLUMNS_DAYS_AHEAD=int(env.get("ATTENDANCE_COLUMNS_DAYS_AHEAD", "7")),
+            ATTENDANCE_COLUMNS_REFRESH_SECONDS=float(env.get("ATTENDANCE_COLUMNS_REFRESH_SECONDS", "3600")),
+            ATTENDANCE_COLUMN_TYPE=env.get("ATTENDANCE_COLUMN_TYPE", "SingleLineText"),
+            ATTENDANCE_COLUMN_RETRY_SECONDS=float(env.get("ATTENDANCE_COLUMN_RETRY_SECONDS", "60")),
+            STORAGE_BACKEND=env.get("STORAGE_BACKEND", "nocodb").lower(),
+            STORAGE_DB_PATH=env.get("STORAGE_DB_PATH", "State/attendance.db"),
+            STORAGE_REPLICATE_SECONDS=float(env.get("STORAGE_REPLICATE_SECONDS", "5")),
+            STORAGE_RETENTION_DAYS=int(env.get("STORAGE_RETENTION_DAYS", "30")),
+            DEDUP_ENABLED=flag("DEDUP_ENABLED", "true"),
+            DEDUP_WINDOW_SECONDS=int(env.get("DEDUP_WINDOW_SECONDS", "86400")),
+            DEDUP_MAX_ENTRIES=int(env.get("DEDUP_MAX_ENTRIES", "100000")),
+            DEDUP_DB_PATH=env.get("DEDUP_DB_PATH", "State/webhook_dedup.db"),
+            ZOOM_SIGNATURE_MAX_SKEW_SECONDS=int(env.get("ZOOM_SIGNATURE_MAX_SKEW_SECONDS", "300")),
+            ZOOM_SEEN_SIGNATURE_CACHE_SIZE=int(env.get("ZOOM_SEEN_SIGNATURE_CACHE_SIZE", "10000")),
+            VERIFICATION_STATE_PATH=env.get("VERIFICATION_STATE_PATH", "State/verification_state.json"),
+            VERIFICATION_SAVE_DEBOUNCE_SECONDS=float(env.get("VERIFICATION_SAVE_DEBOUNCE_SECONDS", "1.0")),
+            CONFIG_WATCH_INTERVAL_SECONDS=float(env.get("CONFIG_WATCH_INTERVAL_SECONDS", "5")),
+            WEBHOOK_LOG_ENABLED=flag("WEBHOOK_LOG_ENABLED", "true"),
+            WEBHOOK_LOG_DIR=env.get("WEBHOOK_LOG_DIR", "Raw/log"),
+            WEBHOOK_LOG_SEGMENT_MAX_BYTES=int(env.get("WEBHOOK_LOG_SEGMENT_MAX_BYTES", str(64 * 1024 * 1024))),
+            WEBHOOK_LOG_SEGMENT_MAX_SECONDS=float(env.get("WEBHOOK_LOG_SEGMENT_MAX_SECONDS", "3600")),
+            WEBHOOK_LOG_COMMIT_INTERVAL_MS=float(env.get("WEBHOOK_LOG_COMMIT_INTERVAL_MS", "5")),
+            ARCHIVE_DIR=env.get("ARCHIVE_DIR", "Raw/archive"),
+            ARCHIVE_CODEC=env.get("ARCHIVE_CODEC", "").lower(),
+            ARCHIVE_INTERVAL_SECONDS=float(env.get("ARCHIVE_INTERVAL_SECONDS", "3600")),
+            webhook_number_to_token=MappingProxyType(webhook_number_to_token),
+            account_to_token=MappingProxyType(account_to_token),
+            token_hmacs=MappingProxyType(token_hmacs),
+            env_verified=MappingProxyType(env_verified),
+            api_key_header_bytes=api_key_header_name.lower().encode('latin-1'),
+            api_key_bytes=(api_key or "").encode('latin-1'),
+        )
 
-    def load_zoom_tokens_from_env(self):
-        """Load webhook secret tokens and their verification status from environment variables"""
-        # Clear existing tokens
-        self.ZOOM_WEBHOOK_SECRET_TOKENS = []
-        self.ZOOM_WEBHOOK_SECRET_VERIFIED = {}
-        self.webhook_number_to_token = {}  # Add this mapping dictionary
+    @staticmethod
+    def parse_sample_rates(value: str) -> Dict[str, float]:
+        """Parse "event=rate,event=rate" into a per-event sampling map"""
+        rates = {}
+        for item in value.split(','):
+            if '=' not in item:
+                continue
+            event_type, rate = item.split('=', 1)
+            try:
+                rates[event_type.strip()] = min(max(float(rate), 0.0), 1.0)
+            except ValueError:
+                logger.warning("Ignoring invalid log sample rate %r", item)
+        return rates
+
+    @staticmethod
+    def parse_zoom_tokens(env: Mapping[str, str]):
+        """Parse webhook secret tokens and their .env verification hints"""
+        tokens = []
+        verified_by_token = {}
+        webhook_number_to_token = {}
 
         # Look for any webhook secrets with numeric identifiers
-        for key, value in os.environ.items():
+        for key, value in env.items():
             if key.startswith('ZOOM_WEBHOOK_SECRET_'):
                 try:
                     # Extract the numeric part of the key
-                    if '_' in key:
-                        parts = key.split('_')
-                        if len(parts) >= 3 and parts[-1].isdigit():
-                            webhook_number = parts[-1]
-
-                            # Extract token and verification status
-                            if '|' in value:
-                                token, verified_str = value.split('|', 1)
-                                verified = verified_str.lower() == 'true'
-                            else:
-                                token = value
-                                verified = False
-
-                            # Add to general token list
-                            if token not in self.ZOOM_WEBHOOK_SECRET_TOKENS:
-                                self.ZOOM_WEBHOOK_SECRET_TOKENS.append(token)
-
-                            # Set verification status
-                            self.ZOOM_WEBHOOK_SECRET_VERIFIED[token] = verified
-
-                            # Map webhook number to token
-                            self.webhook_number_to_token[webhook_number] = token
-
-                            print(f"Loaded token for webhook number {webhook_number}, verified: {verified}")
+                    parts = key.split('_')
+                    if len(parts) >= 3 and parts[-1].isdigit():
+                        webhook_number = parts[-1]
+
+                        # Extract token and verification status
+                        if '|' in value:
+                            token, verified_str = value.split('|', 1)
+                            verified = verified_str.lower() == 'true'
+                        else:
+                            token = value
+                            verified = False
+
+                        # Add to general token list
+                        if token not in tokens:
+                            tokens.append(token)
+
+                        # Set verification status
+                        verified_by_token[token] = verified
+
+                        # Map webhook number to token
+                        webhook_number_to_token[webhook_number] = token
+
+                        logger.info("Loaded token for webhook number %s, verified: %s", webhook_number, verified)
                 except Exception as e:
-                    print(f"Error parsing token {key}: {e}")
+                    logger.error("Error parsing token %s: %s", key, e)
 
         # Legacy token support
-        legacy_token = os.getenv("ZOOM_WEBHOOK_SECRET")
-        if legacy_token and legacy_token not in self.ZOOM_WEBHOOK_SECRET_TOKENS:
-            self.ZOOM_WEBHOOK_SECRET_TOKENS.append(legacy_token)
-            self.ZOOM_WEBHOOK_SECRET_VERIFIED[legacy_token] = True
+        legacy_token = env.get("ZOOM_WEBHOOK_SECRET")
+        if legacy_token and legacy_token not in tokens:
+            tokens.append(legacy_token)
+            verified_by_token[legacy_token] = True
 
-        # Log what we found
-        verified_count = sum(1 for v in self.ZOOM_WEBHOOK_SECRET_VERIFIED.values() if v)
-        print(f"Loaded {len(self.ZOOM_WEBHOOK_SECRET_TOKENS)} Zoom token(s), {verified_count} already verified")
-        print(f"Mapped webhook numbers: {list(self.webhook_number_to_token.keys())}")
+        return tokens, webhook_number_to_token, verified_by_token
 
-    def get_token_by_endpoint_number(self, endpoint_number):
-        """
-        Get the corresponding token for the specified webhook number.
-        Returns the token and whether it's verified.
-        """
-        # Convert to string to ensure consistency
-        endpoint_number = str(endpoint_number)
+    def changed_settings(self, other: "ConfigSnapshot") -> List[str]:
+        """Names of plain settings that differ between two snapshots"""
+        return [
+            f.name for f in fields(self)
+            if f.name.isupper() and getattr(self, f.name) != getattr(other, f.name)
+        ]
+
+# App configuration
+class Config:
+    """
+    Settings are served from an immutable ConfigSnapshot that reload() rebuilds
+    and swaps atomically; only token verification status is mutable runtime state.
+    """
+
+    def __init__(self, env_path: Optional[str] = None):
+        self.env_path = env_path
+        self.snapshot: Optional[ConfigSnapshot] = None
+        self.ZOOM_WEBHOOK_SECRET_VERIFIED: Dict[str, bool] = {}
+        # Account -> token matches learned from fallback scans (reset on reload)
+        self.learned_account_tokens: Dict[str, str] = {}
+        self.reload_listeners: List[Any] = []
+
+        snapshot = self.build_snapshot()
+        self.verification_store = VerificationStateStore(
+            snapshot.VERIFICATION_STATE_PATH, snapshot.VERIFICATION_SAVE_DEBOUNCE_SECONDS
+        )
+        self.swap(snapshot)
+
+    def __getattr__(self, name):
+        # Only called for names not set on the instance: serve them from the snapshot
+        snapshot = self.__dict__.get("snapshot")
+        if snapshot is None:
+            raise AttributeError(name)
+        return getattr(snapshot, name)
+
+    def read_env(self) -> Dict[str, str]:
+        """Current .env contents, with real process environment variables taking precedence"""
+        env = dict(BASE_ENVIRON)
+        if self.env_path and os.path.exists(self.env_path):
+            for key, value in dotenv_values(self.env_path).items():
+                if value is not None:
+                    env.setdefault(key, value)
+        return env
+
+    def build_snapshot(self) -> ConfigSnapshot:
+        return ConfigSnapshot.from_env(self.read_env())
+
+    def swap(self, snapshot: ConfigSnapshot) -> List[str]:
+        """Install a new snapshot and carry verification status over to it"""
+        previous = self.snapshot
+
+        # Persisted verification state overrides the |true/|false hints in .env,
+        # and status already known in this process overrides both
+        persisted = self.verification_store.load()
+        verified = {}
+        for token in snapshot.ZOOM_WEBHOOK_SECRET_TOKENS:
+            key = VerificationStateStore.token_key(token)
+            if token in self.ZOOM_WEBHOOK_SECRET_VERIFIED:
+                verified[token] = self.ZOOM_WEBHOOK_SECRET_VERIFIED[token]
+            elif key in persisted:
+                verified[token] = bool(persisted[key])
+            else:
+                verified[token] = snapshot.env_verified.get(token, False)
 
-        # Check if we have a direct mapping for this webhook number
-        if hasattr(self, 'webhook_number_to_token') and endpoint_number in self.webhook_number_to_token:
-            token = self.webhook_number_to_token[endpoint_number]
-            is_verified = self.ZOOM_WEBHOOK_SECRET_VERIFIED.get(token, False)
-            return token, is_verified
+        # Single reference assignments, so requests see either the old or the new state
+        self.snapshot = snapshot
+        self.ZOOM_WEBHOOK_SECRET_VERIFIED = verified
+        self.learned_account_tokens = {}
 
-        # Fallback to the old index-based method
+        # Log what we found
+        verified_count = sum(1 for v in verified.values() if v)
+        logger.info("Loaded %d Zoom token(s), %d already verified", len(snapshot.ZOOM_WEBHOOK_SECRET_TOKENS), verified_count)
+        logger.info("Mapped webhook numbers: %s", list(snapshot.webhook_number_to_token.keys()))
+        logger.info("Mapped %d Zoom account ID(s) to tokens", len(snapshot.account_to_token))
+
+        changed = snapshot.changed_settings(previous) if previous else []
+        if previous:
+            for listener in self.reload_listeners:
+                try:
+                    listener(previous, snapshot)
+                except Exception as e:
+                    logger.error("Error applying reloaded config: %s", e)
+        return changed
+
+    def reload(self) -> List[str]:
+        """Rebuild the snapshot from .env and swap it in; returns the changed setting names"""
+        changed = self.swap(self.build_snapshot())
+        restart_needed = [name for name in changed if name in ConfigSnapshot.STARTUP_ONLY]
+        logger.info("Config reloaded, changed settings: %s", changed)
+        if restart_needed:
+            logger.warning("%s only take effect after a restart", restart_needed)
+        return changed
+
+    def env_mtime(self) -> Optional[float]:
         try:
-            # Convert to integer and adjust for zero-based indexing
-            index = int(endpoint_number) - 1
+            return os.stat(self.env_path).st_mtime if self.env_path else None
+        except OSError:
+            return None
 
-            # Check if the index is valid
-            if 0 <= index < len(self.ZOOM_WEBHOOK_SECRET_TOKENS):
-                token = self.ZOOM_WEBHOOK_SECRET_TOKENS[index]
-                is_verified = self.ZOOM_WEBHOOK_SECRET_VERIFIED.get(token, False)
-                return token, is_verified
-        except ValueError:
-            pass
+    async def watch_env_file(self, interval: float):
+        """Poll the .env file and hot-reload the config when it changes"""
+        last_mtime = self.env_mtime()
+        while True:
+            await asyncio.sleep(interval)
+            mtime = self.env_mtime()
+            if mtime == last_mtime:
+                continue
+            last_mtime = mtime
+            try:
+                self.reload()
+            except Exception as e:
+                # Keep serving the previous snapshot on a bad edit
+                logger.error("Error reloading config, keeping previous settings: %s", e)
 
-        print(f"WARNING: No token found for webhook number {endpoint_number}")
-        return None, False
+    def verify_zoom_custom_header(self, request_headers):
+        """Verify Zoom custom header authentication"""
+        snapshot = self.snapshot
+        if not snapshot.ZOOM_CUSTOM_HEADER_ENABLED:
+            return True  # If not enabled, skip this check
 
-    def verify_zoom_signature_for_endpoint(self, signature, timestamp, request_body, endpoint_number):
-        """
-        Verify Zoom webhook signature using the token associated with the specific endpoint number.
-        """
-        if not signature.startswith("v0="):
+        custom_header_value = request_headers.get(snapshot.ZOOM_CUSTOM_HEADER_KEY)
+        if not custom_header_value:
             return False
 
-        received_hash = signature[3:]  # Remove 'v0='
+        return custom_header_value == snapshot.ZOOM_CUSTOM_HEADER_VALUE
 
-        # Get the token for this specific endpoint
-        token, _ = self.get_token_by_endpoint_number(endpoint_number)
-        if not token:
-            # If no specific token found, fall back to default behavior
-            return self.verify_zoom_signature(signature, timestamp, request_body)
+    def signature_matches(self, token: str, received_hash: str, timestamp: str, request_body: bytes) -> bool:
+        """Check a signature against one token, hashing the raw body bytes directly."""
+        base = self.snapshot.token_hmacs.get(token)
+        if base is None:
+            # Token from a snapshot that was swapped out mid-request
+            base = hmac.new(token.encode('utf-8'), digestmod=hashlib.sha256)
 
-        # For compatibility with different message formats
-        message = f"v0:{timestamp}:{request_body.decode('utf-8')}"
+        mac = base.copy()
+        mac.update(b"v0:" + timestamp.encode('utf-8') + b":")
+        mac.update(request_body)
+        return hmac.compare_digest(received_hash, mac.hexdigest())
 
-        # Generate expected hash with this token
-        expected_hash = hmac.new(
-            token.encode('utf-8'),
-            message.encode('utf-8'),
-            hashlib.sha256
-        ).hexdigest()
+    def encrypt_plain_token(self, token: str, plain_token: str) -> str:
+        """Answer a url_validation challenge with the token's pre-keyed HMAC"""
+        base = self.snapshot.token_hmacs.get(token)
+        if base is None:
+            base = hmac.new(token.encode('utf-8'), digestmod=hashlib.sha256)
 
-        # Compare signatures
-        return hmac.compare_digest(received_hash, expected_hash)
+        mac = base.copy()
+        mac.update(plain_token.encode('utf-8'))
+        return mac.hexdigest()
 
     def save_verification_status(self):
-        """Save verification status to .env file"""
-        try:
-            # Read existing .env file
-            env_path = os.path.join(os.getcwd(), '.env')
-            if not os.path.exists(env_path):
-                print("Warning: .env file not found, cannot save verification status")
-                return
-
-            with open(env_path, 'r') as file:
-                lines = file.readlines()
-
-            # Update token verification status in .env content
-            new_lines = []
-            token_entries_updated = set()
-
-            for line in lines:
-                line = line.strip()
-                if line.startswith('ZOOM_WEBHOOK_SECRET_'):
-                    # Extract the token number and current value
-                    parts = line.split('=', 1)
-                    if len(parts) != 2:
-                        new_lines.append(line)
-                        continue
-
-                    key, value = parts
-                    token_num = key.split('_')[-1]
-
-                    # Find if this is a token we know about
-                    try:
-                        token_index = int(token_num) - 1
-                        if token_index < len(self.ZOOM_WEBHOOK_SECRET_TOKENS):
-                            token = self.ZOOM_WEBHOOK_SECRET_TOKENS[token_index]
-                            token_entries_updated.add(token)
-                            # Replace or add verification status
-                            if '|' in value:
-                                token_value = value.split('|', 1)[0]
-                            else:
-                                token_value = value
-                            new_line = f"{key}={token_value}|{str(self.ZOOM_WEBHOOK_SECRET_VERIFIED[token]).lower()}"
-                            new_lines.append(new_line)
-                        else:
-                            new_lines.append(line)
-                    except (ValueError, IndexError):
-                        new_lines.append(line)
-                elif line.startswith('ZOOM_WEBHOOK_SECRET='):
-                    # Handle legacy token format
-                    parts = line.split('=', 1)
-                    if len(parts) == 2:
-                        legacy_token = parts[1]
-                        if legacy_token in self.ZOOM_WEBHOOK_SECRET_TOKENS:
-                            token_entries_updated.add(legacy_token)
-                            new_lines.append(line)  # Keep the original line
-                else:
-                    new_lines.append(line)
-
-            # Add any tokens that weren't already in the file
-            for i, token in enumerate(self.ZOOM_WEBHOOK_SECRET_TOKENS):
-                if token not in token_entries_updated:
-                    # This is a new token that wasn't in the file
-                    new_lines.append(f"ZOOM_WEBHOOK_SECRET_{i+1}={token}|{str(self.ZOOM_WEBHOOK_SECRET_VERIFIED[token]).lower()}")
-
-            # Write updated content back to .env file
-            with open(env_path, 'w') as file:
-                file.write('\n'.join(new_lines))
-
-            print(f"Saved verification status to .env file")
-
-        except Exception as e:
-            print(f"Error saving verification status: {e}")
+        """Persist verification status to the state file (debounced, off the event loop)"""
+        self.verification_store.save({
+            VerificationStateStore.token_key(token): verified
+            for token, verified in self.ZOOM_WEBHOOK_SECRET_VERIFIED.items()
+        })
 
     def get_next_unverified_token(self) -> str:
         """Get the next unverified token in sequence"""
@@ -267,31 +748,36 @@ class Config:
 
     def mark_token_as_verified(self, token: str):
         """Mark a specific token as verified and save status"""
-        if token in self.ZOOM_WEBHOOK_SECRET_VERIFIED:
+        if token in self.ZOOM_WEBHOOK_SECRET_VERIFIED and not self.ZOOM_WEBHOOK_SECRET_VERIFIED[token]:
             self.ZOOM_WEBHOOK_SECRET_VERIFIED[token] = True
-            # Save the updated verification status to .env
+            # Save the updated verification status
             self.save_verification_status()
 
-    def verify_zoom_signature(self, signature: str, timestamp: str, request_body: bytes) -> bool:
-        """Verify Zoom webhook signature using all registered tokens."""
+    def verify_zoom_signature(self, signature: str, timestamp: str, request_body: bytes, account_id: Optional[str] = None) -> bool:
+        """
+        Verify Zoom webhook signature.
+        The token mapped to the payload's account ID is tried first; every other
+        registered token is only scanned as a fallback.
+        """
         if not signature.startswith("v0="):
             return False
 
         received_hash = signature[3:]  # Remove 'v0='
 
-        # For compatibility with different message formats
-        message = f"v0:{timestamp}:{request_body.decode('utf-8')}"
+        snapshot = self.snapshot
+        candidate = None
+        if account_id:
+            candidate = snapshot.account_to_token.get(account_id) or self.learned_account_tokens.get(account_id)
+        if candidate and self.signature_matches(candidate, received_hash, timestamp, request_body):
+            return True
 
-        for token in self.ZOOM_WEBHOOK_SECRET_TOKENS:
-            # Generate expected hash with this token
-            expected_hash = hmac.new(
-                token.encode('utf-8'),
-                message.encode('utf-8'),
-                hashlib.sha256
-            ).hexdigest()
-
-            # Compare signatures
-            if hmac.compare_digest(received_hash, expected_hash):
+        for token in snapshot.ZOOM_WEBHOOK_SECRET_TOKENS:
+            if token == candidate:
+                continue
+            if self.signature_matches(token, received_hash, timestamp, request_body):
+                if account_id:
+                    # Remember the account so its next request verifies in one HMAC
+                    self.learned_account_tokens[account_id] = token
                 return True
 
         # If we get here, no token worked
@@ -308,163 +794,156 @@ class Config:
             "CONFIDENCE_THRESHOLD": self.CONFIDENCE_THRESHOLD,
             "DEBUG_MODE": self.DEBUG_MODE,
             "ROSTER_CACHE_SECONDS": self.ROSTER_CACHE_SECONDS,
+            "DEDUP_ENABLED": self.DEDUP_ENABLED,
             "ZOOM_TOKENS_COUNT": len(self.ZOOM_WEBHOOK_SECRET_TOKENS),
             "ZOOM_TOKENS_VERIFIED": sum(1 for v in self.ZOOM_WEBHOOK_SECRET_VERIFIED.values() if v)
         }.__str__()
 
 # Create config instance
-config = Config()
+config = Config(ENV_PATH)
+configure_logging(config.snapshot)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Startup: watch .env for changes so settings reload without a restart
+    watcher = None
+    if config.env_path and config.CONFIG_WATCH_INTERVAL_SECONDS > 0:
+        watcher = asyncio.create_task(config.watch_env_file(config.CONFIG_WATCH_INTERVAL_SECONDS))
+
+    # Pick up logged webhooks that were not finished before the last shutdown
+    recovery = None
+    if webhook_log:
+        pending = webhook_log.pending_records()
+        webhook_log.start()
+        if pending:
+            recovery = asyncio.create_task(recover_logged_webhooks(pending))
+
+    # Deliver queued NocoDB writes in the background
+    if nocodb_outbox:
+        nocodb_outbox.start()
+    flusher = None
+    if unidentified_aggregator:
+        flusher = asyncio.create_task(flush_unidentified(config.UNIDENTIFIED_FLUSH_SECONDS))
+
+    # Copy writes from the local store to NocoDB
+    replicator = None
+    if store_replicator:
+        replicator = asyncio.create_task(store_replicator.run(config.STORAGE_REPLICATE_SECONDS))
+
+    # Create upcoming date columns before any join needs them
+    provisioner = None
+    if attendance_columns:
+        provisioner = asyncio.create_task(provision_attendance_columns(config.ATTENDANCE_COLUMNS_REFRESH_SECONDS))
+
+    # Compress finished log days into the indexed archive
+    archiver = None
+    if webhook_log and config.ARCHIVE_INTERVAL_SECONDS > 0:
+        archiver = asyncio.create_task(archive_log_days(config.ARCHIVE_INTERVAL_SECONDS))
+
+    yield
+
+    # Shutdown: stop background tasks and persist anything still waiting on a debounce
+    if watcher:
+        watcher.cancel()
+    if recovery:
+        recovery.cancel()
+    if archiver:
+        archiver.cancel()
+    if webhook_log:
+        await asyncio.to_thread(webhook_log.close)
+    if nocodb_outbox:
+        await asyncio.to_thread(nocodb_outbox.stop)
+    if flusher:
+        flusher.cancel()
+        await asyncio.to_thread(unidentified_aggregator.flush)
+    if provisioner:
+        provisioner.cancel()
+    if replicator:
+        replicator.cancel()
+    config.verification_store.flush()
 
 # Initialize FastAPI app
-app = FastAPI()
-
-# API Key Middleware
-class APIKeyMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        # Skip API key check for Zoom webhook endpoint
-        if request.url.path == "/zoom/webhook":
-            return await call_next(request)
-
-        # Skip API key check if API key authentication is disabled
-        if not config.API_KEY_ENABLED:
-            return await call_next(request)
-
-        # Get API key from request header
-        api_key = request.headers.get(config.API_KEY_HEADER_NAME)
+app = FastAPI(lifespan=lifespan, default_response_class=FastJSONResponse)
+
+# API Key Middleware (pure ASGI, so exempt webhook paths pay no middleware overhead)
+class APIKeyMiddleware:
+    # Zoom webhook endpoints must stay reachable without an API key
+    EXEMPT_PATHS = frozenset({"/zoom/webhook"})
+    EXEMPT_PREFIXES = ("/zoom/webhook_",)
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        # Header name and key bytes are precomputed on the config snapshot
+        snapshot = config.snapshot
+
+        # Only HTTP requests are authenticated; lifespan events pass straight through
+        if scope["type"] != "http" or not snapshot.API_KEY_ENABLED:
+            return await self.app(scope, receive, send)
+
+        # Skip API key check for Zoom webhook endpoints
+        path = scope["path"]
+        if path in self.EXEMPT_PATHS or path.startswith(self.EXEMPT_PREFIXES):
+            return await self.app(scope, receive, send)
+
+        # Get API key from the raw request headers and compare in constant time
+        api_key = None
+        for name, value in scope["headers"]:
+            if name == snapshot.api_key_header_bytes:
+                api_key = value
+                break
 
-        # Validate API key
-        if api_key != config.API_KEY:
-            return JSONResponse(
+        if api_key is None or not hmac.compare_digest(api_key, snapshot.api_key_bytes):
+            response = JSONResponse(
                 status_code=401,
                 content={"detail": "Invalid API key or missing API key header"}
             )
+            return await response(scope, receive, send)
 
         # Continue with the request
-        return await call_next(request)
+        return await self.app(scope, receive, send)
 
 # Add API key middleware to app
 app.add_middleware(APIKeyMiddleware)
 
 # Configure OpenAI if API key is available
 # Replace Gemini configuration with OpenAI
-client = None
-if config.OPENAI_API_KEY:
-    client = OpenAI(api_key=config.OPENAI_API_KEY)
-else:
-    print("WARNING: No OpenAI API key provided. AI matching will be disabled.")
-    config.USE_AI_MATCHING = False
+def build_matcher_client(snapshot: ConfigSnapshot) -> Optional[OpenAI]:
+    """
+    Chat-completions client used for AI matching. The processor only calls
+    client.chat.completions.create(), so any object with that shape can be
+    swapped in (see bench/openai_standin.py for an offline stand-in).
+    """
+    if not snapshot.OPENAI_API_KEY:
+        return None
+    return OpenAI(
+        api_key=snapshot.OPENAI_API_KEY,
+        base_url=snapshot.OPENAI_BASE_URL,
+        timeout=snapshot.OPENAI_TIMEOUT_SECONDS,
+        max_retries=snapshot.OPENAI_MAX_RETRIES,
+    )
+
+client = build_matcher_client(config.snapshot)
+if client is None:
+    logger.warning("No OpenAI API key provided. AI matching will be disabled.")
 
 class AttendanceProcessor:
-    def __init__(self):
-        self.roster_cache = []
-        self.roster_last_updated = None
-        self.cache_lifetime = config.ROSTER_CACHE_SECONDS
+    def __init__(self, store: AttendanceStore):
+        # Roster reads and attendance/unidentified writes go through the configured store
+        self.store = store
 
         # Initialize OpenAI client from module-level client
         self.client = client
 
     async def get_roster(self, force_refresh=False):
-        """Fetch the roster from NocoDB, with caching."""
-        current_time = datetime.datetime.now()
-
-        # Check if cache is valid
-        if (not force_refresh and
-            self.roster_last_updated and
-            (current_time - self.roster_last_updated).seconds < self.cache_lifetime and
-            self.roster_cache):
-            return self.roster_cache
-
-        # Fetch from API if cache is invalid
-        headers = {"xc-token": config.NOCODB_TOKEN}
-        all_roster = []
-        page = 1
-        limit = 100  # Adjust based on your data size
-
-        # Handle pagination
-        while True:
-            response = requests.get(
-                f"{config.NOCODB_URL}/api/v2/tables/{config.ROSTER_TABLE_ID}/records",
-                params={"limit": limit, "offset": (page - 1) * limit},
-                headers=headers
-            )
-
-            if response.status_code != 200:
-                raise HTTPException(status_code=500, detail=f"Failed to get roster: {response.text}")
-
-            data = response.json()
-            all_roster.extend(data.get("list", []))
-
-            # Check if we need to fetch more pages
-            page_info = data.get("PageInfo", {})
-            if page_info.get("isLastPage", True):
-                break
-
-            page += 1
-
-        # Update cache
-        self.roster_cache = all_roster
-        self.roster_last_updated = current_time
-
-        return all_roster
+        return await self.store.get_roster(force_refresh)
 
     async def mark_attendance(self, person_id, attendance_date):
-        """Mark attendance for a person in the attendance table."""
-        headers = {
-            "xc-token": config.NOCODB_TOKEN,
-            "Content-Type": "application/json"
-        }
-
-        # Use the date directly as the column name (already in YYYY-MM-DD format)
-        date_column = attendance_date  # No need to replace - with _
-
-        payload = {
-            "Id": str(person_id),
-            f"{date_column}": "Yes"
-        }
-
-        response = requests.patch(
-            f"{config.NOCODB_URL}/api/v2/tables/{config.ATTENDANCE_TABLE_ID}/records",
-            json=payload,
-            headers=headers
-        )
-
-        if response.status_code not in [200, 201]:
-            raise HTTPException(
-                status_code=500,
-                detail=f"Failed to mark attendance: {response.text}"
-            )
-
-        return response.json()
+        return await self.store.mark_attendance(person_id, attendance_date)
 
     async def log_unidentified_participant(self, name, join_time, date):
-        """Log unidentified participants to the unidentified table."""
-        headers = {
-            "xc-token": config.NOCODB_TOKEN,
-            "Content-Type": "application/json"
-        }
-
-        # Format time for better readability
-        join_time_formatted = datetime.datetime.fromisoformat(join_time.replace('Z', '+00:00')).strftime("%H:%M")
-
-        payload = {
-            "Date": date,
-            "joinedTime": join_time_formatted,
-            "nameJoinedWith": name
-        }
-
-        response = requests.post(
-            f"{config.NOCODB_URL}/api/v2/tables/{config.UNIDENTIFIED_TABLE_ID}/records",
-            json=payload,
-            headers=headers
-        )
-
-        if response.status_code not in [200, 201]:
-            raise HTTPException(
-                status_code=500,
-                detail=f"Failed to log unidentified participant: {response.text}"
-            )
-
-        return response.json()
+        return await self.store.log_unidentified(name, join_time, date)
 
     async def match_participant_with_roster(self, participant_name, roster):
         """
@@ -539,7 +1018,7 @@ Return ONLY the ID number of the best match (with no explanation), or "NO_MATCH"
         try:
             # Call OpenAI API with improved system message and settings
             response = self.client.chat.completions.create(
-                model="gpt-4o-mini",  # Use gpt-4o-mini model
+                model=config.OPENAI_MODEL,
                 messages=[
                     {"role": "system", "content": "You are a precise name-matching assistant with expertise in identifying name variations, cultural naming patterns, and determining when a match should or should not be made. You prioritize accuracy over recall and will only provide a match when the evidence is sufficient."},
                     {"role": "user", "content": prompt}
@@ -592,7 +1071,7 @@ Return ONLY the ID number of the best match (with no explanation), or "NO_MATCH"
             }
 
         except Exception as e:
-            print(f"Error in AI matching: {str(e)}")
+            logger.error("Error in AI matching: %s", e)
             return {
                 "matchedPersonId": None,
                 "confidence": 0,
@@ -678,17 +1157,79 @@ Return ONLY the ID number of the best match (with no explanation), or "NO_MATCH"
         # Return the best match if it meets a minimum threshold (adjust as needed)
         return best_match if best_score > 2 else None
 
-    async def process_participant_joined(self, webhook_data):
+    async def match_participant(self, participant_name, roster):
+        """
+        Match a Zoom display name against the roster the way a join is processed:
+        AI matching when enabled (simple matching if it fails), otherwise simple matching.
+        Returns personId, confidence, reasoning and the method ("ai", "fallback", "simple")
+        that produced the answer.
+        """
+        # Initialize match variables
+        match_result = None
+        person_id = None
+        confidence = 0
+        reasoning = ""
+        method = None
+
+        # Try OpenAI AI first if enabled
+        if config.USE_AI_MATCHING:
+            try:
+                match_result = await self.match_participant_with_roster(participant_name, roster)
+
+                # Check if we got a valid result
+                if match_result and "matchedPersonId" in match_result:
+                    person_id = match_result.get("matchedPersonId")
+                    confidence = match_result.get("confidence", 0)
+                    reasoning = match_result.get("reasoning", "")
+                    method = "ai"
+
+                    # Log the AI matching attempt
+                    logger.info("AI matching %r: ID=%s, Confidence=%s", participant_name, person_id, confidence)
+                else:
+                    # If OpenAI didn't return a valid structure, use fallback
+                    raise ValueError("Invalid AI matching result structure")
+            except Exception as e:
+                # Log the error and fall back to simple matching
+                logger.warning("AI matching failed, using fallback: %s", e)
+                match_result = self.simple_name_matching(participant_name, roster)
+
+                # Check if simple matching found a match
+                if match_result:
+                    person_id = match_result.get("Id")
+                    confidence = 0.7  # Default confidence for simple matching
+                    reasoning = "Match found via fallback matching"
+                    method = "fallback"
+
+                    # Log the fallback matching attempt
+                    logger.info("Fallback matching %r: ID=%s, Confidence=%s, Reason=%s", participant_name, person_id, confidence, reasoning)
+                else:
+                    logger.info("No match found for participant: %s", participant_name)
+        else:
+            # AI matching is disabled, use simple matching directly
+            match_result = self.simple_name_matching(participant_name, roster)
+
+            # Check if simple matching found a match
+            if match_result:
+                person_id = match_result.get("Id")
+                confidence = 0.7  # Default confidence for simple matching
+                reasoning = "Match found via simple name matching"
+                method = "simple"
+
+                # Log the matching attempt
+                logger.info("Simple matching %r: ID=%s, Confidence=%s, Reason=%s", participant_name, person_id, confidence, reasoning)
+            else:
+                logger.info("No match found for participant: %s", participant_name)
+
+        return {"personId": person_id, "confidence": confidence, "reasoning": reasoning, "method": method}
+
+    async def process_participant_joined(self, event: MeetingParticipantJoined):
         """Process participant joined event and handle attendance marking."""
         try:
-            if "payload" not in webhook_data or "object" not in webhook_data["payload"]:
-                return {"status": "error", "message": "Invalid webhook data format"}
-
-            obj = webhook_data["payload"]["object"]
-            participant = obj.get("participant", {})
+            participant = event.payload.object.participant
 
-            participant_name = participant.get("user_name", "Unknown")
-            join_time = participant.get("join_time")
+            # Only a missing name defaults; an empty display name is kept as Zoom sent it
+            participant_name = "Unknown" if participant.user_name is None else participant.user_name
+            join_time = participant.join_time
 
             # Get today's date in YYYY-MM-DD format from the join_time
             if join_time:
@@ -701,7 +1242,7 @@ Return ONLY the ID number of the best match (with no explanation), or "NO_MATCH"
             roster = await self.get_roster()
 
             if not roster:
-                print(f"Warning: Empty roster data, cannot match participant: {participant_name}")
+                logger.warning("Empty roster data, cannot match participant: %s", participant_name)
 
                 # Still record the unmatched participant
                 unidentified_result = await self.log_unidentified_participant(
@@ -715,57 +1256,10 @@ Return ONLY the ID number of the best match (with no explanation), or "NO_MATCH"
                     "reasoning": "Empty roster"
                 }
 
-            # Initialize match variables
-            match_result = None
-            person_id = None
-            confidence = 0
-            reasoning = ""
-
-            # Try OpenAI AI first if enabled
-            if config.USE_AI_MATCHING:
-                try:
-                    match_result = await self.match_participant_with_roster(participant_name, roster)
-
-                    # Check if we got a valid result
-                    if match_result and "matchedPersonId" in match_result:
-                        person_id = match_result.get("matchedPersonId")
-                        confidence = match_result.get("confidence", 0)
-                        reasoning = match_result.get("reasoning", "")
-
-                        # Log the AI matching attempt
-                        print(f"AI Matching '{participant_name}': ID={person_id}, Confidence={confidence}")
-                    else:
-                        # If OpenAI didn't return a valid structure, use fallback
-                        raise ValueError("Invalid AI matching result structure")
-                except Exception as e:
-                    # Log the error and fall back to simple matching
-                    print(f"AI matching failed, using fallback: {str(e)}")
-                    match_result = self.simple_name_matching(participant_name, roster)
-
-                    # Check if simple matching found a match
-                    if match_result:
-                        person_id = match_result.get("Id")
-                        confidence = 0.7  # Default confidence for simple matching
-                        reasoning = "Match found via fallback matching"
-
-                        # Log the fallback matching attempt
-                        print(f"Fallback matching '{participant_name}': ID={person_id}, Confidence={confidence}, Reason={reasoning}")
-                    else:
-                        print(f"No match found for participant: {participant_name}")
-            else:
-                # AI matching is disabled, use simple matching directly
-                match_result = self.simple_name_matching(participant_name, roster)
-
-                # Check if simple matching found a match
-                if match_result:
-                    person_id = match_result.get("Id")
-                    confidence = 0.7  # Default confidence for simple matching
-                    reasoning = "Match found via simple name matching"
-
-                    # Log the matching attempt
-                    print(f"Simple matching '{participant_name}': ID={person_id}, Confidence={confidence}, Reason={reasoning}")
-                else:
-                    print(f"No match found for participant: {participant_name}")
+            match = await self.match_participant(participant_name, roster)
+            person_id = match["personId"]
+            confidence = match["confidence"]
+            reasoning = match["reasoning"]
 
             if person_id and confidence >= config.CONFIDENCE_THRESHOLD:
                 # Found a match with good confidence - mark attendance
@@ -805,221 +1299,873 @@ Return ONLY the ID number of the best match (with no explanation), or "NO_MATCH"
                     }
         except Exception as e:
             # Catch all other exceptions
-            import traceback
-            print(f"Error processing participant joined: {str(e)}")
-            print(traceback.format_exc())
+            logger.exception("Error processing participant joined: %s", e)
             return {"status": "error", "message": f"Internal error: {str(e)}"}
 
-    def store_raw_webhook(self, meeting_uuid: str, data: Dict[str, Any]) -> None:
-        """Store raw webhook data to file system"""
-        # Get current date for folder structure
-        now = datetime.datetime.now()
-        date_str = now.strftime('%Y-%m-%d')
-        timestamp = now.strftime('%Y-%m-%d_%H-%M-%S-%f')
+class TokenBucket:
+    """
+    Thread-safe token bucket shared by every caller of one budget.
+    Callers reserve a token up front (the balance may go negative) and then
+    wait out their turn, so bursts queue in order instead of stampeding.
+    """
+
+    def __init__(self, name: str, rate: float, burst: int):
+        self.name = name
+        self.lock = threading.Lock()
+        self.configure(rate, burst)
+        self.tokens = float(self.burst)
+        self.updated_at = time.monotonic()
+
+        # Metrics
+        self.acquired = 0
+        self.delayed = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def configure(self, rate: float, burst: int):
+        with self.lock:
+            self.rate = rate
+            self.burst = max(1, burst)
+
+    def reserve(self) -> float:
+        """Take a token and return how long the caller must wait before using it"""
+        with self.lock:
+            self.acquired += 1
+            if self.rate <= 0:
+                return 0.0
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+            self.updated_at = now
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+            if wait > 0:
+                self.delayed += 1
+                self.wait_seconds_total += wait
+                self.wait_seconds_max = max(self.wait_seconds_max, wait)
+            return wait
+
+    def acquire(self):
+        """Blocking acquire, for worker threads"""
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        wait = self.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            return {
+                "rate_per_second": self.rate,
+                "burst": self.burst,
+                "acquired": self.acquired,
+                "delayed": self.delayed,
+                "wait_seconds_total": round(self.wait_seconds_total, 3),
+                "wait_seconds_max": round(self.wait_seconds_max, 3),
+                "wait_seconds_avg": round(self.wait_seconds_total / self.acquired, 4) if self.acquired else 0.0,
+            }
 
-        # Create directory structure
-        raw_dir = pathlib.Path("Raw")
-        day_dir = raw_dir / date_str
-        meeting_dir = day_dir / meeting_uuid
-        meeting_dir.mkdir(parents=True, exist_ok=True)
+# Shared NocoDB budgets: roster reads vs. attendance/unidentified writes
+nocodb_read_limiter = TokenBucket("read", config.NOCODB_READ_RATE, config.NOCODB_READ_BURST)
+nocodb_write_limiter = TokenBucket("write", config.NOCODB_WRITE_RATE, config.NOCODB_WRITE_BURST)
+
+def send_nocodb_request(method: str, path: str, payload: Any) -> int:
+    """Outbox delivery: send one queued write and return the HTTP status"""
+    nocodb_write_limiter.acquire()
+    response = requests.request(
+        method,
+        f"{config.NOCODB_URL}{path}",
+        json=payload,
+        headers={"xc-token": config.NOCODB_TOKEN, "Content-Type": "application/json"},
+        timeout=config.NOCODB_TIMEOUT_SECONDS
+    )
+    return response.status_code
+
+# Initialize the NocoDB outbox (sender started by the app lifespan)
+nocodb_outbox = None
+if config.OUTBOX_ENABLED:
+    nocodb_outbox = Outbox(
+        config.OUTBOX_DB_PATH,
+        send_nocodb_request,
+        config.OUTBOX_MAX_ATTEMPTS,
+        config.OUTBOX_BACKOFF_BASE_SECONDS,
+        config.OUTBOX_BACKOFF_MAX_SECONDS,
+        CircuitBreaker(config.OUTBOX_BREAKER_FAILURE_THRESHOLD, config.OUTBOX_BREAKER_RESET_SECONDS),
+        config.OUTBOX_POLL_SECONDS,
+    )
+
+def format_join_time(join_time: str) -> str:
+    """ISO join time -> HH:MM as shown in the unidentified table"""
+    return datetime.datetime.fromisoformat(join_time.replace('Z', '+00:00')).strftime("%H:%M")
+
+class UnidentifiedAggregator:
+    """
+    Aggregates unidentified joins per (normalized name, date) in a small SQLite
+    file, keeping the first/last join time and a join count. A periodic flush
+    bulk-inserts new rows and bulk-updates rows whose count changed, so a guest
+    who reconnects 15 times is one row and a couple of requests.
+
+    A batch NocoDB rejects outright (4xx other than 408/425/429) is resent
+    row by row to isolate the bad row: an update whose NocoDB row is gone is
+    inserted again on the next flush, and an insert that is still rejected is
+    dropped, so one row cannot stall the rest of the table.
+    """
+
+    BATCH_SIZE = 100
+
+    def __init__(self, db_path: str):
+        self.lock = threading.Lock()
+        pathlib.Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS unidentified ("
+            " name_key TEXT NOT NULL, date TEXT NOT NULL, name TEXT NOT NULL,"
+            " first_join TEXT NOT NULL, last_join TEXT NOT NULL, join_count INTEGER NOT NULL,"
+            " row_id INTEGER, dirty INTEGER NOT NULL DEFAULT 1,"
+            " PRIMARY KEY (name_key, date))"
+        )
 
-        # Write webhook data to file
-        file_path = meeting_dir / f"{timestamp}.json"
-        with open(file_path, 'w') as f:
-            json.dump(data, f, indent=2)
+    @staticmethod
+    def normalize(name: str) -> str:
+        return " ".join(name.lower().split())
+
+    def record(self, name: str, join_time: str, date: str) -> Dict[str, Any]:
+        """Count one unidentified join; the row is written on the next flush"""
+        with self.lock:
+            self.db.execute(
+                "INSERT INTO unidentified (name_key, date, name, first_join, last_join, join_count)"
+                " VALUES (?, ?, ?, ?, ?, 1)"
+                " ON CONFLICT (name_key, date) DO UPDATE SET"
+                "  first_join = MIN(first_join, excluded.first_join),"
+                "  last_join = MAX(last_join, excluded.last_join),"
+                "  join_count = join_count + 1, dirty = 1",
+                (self.normalize(name), date, name, join_time, join_time)
+            )
+            count = self.db.execute(
+                "SELECT join_count FROM unidentified WHERE name_key = ? AND date = ?",
+                (self.normalize(name), date)
+            ).fetchone()[0]
+        return {"aggregated": True, "joinCount": count}
+
+    def flush(self) -> Dict[str, int]:
+        """Send dirty aggregates to NocoDB: bulk insert new rows, bulk update known ones"""
+        with self.lock:
+            rows = self.db.execute(
+                "SELECT name_key, date, name, first_join, last_join, join_count, row_id"
+                " FROM unidentified WHERE dirty = 1"
+            ).fetchall()
+        new_rows = [row for row in rows if row[6] is None]
+        changed_rows = [row for row in rows if row[6] is not None]
+        flushed = {"inserted": 0, "updated": 0, "requeued": 0, "dropped": 0}
+
+        for start in range(0, len(new_rows), self.BATCH_SIZE):
+            if not self.flush_batch("POST", new_rows[start:start + self.BATCH_SIZE], flushed):
+                break
 
-# Initialize the processor
-attendance_processor = AttendanceProcessor()
+        for start in range(0, len(changed_rows), self.BATCH_SIZE):
+            if not self.flush_batch("PATCH", changed_rows[start:start + self.BATCH_SIZE], flushed):
+                break
 
-# Zoom webhook endpoint with custom header verification
-@app.post("/zoom/webhook")
-async def zoom_webhook(request: Request):
-    """Process Zoom webhook events with custom header verification."""
-    # Get the raw body for signature verification
-    body = await request.body()
-    body_str = body.decode("utf-8")
+        self.prune()
+        if any(flushed.values()):
+            logger.info("Flushed unidentified participants", extra=flushed)
+        return flushed
 
-    # Log the raw request details
-    current_time = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    print(f"[{current_time}] Raw webhook received: {body_str[:200]}...")
-    print(f"[{current_time}] Headers: {dict(request.headers)}")
+    def flush_batch(self, method: str, batch, flushed: Dict[str, int]) -> bool:
+        """Send one batch; returns False when NocoDB is unavailable and the flush should stop"""
+        if method == "POST":
+            records = [self.record_payload(row) for row in batch]
+        else:
+            records = [{"Id": row[6], **self.record_payload(row)} for row in batch]
+        status, body = self.send(method, records)
+
+        if status in [200, 201]:
+            if method == "POST":
+                created = [body] if isinstance(body, dict) else body
+                self.mark_flushed(batch, [item.get("Id") for item in created])
+                flushed["inserted"] += len(batch)
+            else:
+                self.mark_flushed(batch, [row[6] for row in batch])
+                flushed["updated"] += len(batch)
+            return True
+        if not self.rejected(status):
+            logger.warning("Unidentified flush failed (%s), will retry: %s",
+                           f"HTTP {status}" if status else "unreachable", body)
+            return False
 
-    # Custom header verification
-    if config.ZOOM_CUSTOM_HEADER_ENABLED:
-        custom_header_verified = config.verify_zoom_custom_header(request.headers)
-        if not custom_header_verified:
-            print(f"[{current_time}] Custom header verification failed")
-            raise HTTPException(status_code=401, detail="Invalid custom header authentication")
+        if len(batch) > 1:
+            # One bad row rejects the whole bulk request; resend row by row to find it
+            return all(self.flush_batch(method, [row], flushed) for row in batch)
+        row = batch[0]
+        if method == "PATCH":
+            # Most likely deleted in NocoDB by a reviewer: insert it again on the next flush
+            logger.warning("Unidentified row %s for %r rejected (HTTP %s), re-inserting: %s",
+                           row[6], row[2], status, body)
+            with self.lock:
+                self.db.execute("UPDATE unidentified SET row_id = NULL WHERE name_key = ? AND date = ?",
+                                (row[0], row[1]))
+            flushed["requeued"] += 1
         else:
-            print(f"[{current_time}] Custom header verification successful")
+            logger.error("Unidentified row for %r on %s rejected (HTTP %s), dropping: %s",
+                         row[2], row[1], status, body)
+            self.mark_flushed(batch, [None])
+            flushed["dropped"] += 1
+        return True
+
+    def pending(self) -> int:
+        with self.lock:
+            return self.db.execute("SELECT COUNT(*) FROM unidentified WHERE dirty = 1").fetchone()[0]
+
+    def drain(self, timeout: float) -> int:
+        """Flush until nothing is dirty or `timeout` passes; returns how many entries are left"""
+        deadline = time.monotonic() + timeout
+        while True:
+            self.flush()
+            remaining = self.pending()
+            if not remaining or time.monotonic() >= deadline:
+                return remaining
+            time.sleep(min(1.0, max(0.0, deadline - time.monotonic())))
+
+    @staticmethod
+    def record_payload(row) -> Dict[str, Any]:
+        _, date, name, first_join, last_join, join_count, _ = row
+        return {
+            "Date": date,
+            "joinedTime": format_join_time(first_join),
+            "lastJoinedTime": format_join_time(last_join),
+            "joinCount": join_count,
+            "nameJoinedWith": name,
+        }
 
-    # Try to parse JSON
-    try:
-        data = json.loads(body_str)
-    except json.JSONDecodeError as e:
-        print(f"[{current_time}] JSON parse error: {str(e)}")
-        raise HTTPException(status_code=400, detail=f"Invalid JSON: {str(e)}")
-
-    event_type = data.get("event")
-    print(f"[{current_time}] Webhook received: {event_type}")
-
-    # Extract meeting UUID if available for raw data storage
-    meeting_uuid = None
-    if "payload" in data and "object" in data["payload"]:
-        obj = data["payload"]["object"]
-        if "uuid" in obj:
-            meeting_uuid = obj["uuid"]
-            # Store raw webhook data (you would need your own implementation of this function)
-            # attendance_processor.store_raw_webhook(meeting_uuid, data)
-
-    # Case 1: Handle Zoom endpoint verification
-    if event_type == "endpoint.url_validation":
-        print(f"[{current_time}] Processing endpoint validation")
-        print(f"[{current_time}] Full validation payload: {json.dumps(data)}")
-
-        plain_token = data.get("payload", {}).get("plainToken")
-        if not plain_token:
-            print(f"[{current_time}] Error: No plain token provided")
-            raise HTTPException(status_code=400, detail="No plain token provided")
+    @staticmethod
+    def rejected(status: Optional[int]) -> bool:
+        """Whether NocoDB refused the request in a way a retry would repeat"""
+        return status is not None and 400 <= status < 500 and status not in RETRYABLE_STATUS
 
-        # Use the next unverified token for validation
-        current_token = config.get_next_unverified_token()
-        if not current_token:
-            print(f"[{current_time}] Error: No webhook tokens configured")
-            raise HTTPException(status_code=500, detail="No webhook tokens configured")
+    def send(self, method: str, records: List[Dict[str, Any]]) -> Tuple[Optional[int], Any]:
+        """One bulk request; returns (HTTP status, body), with no status if NocoDB was unreachable"""
+        nocodb_write_limiter.acquire()
+        try:
+            response = requests.request(
+                method,
+                f"{config.NOCODB_URL}/api/v2/tables/{config.UNIDENTIFIED_TABLE_ID}/records",
+                json=records,
+                headers={"xc-token": config.NOCODB_TOKEN, "Content-Type": "application/json"},
+                timeout=config.NOCODB_TIMEOUT_SECONDS
+            )
+        except requests.RequestException as e:
+            return None, str(e)
+        if response.status_code not in [200, 201]:
+            return response.status_code, response.text
+        return response.status_code, response.json()
+
+    def mark_flushed(self, batch, row_ids):
+        with self.lock:
+            for row, row_id in zip(batch, row_ids):
+                # Only clear dirty if no join arrived while the request was in flight
+                self.db.execute(
+                    "UPDATE unidentified SET row_id = ?, dirty = CASE WHEN join_count = ? THEN 0 ELSE 1 END"
+                    " WHERE name_key = ? AND date = ?",
+                    (row_id, row[5], row[0], row[1])
+                )
 
-        print(f"[{current_time}] Using token (first 5 chars): {current_token[:5]}...")
-        print(f"[{current_time}] Plain token from Zoom: {plain_token}")
+    def prune(self):
+        # Read on every flush so a config reload applies
+        cutoff = (datetime.date.today() - datetime.timedelta(days=config.UNIDENTIFIED_RETENTION_DAYS)).isoformat()
+        with self.lock:
+            self.db.execute("DELETE FROM unidentified WHERE date < ? AND dirty = 0", (cutoff,))
+
+class AttendanceColumnProvisioner:
+    """
+    Keeps the attendance table's date columns ("YYYY-MM-DD") created ahead of
+    use through the NocoDB meta API, and caches the set of known columns so
+    mark_attendance can check for a column without any request. A date whose
+    column could not be created is backed off (doubling from
+    ATTENDANCE_COLUMN_RETRY_SECONDS up to the refresh interval), so joins
+    during an outage do not each repeat the meta requests.
+    """
 
-        # Generate hash using the helper function
-        def generate_hash(message: str, secret: str) -> str:
-            return hmac.new(
-                secret.encode('utf-8'),
-                message.encode('utf-8'),
-                hashlib.sha256
-            ).hexdigest()
+    def __init__(self):
+        self.known: Set[str] = set()
+        self.loaded = False
+        self.lock = threading.Lock()
+        self.failures: Dict[str, Tuple[int, float]] = {}  # date -> (failed attempts, retry at)
+
+    def backing_off(self, date: str) -> bool:
+        failure = self.failures.get(date)
+        return failure is not None and time.monotonic() < failure[1]
+
+    def failed(self, date: str):
+        attempts = self.failures.get(date, (0, 0.0))[0] + 1
+        delay = config.ATTENDANCE_COLUMN_RETRY_SECONDS * (2 ** (attempts - 1))
+        delay = min(delay, max(config.ATTENDANCE_COLUMN_RETRY_SECONDS, config.ATTENDANCE_COLUMNS_REFRESH_SECONDS))
+        self.failures[date] = (attempts, time.monotonic() + delay)
+
+    def meta_url(self) -> str:
+        return f"{config.NOCODB_URL}/api/v2/meta/tables/{config.ATTENDANCE_TABLE_ID}"
+
+    def refresh(self):
+        """Reload the column titles from the table's metadata"""
+        nocodb_read_limiter.acquire()
+        response = requests.get(
+            self.meta_url(),
+            headers={"xc-token": config.NOCODB_TOKEN},
+            timeout=config.NOCODB_TIMEOUT_SECONDS
+        )
+        response.raise_for_status()
+        self.known = {column.get("title") for column in response.json().get("columns", [])}
+        self.loaded = True
 
-        encrypted_token = generate_hash(plain_token, current_token)
+    def ensure(self, dates: List[str], force: bool = False) -> List[str]:
+        """
+        Create whichever of the date columns are missing; returns the created
+        ones. Dates still backing off from a failure are skipped unless forced.
+        """
+        with self.lock:
+            if not force:
+                dates = [date for date in dates if not self.backing_off(date)]
+                if not dates:
+                    return []
+            try:
+                refreshed = not self.loaded
+                if refreshed:
+                    self.refresh()
+                missing = [date for date in dates if date not in self.known]
+                if missing and not refreshed:
+                    # A stale cache must not make us create a column someone else added
+                    self.refresh()
+                    missing = [date for date in missing if date not in self.known]
+            except Exception:
+                for date in dates:
+                    if date not in self.known:
+                        self.failed(date)
+                raise
+
+            created = []
+            for date in missing:
+                nocodb_write_limiter.acquire()
+                response = requests.post(
+                    f"{self.meta_url()}/columns",
+                    json={"title": date, "column_name": date, "uidt": config.ATTENDANCE_COLUMN_TYPE},
+                    headers={"xc-token": config.NOCODB_TOKEN, "Content-Type": "application/json"},
+                    timeout=config.NOCODB_TIMEOUT_SECONDS
+                )
+                if response.status_code not in [200, 201]:
+                    logger.error("Failed to create attendance column %s: %s", date, response.text)
+                    self.failed(date)
+                    continue
+                self.known.add(date)
+                self.failures.pop(date, None)
+                created.append(date)
 
-        print(f"[{current_time}] Generated encrypted token: {encrypted_token}")
+        if created:
+            logger.info("Created attendance column(s): %s", created)
+        return created
 
-        # Mark this token as verified
-        config.mark_token_as_verified(current_token)
+    def upcoming_dates(self, days_ahead: int) -> List[str]:
+        today = datetime.datetime.now(datetime.timezone.utc).date()
+        return [(today + datetime.timedelta(days=offset)).isoformat() for offset in range(days_ahead + 1)]
 
-        # Log verification status
-        verified_count = sum(1 for v in config.ZOOM_WEBHOOK_SECRET_VERIFIED.values() if v)
-        total_count = len(config.ZOOM_WEBHOOK_SECRET_TOKENS)
-        print(f"[{current_time}] Verified {verified_count} out of {total_count} accounts")
+    def provision_ahead(self) -> List[str]:
+        with self.lock:
+            self.loaded = False  # pick up columns added or removed by hand
+        return self.ensure(self.upcoming_dates(config.ATTENDANCE_COLUMNS_DAYS_AHEAD), force=True)
 
-        # Prepare response
-        response = {
-            "plainToken": plain_token,
-            "encryptedToken": encrypted_token
+attendance_columns = None
+if config.ATTENDANCE_COLUMNS_REFRESH_SECONDS > 0:
+    attendance_columns = AttendanceColumnProvisioner()
+
+# Initialize the unidentified aggregator (flushed by the app lifespan)
+unidentified_aggregator = None
+if config.UNIDENTIFIED_FLUSH_SECONDS > 0:
+    unidentified_aggregator = UnidentifiedAggregator(config.UNIDENTIFIED_DB_PATH)
+
+class NocoDBStore(AttendanceStore):
+    """Reads the roster from and writes attendance/unidentified rows to NocoDB over REST"""
+
+    name = "nocodb"
+
+    def __init__(self):
+        self.roster_cache = []
+        self.roster_last_updated = None
+        self.cache_lifetime = config.ROSTER_CACHE_SECONDS
+
+    async def get_roster(self, force_refresh=False):
+        """Fetch the roster from NocoDB, with caching."""
+        current_time = datetime.datetime.now()
+
+        # Check if cache is valid
+        if (not force_refresh and
+            self.roster_last_updated and
+            (current_time - self.roster_last_updated).seconds < self.cache_lifetime and
+            self.roster_cache):
+            return self.roster_cache
+
+        # Fetch from API if cache is invalid
+        headers = {"xc-token": config.NOCODB_TOKEN}
+        all_roster = []
+        page = 1
+        limit = 100  # Adjust based on your data size
+
+        # Handle pagination
+        while True:
+            await nocodb_read_limiter.acquire_async()
+            # Off the event loop: a large roster is hundreds of pages, and NocoDB may be unreachable
+            response = await asyncio.to_thread(
+                requests.get,
+                f"{config.NOCODB_URL}/api/v2/tables/{config.ROSTER_TABLE_ID}/records",
+                params={"limit": limit, "offset": (page - 1) * limit},
+                headers=headers,
+                timeout=config.NOCODB_TIMEOUT_SECONDS
+            )
+
+            if response.status_code != 200:
+                raise HTTPException(status_code=500, detail=f"Failed to get roster: {response.text}")
+
+            data = response.json()
+            all_roster.extend(data.get("list", []))
+
+            # Check if we need to fetch more pages
+            page_info = data.get("PageInfo", {})
+            if page_info.get("isLastPage", True):
+                break
+
+            page += 1
+
+        # Update cache
+        self.roster_cache = all_roster
+        self.roster_last_updated = current_time
+
+        return all_roster
+
+    async def mark_attendance(self, person_id, attendance_date):
+        """Mark attendance for a person in the attendance table."""
+        # Use the date directly as the column name (already in YYYY-MM-DD format)
+        date_column = attendance_date  # No need to replace - with _
+
+        payload = {
+            "Id": str(person_id),
+            f"{date_column}": "Yes"
         }
 
-        print(f"[{current_time}] Validation response: {json.dumps(response)}")
-        return JSONResponse(content=response)
+        # Normally provisioned ahead of time; only an unexpected date (e.g. a backfill) pays here
+        if (attendance_columns and date_column not in attendance_columns.known
+                and not attendance_columns.backing_off(date_column)):
+            try:
+                await asyncio.to_thread(attendance_columns.ensure, [date_column])
+            except Exception as e:
+                logger.warning("Could not provision attendance column %s: %s", date_column, e)
 
-    # Case 2: Verify signature for regular webhook events
-    signature = request.headers.get("x-zm-signature", "")
-    timestamp = request.headers.get("x-zm-request-timestamp", "")
+        return await self.write_records("PATCH", config.ATTENDANCE_TABLE_ID, payload, "mark attendance")
 
-    print(f"[{current_time}] Webhook headers - Signature: {signature}, Timestamp: {timestamp}")
+    async def log_unidentified(self, name, join_time, date):
+        """Log unidentified participants to the unidentified table."""
+        if unidentified_aggregator:
+            # Repeat joins of the same name on the same day update one row
+            return unidentified_aggregator.record(name, join_time, date)
 
-    if signature and timestamp:
-        signature_valid = config.verify_zoom_signature(signature, timestamp, body)
-        print(f"[{current_time}] Signature verification result: {signature_valid}")
+        # Format time for better readability
+        join_time_formatted = format_join_time(join_time)
 
-        if not signature_valid:
-            print(f"[{current_time}] Invalid signature - rejecting webhook")
-            raise HTTPException(status_code=401, detail="Invalid signature")
-    elif config.ZOOM_WEBHOOK_SECRET_TOKENS:
-        # Only enforce signature check if tokens are configured
-        print(f"[{current_time}] Missing signature or timestamp headers")
-        raise HTTPException(status_code=401, detail="Missing signature headers")
+        payload = {
+            "Date": date,
+            "joinedTime": join_time_formatted,
+            "nameJoinedWith": name
+        }
 
-    # Process based on event type
-    if event_type == "meeting.participant_joined":
-        print(f"[{current_time}] Processing participant joined event")
-        result = await attendance_processor.process_participant_joined(data)
-        print(f"[{current_time}] Participant processing result: {json.dumps(result)}")
-        return result
-    else:
-        # For other event types, just acknowledge receipt
-        print(f"[{current_time}] Event {event_type} received but not processed")
-        return {"status": "success", "message": f"Event {event_type} received but not processed"}
+        return await self.write_records(
+            "POST", config.UNIDENTIFIED_TABLE_ID, payload, "log unidentified participant"
+        )
 
-@app.post("/zoom/webhook_{endpoint_number}")
-async def zoom_webhook_underscore(endpoint_number: str, request: Request):
-    """Process Zoom webhook events with underscore format."""
+    async def write_records(self, method, table_id, payload, action):
+        """
+        Write records to a NocoDB table. With the outbox enabled the write is
+        queued durably and delivered in the background, so it never fails here.
+        """
+        path = f"/api/v2/tables/{table_id}/records"
+        if nocodb_outbox:
+            return {"queued": True, "outboxId": nocodb_outbox.enqueue(method, path, payload)}
+
+        await nocodb_write_limiter.acquire_async()
+        response = await asyncio.to_thread(
+            requests.request,
+            method,
+            f"{config.NOCODB_URL}{path}",
+            json=payload,
+            headers={"xc-token": config.NOCODB_TOKEN, "Content-Type": "application/json"},
+            timeout=config.NOCODB_TIMEOUT_SECONDS
+        )
+
+        if response.status_code not in [200, 201]:
+            raise HTTPException(
+                status_code=500,
+                detail=f"Failed to {action}: {response.text}"
+            )
+
+        return response.json()
+
+# Attendance storage: NocoDB directly, or local SQLite replicated to NocoDB
+nocodb_store = NocoDBStore()
+local_store = None
+store_replicator = None
+if config.STORAGE_BACKEND == "sqlite":
+    local_store = SQLiteStore(config.STORAGE_DB_PATH, upstream=nocodb_store)
+    store_replicator = StoreReplicator(
+        local_store, nocodb_store, config.ROSTER_CACHE_SECONDS, config.STORAGE_RETENTION_DAYS
+    )
+elif config.STORAGE_BACKEND != "nocodb":
+    logger.warning("Unknown STORAGE_BACKEND %r, using nocodb", config.STORAGE_BACKEND)
+
+# Initialize the processor
+attendance_processor = AttendanceProcessor(local_store or nocodb_store)
+
+class WebhookDedupIndex:
+    """
+    Bounded, time-windowed index of webhook fingerprints.
+    Entries are kept in memory (insertion ordered) and mirrored to a small
+    SQLite file so retries are still recognised after a restart.
+    """
+
+    def __init__(self, db_path: str, window_seconds: int, max_entries: int):
+        self.window_seconds = window_seconds
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[str, float]" = OrderedDict()
+
+        pathlib.Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS seen (fingerprint TEXT PRIMARY KEY, seen_at REAL NOT NULL)"
+        )
+        self.load()
+
+    @staticmethod
+    def fingerprint(event: Any) -> Optional[str]:
+        """Build a fingerprint from the fields Zoom keeps stable across retries."""
+        if event.event_ts is None:
+            return None
+
+        obj = event.payload.object
+        participant = getattr(obj, "participant", None)
+        key = "|".join(str(part or "") for part in (
+            event.event,
+            event.event_ts,
+            getattr(obj, "uuid", None),
+            getattr(participant, "participant_uuid", None),
+            getattr(participant, "join_time", None),
+        ))
+        return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+    def load(self):
+        """Load unexpired fingerprints from disk into memory."""
+        cutoff = time.time() - self.window_seconds
+        self.db.execute("DELETE FROM seen WHERE seen_at < ?", (cutoff,))
+        rows = self.db.execute(
+            "SELECT fingerprint, seen_at FROM seen ORDER BY seen_at DESC LIMIT ?",
+            (self.max_entries,)
+        ).fetchall()
+        for fingerprint, seen_at in reversed(rows):
+            self.entries[fingerprint] = seen_at
+        logger.info("Loaded %d webhook fingerprint(s) into dedup index", len(self.entries))
+
+    def _evict(self, now: float):
+        """Drop expired entries and enforce the size bound (oldest first)."""
+        cutoff = now - self.window_seconds
+        evicted = []
+        while self.entries:
+            fingerprint, seen_at = next(iter(self.entries.items()))
+            if seen_at >= cutoff and len(self.entries) <= self.max_entries:
+                break
+            self.entries.popitem(last=False)
+            evicted.append((fingerprint,))
+        if evicted:
+            self.db.executemany("DELETE FROM seen WHERE fingerprint = ?", evicted)
+
+    def check_and_add(self, fingerprint: str) -> bool:
+        """Return True if the fingerprint was already seen, otherwise record it."""
+        now = time.time()
+        seen_at = self.entries.get(fingerprint)
+        if seen_at is not None and now - seen_at < self.window_seconds:
+            return True
+
+        self.entries[fingerprint] = now
+        self.entries.move_to_end(fingerprint)
+        self.db.execute(
+            "INSERT OR REPLACE INTO seen (fingerprint, seen_at) VALUES (?, ?)",
+            (fingerprint, now)
+        )
+        self._evict(now)
+        return False
+
+    def discard(self, fingerprint: str):
+        """Forget a fingerprint so a retry of a failed delivery is processed again."""
+        if self.entries.pop(fingerprint, None) is not None:
+            self.db.execute("DELETE FROM seen WHERE fingerprint = ?", (fingerprint,))
+
+# Initialize the dedup index
+dedup_index = None
+if config.DEDUP_ENABLED:
+    dedup_index = WebhookDedupIndex(
+        config.DEDUP_DB_PATH, config.DEDUP_WINDOW_SECONDS, config.DEDUP_MAX_ENTRIES
+    )
+
+# Initialize the webhook log (started by the app lifespan)
+webhook_log = None
+if config.WEBHOOK_LOG_ENABLED:
+    webhook_log = WebhookLog(
+        config.WEBHOOK_LOG_DIR,
+        config.WEBHOOK_LOG_SEGMENT_MAX_BYTES,
+        config.WEBHOOK_LOG_SEGMENT_MAX_SECONDS,
+        config.WEBHOOK_LOG_COMMIT_INTERVAL_MS / 1000,
+    )
+
+class SignatureReplayGuard:
+    """
+    Rejects stale or replayed signed requests. The timestamp and a lookup in a
+    bounded LRU of recently accepted signatures are checked before any parsing
+    or I/O; a signature is only recorded once its HMAC has been verified, and is
+    forgotten again if the delivery fails so Zoom's retry is accepted. Anything
+    older than the skew window is already rejected by the timestamp check.
+    """
+
+    def __init__(self, max_skew_seconds: int, max_entries: int):
+        self.max_skew_seconds = max_skew_seconds
+        self.max_entries = max_entries
+        self.seen: "OrderedDict[str, None]" = OrderedDict()
+
+    def check(self, signature: str, timestamp: str) -> Optional[str]:
+        """Return a rejection reason, or None if the request may proceed."""
+        if self.max_skew_seconds > 0:
+            try:
+                skew = abs(time.time() - int(timestamp))
+            except ValueError:
+                return "Invalid request timestamp"
+            if skew > self.max_skew_seconds:
+                return "Request timestamp outside allowed window"
+
+        if signature in self.seen:
+            self.seen.move_to_end(signature)
+            return "Replayed request"
+        return None
+
+    def record(self, signature: str) -> bool:
+        """Remember a verified signature; False if it was recorded in the meantime (a replay)."""
+        if signature in self.seen:
+            self.seen.move_to_end(signature)
+            return False
+        self.seen[signature] = None
+        if len(self.seen) > self.max_entries:
+            self.seen.popitem(last=False)
+        return True
+
+    def forget(self, signature: str):
+        """Drop a signature whose delivery failed, so a byte-identical retry is accepted."""
+        self.seen.pop(signature, None)
+
+# Initialize the replay guard
+replay_guard = SignatureReplayGuard(
+    config.ZOOM_SIGNATURE_MAX_SKEW_SECONDS, config.ZOOM_SEEN_SIGNATURE_CACHE_SIZE
+)
+
+# Event dispatch table: event type -> (cost class, handler).
+#   validation - endpoint.url_validation handshake
+#   process    - full typed decode, dedup check, then the handler
+#   ack        - signature verified from a peek at the envelope and acknowledged;
+#                the body is never fully decoded. Every type not listed here is ack.
+COST_VALIDATION = "validation"
+COST_PROCESS = "process"
+COST_ACK = "ack"
+
+EVENT_DISPATCH = {
+    "endpoint.url_validation": (COST_VALIDATION, None),
+    "meeting.participant_joined": (COST_PROCESS, attendance_processor.process_participant_joined),
+}
+ACK_ONLY = (COST_ACK, None)
+
+class WebhookVerifier:
+    """
+    Signature verification and url_validation for one webhook URL.
+    A verifier bound to a token checks exactly that token; an unbound one
+    routes by the payload's account ID (see Config.verify_zoom_signature).
+    """
+
+    def __init__(self, token: Optional[str] = None, rotate_validation: bool = False):
+        self.token = token
+        self.rotate_validation = rotate_validation
+
+    def verify(self, signature: str, timestamp: str, body: bytes, account_id: Optional[str] = None) -> bool:
+        if self.token is None:
+            return config.verify_zoom_signature(signature, timestamp, body, account_id)
+        if not signature.startswith("v0="):
+            return False
+        return config.signature_matches(self.token, signature[3:], timestamp, body)
+
+    def validation_token(self) -> Optional[str]:
+        """Token that answers the url_validation challenge, if any"""
+        if self.rotate_validation:
+            return config.get_next_unverified_token() or None
+        return self.token
+
+@dataclass(frozen=True)
+class WebhookEndpoint:
+    """Prebuilt routing entry for one webhook URL"""
+    name: str
+    verifier: WebhookVerifier
+    dispatch: Mapping[str, Tuple[str, Any]]
+
+def build_endpoint_registry(snapshot: ConfigSnapshot) -> Dict[str, WebhookEndpoint]:
+    """Map each webhook URL suffix ("" for /zoom/webhook) to its endpoint"""
+    registry = {
+        "": WebhookEndpoint("default", WebhookVerifier(rotate_validation=True), EVENT_DISPATCH)
+    }
+    # Positional numbering (webhook_1 is the first token) for tokens without an explicit
+    # number; explicit ZOOM_WEBHOOK_SECRET_<N> numbers take precedence
+    for index, token in enumerate(snapshot.ZOOM_WEBHOOK_SECRET_TOKENS, start=1):
+        registry[str(index)] = WebhookEndpoint(str(index), WebhookVerifier(token), EVENT_DISPATCH)
+    for number, token in snapshot.webhook_number_to_token.items():
+        registry[number] = WebhookEndpoint(number, WebhookVerifier(token), EVENT_DISPATCH)
+    return registry
+
+endpoint_registry = build_endpoint_registry(config.snapshot)
+
+def apply_reloaded_config(previous: ConfigSnapshot, snapshot: ConfigSnapshot):
+    """Push reloaded settings into long-lived objects without dropping their caches"""
+    global client, endpoint_registry
+    configure_logging(snapshot)
+    nocodb_store.cache_lifetime = snapshot.ROSTER_CACHE_SECONDS
+    if store_replicator:
+        store_replicator.roster_refresh_seconds = snapshot.ROSTER_CACHE_SECONDS
+    replay_guard.max_skew_seconds = snapshot.ZOOM_SIGNATURE_MAX_SKEW_SECONDS
+    nocodb_read_limiter.configure(snapshot.NOCODB_READ_RATE, snapshot.NOCODB_READ_BURST)
+    nocodb_write_limiter.configure(snapshot.NOCODB_WRITE_RATE, snapshot.NOCODB_WRITE_BURST)
+    endpoint_registry = build_endpoint_registry(snapshot)
+
+    client_settings = ("OPENAI_API_KEY", "OPENAI_BASE_URL", "OPENAI_TIMEOUT_SECONDS", "OPENAI_MAX_RETRIES")
+    if any(getattr(snapshot, name) != getattr(previous, name) for name in client_settings):
+        client = build_matcher_client(snapshot)
+        attendance_processor.client = client
+
+config.reload_listeners.append(apply_reloaded_config)
+
+async def recover_logged_webhooks(records):
+    """Process logged events whose processing never finished (e.g. a crash mid-request)"""
+    recovered = 0
+    for record in records:
+        cost, handler = EVENT_DISPATCH.get(record.event, ACK_ONLY)
+        try:
+            if cost == COST_PROCESS:
+                event = decode_event(json_dumps(record.body), record.event)
+                await handler(event)
+                recovered += 1
+        except Exception:
+            logger.exception("Recovery of logged webhook failed", extra={"seq": record.seq, "event": record.event})
+        finally:
+            webhook_log.mark_done(record.seq)
+    logger.info("Recovered %d unfinished webhook(s) from the log", recovered)
+
+async def provision_attendance_columns(interval: float):
+    """Periodically make sure the next days' attendance columns exist"""
+    while True:
+        try:
+            await asyncio.to_thread(attendance_columns.provision_ahead)
+        except Exception as e:
+            logger.warning("Provisioning attendance columns failed: %s", e)
+        await asyncio.sleep(interval)
+
+async def flush_unidentified(interval: float):
+    """Periodically write aggregated unidentified participants to NocoDB"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await asyncio.to_thread(unidentified_aggregator.flush)
+        except Exception:
+            logger.exception("Flushing unidentified participants failed")
+
+async def archive_log_days(interval: float):
+    """Periodically move finished days from the webhook log into the archive"""
+    while True:
+        try:
+            await asyncio.to_thread(
+                seal_days, config.WEBHOOK_LOG_DIR, config.ARCHIVE_DIR, config.ARCHIVE_CODEC or None
+            )
+        except Exception:
+            logger.exception("Archiving webhook log days failed")
+        await asyncio.sleep(interval)
+
+async def handle_webhook(request: Request, endpoint: WebhookEndpoint):
+    """Shared webhook pipeline: header checks, routing, verification, then dispatch."""
     # Get the raw body for signature verification
     body = await request.body()
-    body_str = body.decode("utf-8")
-
-    # Log the raw request details
-    current_time = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    print(f"[{current_time}] Raw webhook received at endpoint_{endpoint_number}: {body_str[:200]}...")
-    print(f"[{current_time}] Headers: {dict(request.headers)}")
 
-    # Get the token for this webhook number
-    token, is_verified = config.get_token_by_endpoint_number(endpoint_number)
-    print(f"[{current_time}] Token lookup for webhook_{endpoint_number}: found={token is not None}, verified={is_verified}")
+    # Raw request dumps are only worth their cost in debug mode
+    if config.DEBUG_MODE:
+        logger.debug("Raw webhook received", extra={
+            "endpoint": endpoint.name, "body": body[:200].decode("utf-8", "replace"), "headers": dict(request.headers)
+        })
 
     # Custom header verification
     if config.ZOOM_CUSTOM_HEADER_ENABLED:
         custom_header_verified = config.verify_zoom_custom_header(request.headers)
         if not custom_header_verified:
-            print(f"[{current_time}] Custom header verification failed")
+            logger.warning("Custom header verification failed")
             raise HTTPException(status_code=401, detail="Invalid custom header authentication")
         else:
-            print(f"[{current_time}] Custom header verification successful")
+            logger.debug("Custom header verification successful")
 
-    # Try to parse JSON
+    # Reject stale or already-seen deliveries before parsing anything (recorded after verification)
+    signature = request.headers.get("x-zm-signature", "")
+    timestamp = request.headers.get("x-zm-request-timestamp", "")
+    if signature and timestamp:
+        replay_error = replay_guard.check(signature, timestamp)
+        if replay_error:
+            logger.warning("%s - rejecting webhook", replay_error)
+            raise HTTPException(status_code=401, detail=replay_error)
+
+    # Peek at the event name and route on its cost class before any full decode
     try:
-        data = json.loads(body_str)
-    except json.JSONDecodeError as e:
-        print(f"[{current_time}] JSON parse error: {str(e)}")
-        raise HTTPException(status_code=400, detail=f"Invalid JSON: {str(e)}")
+        header = peek_event(body)
+    except ValueError as e:
+        logger.warning("Webhook decode error: %s", e)
+        raise HTTPException(status_code=400, detail=f"Invalid webhook payload: {str(e)}")
 
-    event_type = data.get("event")
-    print(f"[{current_time}] Webhook received: {event_type}")
+    event_type = header.event
+    cost, handler = endpoint.dispatch.get(event_type, ACK_ONLY)
+    account_id = header.payload.account_id if header.payload else None
+    log_extra = {"event": event_type, "endpoint": endpoint.name}
 
-    # Extract meeting UUID if available for raw data storage
-    meeting_uuid = None
-    if "payload" in data and "object" in data["payload"]:
-        obj = data["payload"]["object"]
-        if "uuid" in obj:
-            meeting_uuid = obj["uuid"]
+    # Decide once per request whether its INFO/DEBUG lines are sampled in
+    log_sampler.start_request(event_type)
 
     # Case 1: Handle Zoom endpoint validation
-    if event_type == "endpoint.url_validation":
-        print(f"[{current_time}] Processing endpoint validation for endpoint {endpoint_number}")
-        print(f"[{current_time}] Full validation payload: {json.dumps(data)}")
+    if cost == COST_VALIDATION:
+        logger.info("Processing endpoint validation", extra=log_extra)
+        try:
+            event = decode_event(body, event_type)
+        except ValueError as e:
+            logger.warning("Webhook decode error: %s", e)
+            raise HTTPException(status_code=400, detail=f"Invalid webhook payload: {str(e)}")
+        logger.debug("Full validation payload: %s", event)
 
-        plain_token = data.get("payload", {}).get("plainToken")
+        plain_token = event.payload.plainToken
         if not plain_token:
-            print(f"[{current_time}] Error: No plain token provided")
+            logger.warning("No plain token provided")
             raise HTTPException(status_code=400, detail="No plain token provided")
 
-        # Get the token corresponding to this endpoint number
-        token, is_verified = config.get_token_by_endpoint_number(endpoint_number)
+        token = endpoint.verifier.validation_token()
         if not token:
-            print(f"[{current_time}] Error: No token configured for endpoint {endpoint_number}")
-            raise HTTPException(status_code=500, detail=f"No token configured for endpoint {endpoint_number}")
-
-        print(f"[{current_time}] Using token (first 5 chars): {token[:5]}...")
-        print(f"[{current_time}] Plain token from Zoom: {plain_token}")
+            logger.error("No token configured for endpoint %s", endpoint.name)
+            raise HTTPException(status_code=500, detail=f"No token configured for endpoint {endpoint.name}")
 
-        # Generate hash
-        def generate_hash(message: str, secret: str) -> str:
-            return hmac.new(
-                secret.encode('utf-8'),
-                message.encode('utf-8'),
-                hashlib.sha256
-            ).hexdigest()
+        logger.debug("Using token (first 5 chars): %s...", token[:5])
+        logger.debug("Plain token from Zoom: %s", plain_token)
 
-        encrypted_token = generate_hash(plain_token, token)
-        print(f"[{current_time}] Generated encrypted token: {encrypted_token}")
+        encrypted_token = config.encrypt_plain_token(token, plain_token)
+        logger.debug("Generated encrypted token: %s", encrypted_token)
 
         # Mark this token as verified
         config.mark_token_as_verified(token)
@@ -1027,7 +2173,7 @@ async def zoom_webhook_underscore(endpoint_number: str, request: Request):
         # Log verification status
         verified_count = sum(1 for v in config.ZOOM_WEBHOOK_SECRET_VERIFIED.values() if v)
         total_count = len(config.ZOOM_WEBHOOK_SECRET_TOKENS)
-        print(f"[{current_time}] Verified {verified_count} out of {total_count} accounts")
+        logger.info("Verified %d out of %d accounts", verified_count, total_count)
 
         # Prepare response
         response = {
@@ -1035,40 +2181,92 @@ async def zoom_webhook_underscore(endpoint_number: str, request: Request):
             "encryptedToken": encrypted_token
         }
 
-        print(f"[{current_time}] Validation response: {json.dumps(response)}")
-        return JSONResponse(content=response)
+        logger.debug("Validation response: %s", response)
+        return FastJSONResponse(content=response)
 
     # Case 2: Verify signature for regular webhook events
-    signature = request.headers.get("x-zm-signature", "")
-    timestamp = request.headers.get("x-zm-request-timestamp", "")
-
-    print(f"[{current_time}] Webhook headers - Signature: {signature}, Timestamp: {timestamp}")
+    logger.debug("Webhook headers - Signature: %s, Timestamp: %s", signature, timestamp)
 
     if signature and timestamp:
-        # Use endpoint-specific verification
-        signature_valid = config.verify_zoom_signature_for_endpoint(
-            signature, timestamp, body, endpoint_number
-        )
-        print(f"[{current_time}] Signature verification result for endpoint {endpoint_number}: {signature_valid}")
+        signature_valid = endpoint.verifier.verify(signature, timestamp, body, account_id)
+        logger.debug("Signature verification result for endpoint %s: %s", endpoint.name, signature_valid)
 
         if not signature_valid:
-            print(f"[{current_time}] Invalid signature - rejecting webhook")
+            logger.warning("Invalid signature - rejecting webhook", extra=log_extra)
             raise HTTPException(status_code=401, detail="Invalid signature")
     elif config.ZOOM_WEBHOOK_SECRET_TOKENS:
         # Only enforce signature check if tokens are configured
-        print(f"[{current_time}] Missing signature or timestamp headers")
+        logger.warning("Missing signature or timestamp headers", extra=log_extra)
         raise HTTPException(status_code=401, detail="Missing signature headers")
 
-    # Process based on event type
-    if event_type == "meeting.participant_joined":
-        print(f"[{current_time}] Processing participant joined event")
-        result = await attendance_processor.process_participant_joined(data)
-        print(f"[{current_time}] Participant processing result: {json.dumps(result)}")
-        return result
-    else:
-        # For other event types, just acknowledge receipt
-        print(f"[{current_time}] Event {event_type} received but not processed")
-        return {"status": "success", "message": f"Event {event_type} received but not processed"}
+    # Only verified signatures are remembered, so unauthenticated requests cannot evict real ones
+    if signature and timestamp and not replay_guard.record(signature):
+        logger.warning("Replayed request - rejecting webhook", extra=log_extra)
+        raise HTTPException(status_code=401, detail="Replayed request")
+
+    try:
+        # Case 3: Unhandled event types are acknowledged without decoding the body
+        if cost == COST_ACK:
+            if webhook_log:
+                webhook_log.enqueue(event_type, body)
+            logger.debug("Event received but not processed", extra=log_extra)
+            return FastJSONResponse({"status": "success", "message": f"Event {event_type} received but not processed"})
+
+        logger.info("Webhook received", extra=log_extra)
+        try:
+            event = decode_event(body, event_type)
+        except ValueError as e:
+            logger.warning("Webhook decode error: %s", e, extra=log_extra)
+            raise HTTPException(status_code=400, detail=f"Invalid webhook payload: {str(e)}")
+
+        # Acknowledge Zoom retries without doing the work again
+        fingerprint = WebhookDedupIndex.fingerprint(event) if dedup_index else None
+        if fingerprint and dedup_index.check_and_add(fingerprint):
+            logger.info("Duplicate delivery - already processed", extra=log_extra)
+            return FastJSONResponse({"status": "success", "message": f"Duplicate event {event_type} already processed"})
+
+        # Durably log the event before acting on it; a crash from here on is recovered at startup
+        seq = None
+        if webhook_log:
+            try:
+                seq = await webhook_log.append(event_type, body, track=True)
+            except OSError:
+                if fingerprint:
+                    dedup_index.discard(fingerprint)
+                raise HTTPException(status_code=503, detail="Webhook log unavailable")
+
+        try:
+            result = await handler(event)
+        finally:
+            if seq is not None:
+                webhook_log.mark_done(seq)
+        logger.info("Event processing result", extra={**log_extra, "result": result})
+        if result.get("status") == "error":
+            # Let a retry of a failed delivery be processed again
+            if fingerprint:
+                dedup_index.discard(fingerprint)
+            replay_guard.forget(signature)
+        return FastJSONResponse(result)
+    except BaseException:
+        # A failed delivery may be retried byte-for-byte by Zoom
+        replay_guard.forget(signature)
+        raise
+
+# Zoom webhook endpoint with custom header verification
+@app.post("/zoom/webhook")
+async def zoom_webhook(request: Request):
+    """Process Zoom webhook events with custom header verification."""
+    return await handle_webhook(request, endpoint_registry[""])
+
+@app.post("/zoom/webhook_{endpoint_number}")
+async def zoom_webhook_underscore(endpoint_number: str, request: Request):
+    """Process Zoom webhook events with underscore format."""
+    endpoint = endpoint_registry.get(endpoint_number)
+    if endpoint is None:
+        # Unknown number: verify by account ID, but it cannot answer url_validation
+        logger.warning("No token found for webhook number %s", endpoint_number)
+        endpoint = WebhookEndpoint(endpoint_number, WebhookVerifier(), EVENT_DISPATCH)
+    return await handle_webhook(request, endpoint)
 
 
 @app.get("/test")
@@ -1141,6 +2339,21 @@ async def reset_token(request: Request):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error resetting tokens: {str(e)}")
 
+@app.post("/reload-config")
+async def reload_config():
+    """Rebuild the config snapshot from .env and swap it in without a restart"""
+    try:
+        changed = config.reload()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error reloading config: {str(e)}")
+
+    return {
+        "status": "success",
+        "changed": changed,
+        "restart_required": [name for name in changed if name in ConfigSnapshot.STARTUP_ONLY],
+        "total_accounts": len(config.ZOOM_WEBHOOK_SECRET_TOKENS)
+    }
+
 @app.get("/debug")
 async def debug_info():
     """Get debug information about the current setup."""
@@ -1161,10 +2374,12 @@ async def debug_info():
         nocodb_status = "Unknown"
         try:
             headers = {"xc-token": config.NOCODB_TOKEN}
+            await nocodb_read_limiter.acquire_async()
             response = requests.get(
                 f"{config.NOCODB_URL}/api/v2/tables/{config.ROSTER_TABLE_ID}/records",
                 params={"limit": 1},
-                headers=headers
+                headers=headers,
+                timeout=config.NOCODB_TIMEOUT_SECONDS
             )
             nocodb_status = f"OK - Status {response.status_code}"
         except Exception as e:
@@ -1176,7 +2391,7 @@ async def debug_info():
             try:
                 # Simple test of the OpenAI model
                 response = client.chat.completions.create(
-                    model="gpt-4o-mini",
+                    model=config.OPENAI_MODEL,
                     messages=[
                         {"role": "system", "content": "You are a helpful assistant."},
                         {"role": "user", "content": "Hello, are you working?"}
@@ -1208,20 +2423,87 @@ async def debug_info():
                 "CONFIDENCE_THRESHOLD": config.CONFIDENCE_THRESHOLD,
                 "DEBUG_MODE": config.DEBUG_MODE,
                 "ROSTER_CACHE_SECONDS": config.ROSTER_CACHE_SECONDS,
-                "AI_BACKEND": "OpenAI" if config.OPENAI_API_KEY else "None"
+                "AI_BACKEND": (config.OPENAI_BASE_URL or "OpenAI") if config.OPENAI_API_KEY else "None",
+                "OPENAI_MODEL": config.OPENAI_MODEL
             },
             "status_checks": {
                 "nocodb_connection": nocodb_status,
                 "roster_count": roster_count,
                 "roster_error": roster_error,
                 "ai_status": ai_status,
-                "roster_cache_age": f"{(datetime.datetime.now() - (attendance_processor.roster_last_updated or datetime.datetime.now())).seconds} seconds" if attendance_processor.roster_last_updated else "Not cached yet",
+                "roster_cache_age": f"{(datetime.datetime.now() - (nocodb_store.roster_last_updated or datetime.datetime.now())).seconds} seconds" if nocodb_store.roster_last_updated else "Not cached yet",
                 "zoom_verification": zoom_tokens_status
             }
         }
     except Exception as e:
         return {"status": "error", "message": f"Error generating debug info: {str(e)}"}
 
+@app.get("/archive/meeting")
+async def archive_meeting_events(uuid: str, date: Optional[List[str]] = Query(None)):
+    """All archived events of one meeting (optionally limited to some days)."""
+    archive = EventArchive(config.ARCHIVE_DIR)
+    events = await asyncio.to_thread(archive.meeting_events, uuid, date)
+    return {"meeting_uuid": uuid, "count": len(events), "events": [event._asdict() for event in events]}
+
+@app.get("/archive/participant")
+async def archive_participant_events(name: str, date: Optional[List[str]] = Query(None)):
+    """All archived events of one participant display name (optionally limited to some days)."""
+    archive = EventArchive(config.ARCHIVE_DIR)
+    events = await asyncio.to_thread(archive.participant_events, name, date)
+    return {"name": name, "count": len(events), "events": [event._asdict() for event in events]}
+
+@app.get("/attendance-columns")
+async def attendance_columns_status():
+    """Upcoming date columns and whether each one exists yet."""
+    if not attendance_columns:
+        return {"enabled": False}
+    upcoming = attendance_columns.upcoming_dates(config.ATTENDANCE_COLUMNS_DAYS_AHEAD)
+    return {
+        "enabled": True,
+        "loaded": attendance_columns.loaded,
+        "known_date_columns": sum(1 for title in attendance_columns.known if title and title[:4].isdigit()),
+        "upcoming": {date: date in attendance_columns.known for date in upcoming},
+        "backing_off": sorted(date for date in list(attendance_columns.failures) if attendance_columns.backing_off(date)),
+    }
+
+@app.post("/attendance-columns/provision")
+async def provision_columns_now():
+    """Create any missing upcoming date columns right away."""
+    if not attendance_columns:
+        raise HTTPException(status_code=404, detail="Attendance column provisioning is disabled")
+    created = await asyncio.to_thread(attendance_columns.provision_ahead)
+    return {"status": "success", "created": created}
+
+@app.get("/nocodb-rate-limits")
+async def nocodb_rate_limits():
+    """Token-bucket budgets for NocoDB traffic and time spent waiting on them."""
+    return {
+        "read": nocodb_read_limiter.stats(),
+        "write": nocodb_write_limiter.stats(),
+    }
+
+@app.get("/storage-status")
+async def storage_status():
+    """Active storage backend and, for the local store, what is still waiting to replicate."""
+    if not store_replicator:
+        return {"backend": nocodb_store.name}
+    return {"backend": local_store.name, **await asyncio.to_thread(store_replicator.stats)}
+
+@app.get("/outbox-status")
+async def outbox_status():
+    """Pending and dead NocoDB writes plus the circuit breaker state."""
+    if not nocodb_outbox:
+        return {"enabled": False}
+    return {"enabled": True, **await asyncio.to_thread(nocodb_outbox.stats)}
+
+@app.post("/outbox/retry-dead")
+async def outbox_retry_dead():
+    """Requeue NocoDB writes that exhausted their retries."""
+    if not nocodb_outbox:
+        raise HTTPException(status_code=404, detail="Outbox is disabled")
+    requeued = await asyncio.to_thread(nocodb_outbox.retry_dead)
+    return {"status": "success", "requeued": requeued}
+
 @app.get("/roster")
 async def get_roster():
     """Endpoint to get the roster (for testing)."""
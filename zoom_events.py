@@ -0,0 +1,155 @@
+"""
+Typed Zoom webhook event models.
+
+Generated by generate_zoom_events.py from ref_scripts/webhookFormats.txt - do not edit by hand.
+"""
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass
+class HeaderPayload:
+    account_id: Optional[str] = None
+
+
+@dataclass
+class EventHeader:
+    """Event name and account, for routing and verification before the full decode"""
+    event: str
+    payload: Optional[HeaderPayload] = None
+
+
+@dataclass
+class GenericObject:
+    uuid: Optional[str] = None
+
+
+@dataclass
+class GenericPayload:
+    account_id: Optional[str] = None
+    object: Optional[GenericObject] = None
+    plainToken: Optional[str] = None
+
+
+@dataclass
+class GenericEvent:
+    """Fallback model for events without a schema (e.g. endpoint.url_validation)"""
+    event: str
+    payload: GenericPayload
+    event_ts: Optional[int] = None
+
+
+@dataclass
+class MeetingStartedObject:
+    uuid: str
+
+
+@dataclass
+class MeetingStartedPayload:
+    account_id: str
+    object: MeetingStartedObject
+
+
+@dataclass
+class MeetingStarted:
+    event: str
+    event_ts: int
+    payload: MeetingStartedPayload
+
+
+@dataclass
+class MeetingEndedObject:
+    uuid: str
+
+
+@dataclass
+class MeetingEndedPayload:
+    account_id: str
+    object: MeetingEndedObject
+
+
+@dataclass
+class MeetingEnded:
+    event: str
+    event_ts: int
+    payload: MeetingEndedPayload
+
+
+@dataclass
+class MeetingParticipantJoinedParticipant:
+    user_name: str
+    join_time: str
+    participant_uuid: Optional[str] = None
+
+
+@dataclass
+class MeetingParticipantJoinedObject:
+    uuid: str
+    participant: MeetingParticipantJoinedParticipant
+
+
+@dataclass
+class MeetingParticipantJoinedPayload:
+    account_id: str
+    object: MeetingParticipantJoinedObject
+
+
+@dataclass
+class MeetingParticipantJoined:
+    event: str
+    event_ts: int
+    payload: MeetingParticipantJoinedPayload
+
+
+@dataclass
+class MeetingParticipantLeftParticipant:
+    leave_time: str
+    user_name: Optional[str] = None
+    participant_uuid: Optional[str] = None
+
+
+@dataclass
+class MeetingParticipantLeftObject:
+    uuid: str
+    participant: MeetingParticipantLeftParticipant
+
+
+@dataclass
+class MeetingParticipantLeftPayload:
+    account_id: str
+    object: MeetingParticipantLeftObject
+
+
+@dataclass
+class MeetingParticipantLeft:
+    event: str
+    event_ts: int
+    payload: MeetingParticipantLeftPayload
+
+
+@dataclass
+class MeetingChatMessageSentObject:
+    uuid: str
+
+
+@dataclass
+class MeetingChatMessageSentPayload:
+    account_id: str
+    object: MeetingChatMessageSentObject
+
+
+@dataclass
+class MeetingChatMessageSent:
+    event: str
+    event_ts: int
+    payload: MeetingChatMessageSentPayload
+
+
+# Event name -> model
+EVENT_MODELS = {
+    "meeting.started": MeetingStarted,
+    "meeting.ended": MeetingEnded,
+    "meeting.participant_joined": MeetingParticipantJoined,
+    "meeting.participant_left": MeetingParticipantLeft,
+    "meeting.chat_message_sent": MeetingChatMessageSent,
+}